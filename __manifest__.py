@@ -27,9 +27,17 @@
     'license': 'LGPL-3',
     'data': [
         'security/ir.model.access.csv',
+        'security/project_statistic_security.xml',
         'data/ir_config_parameter.xml',
+        'data/ir_cron.xml',
+        'data/project_statistic_skonto_account.xml',
         'wizard/refresh_financial_data_wizard_views.xml',
         'views/hr_employee_views.xml',
+        'views/res_company_views.xml',
+        'views/project_statistic_queue_views.xml',
+        'views/project_statistic_report_views.xml',
+        'views/project_statistic_skonto_account_views.xml',
+        'views/project_statistic_snapshot_views.xml',  # Before project_analytics_views.xml (dashboard button)
         'views/project_analytics_views.xml',  # Must be loaded before menuitem.xml (defines actions)
         'data/menuitem.xml',  # Loaded last (references actions from views)
     ],
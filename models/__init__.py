@@ -1,4 +1,19 @@
 from . import project_analytics
+from . import project_statistic_aggregate
+from . import account_move
 from . import account_move_line
 from . import account_analytic_line
-from . import hr_employee
\ No newline at end of file
+from . import hr_employee
+from . import project_statistic_queue
+from . import res_company
+from . import project_statistic_distribution
+from . import project_statistic_monthly
+from . import project_statistic_report
+from . import project_statistic_snapshot
+from . import account_account
+from . import account_analytic_plan
+from . import project_statistic_skonto_account
+from . import account_partial_reconcile
+from . import sale_order
+from . import account_analytic_account
+from . import project_statistic_bulk_account
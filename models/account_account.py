@@ -0,0 +1,28 @@
+from odoo import models, api
+
+
+class AccountAccount(models.Model):
+    _inherit = 'account.account'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        accounts = super().create(vals_list)
+        # New accounts may match the Skonto account codes of the compute context
+        if self.env['project.statistic.skonto.account']._matches_code(accounts.mapped('code')):
+            self.env['project.project']._clear_statistic_cache()
+        return accounts
+
+    def write(self, vals):
+        # Skonto accounts of the compute context are resolved by code
+        codes = (self.mapped('code') + [vals['code']]) if 'code' in vals else []
+        result = super().write(vals)
+        if codes and self.env['project.statistic.skonto.account']._matches_code(codes):
+            self.env['project.project']._clear_statistic_cache()
+        return result
+
+    def unlink(self):
+        is_skonto = self.env['project.statistic.skonto.account']._matches_code(self.mapped('code'))
+        result = super().unlink()
+        if is_skonto:
+            self.env['project.project']._clear_statistic_cache()
+        return result
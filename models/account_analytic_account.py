@@ -0,0 +1,24 @@
+from odoo import models
+
+
+class AccountAnalyticAccount(models.Model):
+    _inherit = 'account.analytic.account'
+
+    def write(self, vals):
+        project_plan_id = self.env['project.project']._get_compute_context().project_plan_id
+        # Reverse index analytic account -> projects is limited to the projects plan
+        affected = 'plan_id' in vals and project_plan_id and (
+            vals['plan_id'] == project_plan_id or project_plan_id in self.plan_id.ids
+        )
+        result = super().write(vals)
+        if affected:
+            self.env['project.project']._clear_statistic_cache()
+        return result
+
+    def unlink(self):
+        project_index = self.env['project.project']._get_analytic_account_project_index()
+        indexed = any(account_id in project_index for account_id in self.ids)
+        result = super().unlink()
+        if indexed:
+            self.env['project.project']._clear_statistic_cache()
+        return result
@@ -1,4 +1,4 @@
-from odoo import models, api
+from odoo import models, fields, api, tools
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -7,25 +7,59 @@ _logger = logging.getLogger(__name__)
 class AccountAnalyticLine(models.Model):
     _inherit = 'account.analytic.line'
 
+    def init(self):
+        # Employee -> analytic accounts lookup of the HFC factor trigger (hr.employee)
+        tools.create_index(
+            self.env.cr, 'account_analytic_line_project_statistic_employee_account_idx',
+            self._table, ['employee_id', 'account_id'],
+        )
+
     @api.model_create_multi
     def create(self, vals_list):
         """
         Override create to trigger project analytics recomputation when timesheets are created.
+
+        In incremental mode the contribution of the new lines is added as delta instead.
+        In bulk mode only the analytic accounts of the lines are recorded.
         """
         lines = super().create(vals_list)
-        self._trigger_project_analytics_recompute(lines)
+        Bulk = self.env['project.statistic.bulk.account']
+        if Bulk._is_active():
+            Bulk._record(lines.account_id.ids)
+        elif self.env['project.project']._is_incremental_mode():
+            self.env['project.project']._add_financial_deltas({}, lines._get_project_analytics_contributions())
+        else:
+            self._trigger_project_analytics_recompute(lines)
         return lines
 
     def write(self, vals):
         """
         Override write to trigger project analytics recomputation when timesheets are modified.
         Only triggers when relevant fields change.
+
+        In incremental mode the contribution of the lines is taken before and after
+        the write and only the difference is applied to the project totals.
+        In bulk mode only the analytic accounts before and after the write are recorded.
         """
+        # Only trigger recompute if fields that affect project analytics changed
+        relevant = any(key in vals for key in ['account_id', 'unit_amount', 'amount', 'employee_id', 'is_timesheet', 'date'])
+        Bulk = self.env['project.statistic.bulk.account']
+        bulk = relevant and Bulk._is_active()
+        if bulk:
+            Bulk._record(self.account_id.ids)
+        incremental = relevant and not bulk and self.env['project.project']._is_incremental_mode()
+        before = self._get_project_analytics_contributions() if incremental else None
+
         result = super().write(vals)
 
-        # Only trigger recompute if fields that affect project analytics changed
-        if any(key in vals for key in ['account_id', 'unit_amount', 'amount', 'employee_id', 'is_timesheet']):
-            self._trigger_project_analytics_recompute(self)
+        if bulk:
+            Bulk._record(self.account_id.ids)
+        elif incremental:
+            self.env['project.project']._add_financial_deltas(before, self._get_project_analytics_contributions())
+        elif relevant:
+            # A line switching between timesheet and cost line affects the groups of both
+            groups = self._get_project_analytics_groups(all_types='is_timesheet' in vals)
+            self._trigger_project_analytics_recompute(self, groups)
 
         return result
 
@@ -34,43 +68,112 @@ class AccountAnalyticLine(models.Model):
         Override unlink to trigger project analytics recomputation when timesheets are deleted.
         """
         # Trigger BEFORE deletion so we can still access the data
-        self._trigger_project_analytics_recompute(self)
+        Bulk = self.env['project.statistic.bulk.account']
+        if Bulk._is_active():
+            Bulk._record(self.account_id.ids)
+        elif self.env['project.project']._is_incremental_mode():
+            self.env['project.project']._add_financial_deltas(self._get_project_analytics_contributions(), {})
+        else:
+            self._trigger_project_analytics_recompute(self)
         return super().unlink()
 
-    def _trigger_project_analytics_recompute(self, lines):
+    def _get_project_analytics_contributions(self):
+        """
+        Compute what these lines contribute to the project totals (incremental mode).
+
+        Mirrors the batch aggregation in project.project:
+        - Timesheets: hours, labor costs, HFC-adjusted hours
+        - Skonto: lines booked on the Skonto accounts
+        - Other costs: negative non-timesheet lines not coming from vendor bills
+
+        Amounts are bucketed by the month of the line date.
+
+        Returns:
+            dict: {analytic_account_id: {month: {field_name: amount}}}
+        """
+        Project = self.env['project.project']
+        context = Project._get_compute_context()
+        contributions = {}
+        for line in self:
+            if not line.account_id:
+                continue
+
+            values = contributions.setdefault(line.account_id.id, {}).setdefault(
+                fields.Date.start_of(line.date, 'month'), {}
+            )
+            amount = line.amount or 0.0
+
+            def add(field_name, value):
+                values[field_name] = values.get(field_name, 0.0) + value
+
+            if line.is_timesheet:
+                hours = line.unit_amount or 0.0
+                add('total_hours_booked', hours)
+                add('labor_costs', abs(amount))
+                # If no employee or no HFC factor, use 1.0 (no adjustment)
+                faktor_hfc = (line.employee_id.faktor_hfc or 1.0) if line.employee_id else 1.0
+                add('total_hours_booked_adjusted', hours * faktor_hfc)
+
+            skonto_type = Project._get_skonto_type(line.move_line_id.account_id.id, context)
+            if skonto_type == 'customer':
+                add('customer_skonto_taken', abs(amount))
+            elif skonto_type == 'vendor':
+                add('vendor_skonto_received', abs(amount))
+
+            if amount < 0 and not line.is_timesheet:
+                # Vendor bills are counted separately in vendor_bills_total
+                if line.move_line_id.move_id.move_type not in ('in_invoice', 'in_refund'):
+                    add('other_costs_net', abs(amount))
+
+        return contributions
+
+    def _get_project_analytics_groups(self, all_types=False):
+        """
+        Get the project field groups these analytic lines can affect.
+
+        Timesheets only affect the labor group: saving a timesheet never reads
+        invoice, bill or journal item tables. Other analytic lines affect skonto
+        and other costs.
+
+        Args:
+            all_types: return the groups of timesheets and other lines
+
+        Returns:
+            set of FIELD_GROUPS keys
+        """
+        groups = set()
+        if all_types or any(line.is_timesheet for line in self):
+            groups.add('labor')
+        if all_types or any(not line.is_timesheet for line in self):
+            groups.update(('skonto', 'other_costs'))
+        return groups
+
+    def _trigger_project_analytics_recompute(self, lines, groups=None):
         """
         Trigger recomputation of project analytics when analytic lines (timesheets) change.
 
-        IMPORTANT: This method uses cache invalidation instead of commits to maintain
-        transactional integrity. The actual recomputation happens within the same
-        transaction as the analytic line changes.
+        IMPORTANT: This method does not recompute anything itself. It only adds the
+        affected projects to the per-transaction dirty set; they are recomputed once
+        in a precommit hook, within the same transaction as the analytic line changes.
+        Several writes in one request therefore cost a single recompute per project.
 
         Optimizations:
-        - Batch processing
-        - Error handling per batch
-        - Deduplication of project IDs
-        - Cache invalidation for fresh data
+        - Deduplication of project IDs (per transaction)
+        - Recompute coalesced into one end-of-transaction flush
+        - Only the field groups of the lines are recomputed (timesheets: labor only)
 
         Args:
             lines: Recordset of account.analytic.line records that changed
+            groups: field groups to recompute, derived from the lines if not given
         """
         if not lines:
             return
+        if groups is None:
+            groups = lines._get_project_analytics_groups()
 
         project_ids = set()
 
         try:
-            # Get project plan reference once
-            try:
-                project_plan = self.env.ref('analytic.analytic_plan_projects', raise_if_not_found=False)
-            except Exception as e:
-                _logger.warning(f"Could not load project plan reference: {e}")
-                return
-
-            if not project_plan:
-                _logger.debug("Project analytic plan not found - skipping recompute trigger")
-                return
-
             # Collect all unique analytic account IDs
             analytic_account_ids = set()
             for line in lines:
@@ -80,62 +183,16 @@ class AccountAnalyticLine(models.Model):
             if not analytic_account_ids:
                 return
 
-            # Batch-fetch all analytic accounts
-            analytic_accounts = self.env['account.analytic.account'].browse(list(analytic_account_ids))
-
-            # Filter for project plan accounts only
-            project_analytic_accounts = analytic_accounts.filtered(
-                lambda a: a.exists() and a.plan_id == project_plan
+            # Projects of the accounts from the cached reverse index (projects plan only, no query)
+            project_ids = set(
+                self.env['project.project']._get_project_ids_by_analytic_accounts(analytic_account_ids)
             )
-
-            if not project_analytic_accounts:
+            if not project_ids:
                 return
 
-            # Find all projects linked to these analytic accounts in one query
-            # In Odoo 18, analytic_account_id was removed from projects, only use account_id
-            projects = self.env['project.project'].search([
-                ('account_id', 'in', project_analytic_accounts.ids)
-            ])
-
-            if not projects:
-                return
-
-            project_ids = set(projects.ids)
-
         except Exception as e:
             _logger.error(f"Error collecting projects for analytics recompute (analytic lines): {e}", exc_info=True)
             return
 
-        # Process projects and invalidate cache
-        if project_ids:
-            project_ids_list = list(project_ids)
-            chunk_size = 100
-            total_projects = len(project_ids_list)
-
-            _logger.info(f"Invalidating cache and triggering recompute for {total_projects} project(s) after analytic line change")
-
-            for i in range(0, total_projects, chunk_size):
-                chunk = project_ids_list[i:i + chunk_size]
-                chunk_projects = self.env['project.project'].browse(chunk)
-
-                try:
-                    # CRITICAL: Invalidate cache first to ensure fresh data
-                    chunk_projects.invalidate_recordset()
-
-                    # Recompute financial data for this batch
-                    # This happens within the current transaction
-                    chunk_projects._compute_financial_data()
-
-                    # NO COMMIT HERE! We stay within the user's transaction
-                    # The data will be committed when the user's operation completes
-
-                    _logger.debug(f"Recomputed financial data for {len(chunk_projects)} project(s) (analytic lines)")
-
-                except Exception as e:
-                    # Log error but don't break the user's transaction
-                    _logger.error(
-                        f"Error recomputing financial data for projects {chunk}: {e}",
-                        exc_info=True
-                    )
-                    # NO ROLLBACK HERE! Let Odoo handle transaction rollback if needed
-                    continue
+        # Only mark the projects dirty: they are recomputed once, right before commit
+        self.env['project.project']._schedule_financial_data_recompute(project_ids, groups)
@@ -0,0 +1,36 @@
+from odoo import models, api
+
+
+class AccountAnalyticPlan(models.Model):
+    _inherit = 'account.analytic.plan'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        plans = super().create(vals_list)
+        # The projects plan is only resolved by name when the standard plan is missing
+        if not self._get_statistic_project_plan_id():
+            self.env['project.project']._clear_statistic_cache()
+        return plans
+
+    def write(self, vals):
+        result = super().write(vals)
+        if 'name' in vals and self._is_statistic_project_plan_affected():
+            self.env['project.project']._clear_statistic_cache()
+        return result
+
+    def unlink(self):
+        affected = self._is_statistic_project_plan_affected()
+        result = super().unlink()
+        if affected:
+            self.env['project.project']._clear_statistic_cache()
+        return result
+
+    @api.model
+    def _get_statistic_project_plan_id(self):
+        """ID of the projects plan of the cached compute context (or None)."""
+        return self.env['project.project']._get_compute_context().project_plan_id
+
+    def _is_statistic_project_plan_affected(self):
+        """Check whether a change of these plans can change the resolved projects plan."""
+        project_plan_id = self._get_statistic_project_plan_id()
+        return not project_plan_id or project_plan_id in self.ids
@@ -0,0 +1,53 @@
+from odoo import models
+
+
+class AccountMove(models.Model):
+    _inherit = 'account.move'
+
+    def write(self, vals):
+        """
+        Override write to keep the distribution index in sync and to trigger the
+        project analytics recompute when moves are posted, reset to draft,
+        cancelled or reversed.
+
+        This is the posting trigger of the module: the figures only count lines
+        of posted moves, so the line hooks ignore draft moves and the recompute
+        happens once per move state change. Posting, resetting to draft or
+        cancelling changes parent_state of all lines (a related stored field),
+        which does not go through account.move.line.write(); the same holds for
+        the accounting date of a posted move, which decides the monthly bucket.
+        In incremental mode the lines' contribution is taken before and after the
+        change here, in full mode the affected projects are marked dirty. In bulk
+        mode only the analytic accounts of the lines are recorded.
+        """
+        # Moves whose posted figures change: state changes to/from posted, edits of posted moves
+        if 'state' in vals:
+            moves = self.filtered(
+                lambda move: move.state != vals['state'] and 'posted' in (move.state, vals['state'])
+            )
+        else:
+            moves = self.filtered(lambda move: move.state == 'posted')
+
+        if moves and any(key in vals for key in ['state', 'move_type', 'reversed_entry_id']):
+            # parent_state / move_type / is_reversal are copied into the distribution index
+            self.env['project.statistic.distribution']._mark_dirty(moves.line_ids.ids)
+
+        if not moves or not any(key in vals for key in ['state', 'date']):
+            return super().write(vals)
+
+        lines = moves.line_ids
+        Bulk = self.env['project.statistic.bulk.account']
+        if Bulk._is_active():
+            result = super().write(vals)
+            Bulk._record(lines._get_project_analytics_account_ids())
+            return result
+
+        if not self.env['project.project']._is_incremental_mode():
+            result = super().write(vals)
+            lines._trigger_project_analytics_recompute(lines)
+            return result
+
+        before = lines._get_project_analytics_contributions()
+        result = super().write(vals)
+        self.env['project.project']._add_financial_deltas(before, lines._get_project_analytics_contributions())
+        return result
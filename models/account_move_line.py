@@ -1,4 +1,4 @@
-from odoo import models, api
+from odoo import models, fields, api
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -12,47 +12,173 @@ class AccountMoveLine(models.Model):
         """
         Override create to trigger project analytics recomputation.
         Uses batch processing for better performance.
+
+        Only lines created on already posted moves are considered: the figures
+        only count posted lines, and posting a draft move is caught by
+        account.move.write(). Creating draft invoices and bills therefore adds
+        no recompute overhead.
+
+        In incremental mode the contribution of the new lines is added as delta instead.
+        In bulk mode only the analytic accounts of the lines are recorded.
         """
         lines = super().create(vals_list)
-        self._trigger_project_analytics_recompute(lines)
+        posted_lines = lines._filter_posted()
+        if not posted_lines:
+            return lines
+
+        self.env['project.statistic.distribution']._mark_dirty(posted_lines.ids)
+        Bulk = self.env['project.statistic.bulk.account']
+        if Bulk._is_active():
+            Bulk._record(posted_lines._get_project_analytics_account_ids())
+        elif self.env['project.project']._is_incremental_mode():
+            self.env['project.project']._add_financial_deltas({}, posted_lines._get_project_analytics_contributions())
+        else:
+            self._trigger_project_analytics_recompute(posted_lines)
         return lines
 
     def write(self, vals):
         """
         Override write to trigger project analytics recomputation.
-        Only triggers when relevant fields change.
+        Only triggers when relevant fields change on lines of posted moves;
+        editing draft moves adds no recompute overhead.
+
+        In incremental mode the contribution of the lines is taken before and after
+        the write and only the difference is applied to the project totals.
+        In bulk mode only the analytic accounts before and after the write are recorded.
         """
-        result = super().write(vals)
+        posted_lines = self._filter_posted()
+        if not posted_lines:
+            return super().write(vals)
 
         # Only trigger recompute if fields that affect project analytics changed
-        if any(key in vals for key in ['analytic_distribution', 'price_subtotal', 'price_total', 'debit', 'credit', 'balance']):
-            self._trigger_project_analytics_recompute(self)
+        relevant = any(key in vals for key in ['analytic_distribution', 'price_subtotal', 'price_total', 'debit', 'credit', 'balance', 'date'])
+        Bulk = self.env['project.statistic.bulk.account']
+        bulk = relevant and Bulk._is_active()
+        if bulk:
+            Bulk._record(posted_lines._get_project_analytics_account_ids())
+        incremental = relevant and not bulk and self.env['project.project']._is_incremental_mode()
+        before = posted_lines._get_project_analytics_contributions() if incremental else None
+
+        result = super().write(vals)
+
+        if 'analytic_distribution' in vals:
+            self.env['project.statistic.distribution']._mark_dirty(posted_lines.ids)
+
+        if bulk:
+            Bulk._record(posted_lines._get_project_analytics_account_ids())
+        elif incremental:
+            self.env['project.project']._add_financial_deltas(before, posted_lines._get_project_analytics_contributions())
+        elif relevant:
+            self._trigger_project_analytics_recompute(posted_lines)
 
         return result
 
     def unlink(self):
         """
         Override unlink to trigger project analytics recomputation.
-        Captures project IDs before deletion.
+        Captures project IDs before deletion (lines of posted moves only).
         """
         # Trigger BEFORE deletion so we can still access the data
-        self._trigger_project_analytics_recompute(self)
+        posted_lines = self._filter_posted()
+        if posted_lines:
+            Bulk = self.env['project.statistic.bulk.account']
+            if Bulk._is_active():
+                Bulk._record(posted_lines._get_project_analytics_account_ids())
+            elif self.env['project.project']._is_incremental_mode():
+                self.env['project.project']._add_financial_deltas(posted_lines._get_project_analytics_contributions(), {})
+            else:
+                self._trigger_project_analytics_recompute(posted_lines)
         return super().unlink()
 
+    def _filter_posted(self):
+        """Return the lines of posted moves (the only lines the project figures count)."""
+        return self.filtered(lambda line: line.parent_state == 'posted')
+
+    def _get_project_analytics_account_ids(self):
+        """
+        Get the analytic accounts of the lines' analytic distributions.
+
+        Multi-plan keys ("12,34") are split into their accounts.
+
+        Returns:
+            set of account.analytic.account IDs
+        """
+        Distribution = self.env['project.statistic.distribution']
+        analytic_account_ids = set()
+        for line in self:
+            if not line.analytic_distribution:
+                continue
+            try:
+                for key in line.analytic_distribution.keys():
+                    analytic_account_ids.update(Distribution._split_distribution_key(key))
+            except Exception as e:
+                _logger.warning(f"Error parsing analytic_distribution for line {line.id}: {e}")
+        return analytic_account_ids
+
+    def _get_project_analytics_contributions(self):
+        """
+        Compute what these lines contribute to the project totals (incremental mode).
+
+        Mirrors the batch aggregation in project.project._get_move_line_totals():
+        only posted invoice/bill lines, no reversal entries, no section/note lines,
+        the analytic percentage of price_subtotal / price_total, refunds negative,
+        bucketed by the accounting month of the line.
+
+        Returns:
+            dict: {analytic_account_id: {month: {field_name: amount}}}
+        """
+        Distribution = self.env['project.statistic.distribution']
+        contributions = {}
+        for line in self:
+            if line.parent_state != 'posted' or not line.analytic_distribution:
+                continue
+            if line.display_type in ('line_section', 'line_note'):
+                continue
+            move = line.move_id
+            if move.move_type not in ('out_invoice', 'out_refund', 'in_invoice', 'in_refund'):
+                continue
+            # Skip reversal entries (Storno) - they cancel out the original entry
+            if move.reversed_entry_id:
+                continue
+
+            if move.move_type in ('out_invoice', 'out_refund'):
+                net_field, gross_field = 'customer_invoiced_amount_net', 'customer_invoiced_amount_gross'
+            else:
+                net_field, gross_field = 'vendor_bills_total_net', 'vendor_bills_total_gross'
+            month = fields.Date.start_of(line.date, 'month')
+
+            for key, percentage in line.analytic_distribution.items():
+                amount_net = line.price_subtotal * (percentage or 0.0) / 100.0
+                amount_gross = line.price_total * (percentage or 0.0) / 100.0
+                # Credit notes / vendor refunds are always subtracted
+                if move.move_type in ('out_refund', 'in_refund'):
+                    amount_net = -abs(amount_net)
+                    amount_gross = -abs(amount_gross)
+
+                # Multi-plan keys ("12,34") count for every account of the key
+                for analytic_account_id in Distribution._split_distribution_key(key):
+                    values = contributions.setdefault(analytic_account_id, {}).setdefault(month, {})
+                    values[net_field] = values.get(net_field, 0.0) + amount_net
+                    values[gross_field] = values.get(gross_field, 0.0) + amount_gross
+
+        return contributions
+
     def _trigger_project_analytics_recompute(self, lines):
         """
         Trigger recomputation of project analytics when move lines with analytic distribution change.
 
-        IMPORTANT: This method uses cache invalidation instead of commits to maintain
-        transactional integrity. The actual recomputation happens within the same
-        transaction as the move line changes.
+        IMPORTANT: This method does not recompute anything itself. It only adds the
+        affected projects to the per-transaction dirty set; they are recomputed once
+        in a precommit hook, within the same transaction as the move line changes.
+        Several writes in one request therefore cost a single recompute per project.
 
         Optimizations:
         - Prefetching for performance
-        - Batch processing in chunks
-        - Error handling per batch
-        - Deduplication of project IDs
-        - Cache invalidation for fresh data
+        - Deduplication of project IDs (per transaction)
+        - Recompute coalesced into one end-of-transaction flush
+        - Only the field groups of the lines' moves are recomputed: revenue and
+          payments for customer invoices/credit notes, vendor costs for vendor
+          bills/refunds
 
         Args:
             lines: Recordset of account.move.line records that changed
@@ -69,91 +195,32 @@ class AccountMoveLine(models.Model):
             if not lines_with_distribution:
                 return
 
-            # Get project plan reference once
-            try:
-                project_plan = self.env.ref('analytic.analytic_plan_projects', raise_if_not_found=False)
-            except Exception as e:
-                _logger.warning(f"Could not load project plan reference: {e}")
-                return
-
-            if not project_plan:
-                _logger.debug("Project analytic plan not found - skipping recompute trigger")
+            # Field groups the lines can affect (other moves reach projects via their analytic lines)
+            groups = set()
+            for move_type in set(lines_with_distribution.move_id.mapped('move_type')):
+                if move_type in ('out_invoice', 'out_refund'):
+                    # Invoiced amounts also change the paid share of the invoice
+                    groups.update(('revenue', 'payments'))
+                elif move_type in ('in_invoice', 'in_refund'):
+                    groups.add('vendor_costs')
+            if not groups:
                 return
 
             # Collect all analytic account IDs from all lines
-            analytic_account_ids = set()
-
-            for line in lines_with_distribution:
-                try:
-                    for analytic_account_id_str in line.analytic_distribution.keys():
-                        try:
-                            analytic_account_id = int(analytic_account_id_str)
-                            analytic_account_ids.add(analytic_account_id)
-                        except (ValueError, TypeError):
-                            continue
-                except Exception as e:
-                    _logger.warning(f"Error parsing analytic_distribution for line {line.id}: {e}")
-                    continue
-
+            analytic_account_ids = lines_with_distribution._get_project_analytics_account_ids()
             if not analytic_account_ids:
                 return
 
-            # Batch-fetch all analytic accounts at once (performance optimization)
-            analytic_accounts = self.env['account.analytic.account'].browse(list(analytic_account_ids))
-
-            # Filter for project plan accounts only
-            project_analytic_accounts = analytic_accounts.filtered(
-                lambda a: a.exists() and a.plan_id == project_plan
+            # Projects of the accounts from the cached reverse index (projects plan only, no query)
+            project_ids = set(
+                self.env['project.project']._get_project_ids_by_analytic_accounts(analytic_account_ids)
             )
-
-            if not project_analytic_accounts:
+            if not project_ids:
                 return
 
-            # Find all projects linked to these analytic accounts in one query
-            # In Odoo 18, analytic_account_id was removed from projects, only use account_id
-            projects = self.env['project.project'].search([
-                ('account_id', 'in', project_analytic_accounts.ids)
-            ])
-
-            if not projects:
-                return
-
-            project_ids = set(projects.ids)
-
         except Exception as e:
             _logger.error(f"Error collecting projects for analytics recompute: {e}", exc_info=True)
             return
 
-        # Process projects and invalidate cache
-        if project_ids:
-            project_ids_list = list(project_ids)
-            chunk_size = 100  # Increased from 50 for better performance
-            total_projects = len(project_ids_list)
-
-            _logger.info(f"Invalidating cache and triggering recompute for {total_projects} project(s)")
-
-            for i in range(0, total_projects, chunk_size):
-                chunk = project_ids_list[i:i + chunk_size]
-                chunk_projects = self.env['project.project'].browse(chunk)
-
-                try:
-                    # CRITICAL: Invalidate cache first to ensure fresh data
-                    chunk_projects.invalidate_recordset()
-
-                    # Recompute financial data for this batch
-                    # This happens within the current transaction
-                    chunk_projects._compute_financial_data()
-
-                    # NO COMMIT HERE! We stay within the user's transaction
-                    # The data will be committed when the user's operation completes
-
-                    _logger.debug(f"Recomputed financial data for {len(chunk_projects)} project(s)")
-
-                except Exception as e:
-                    # Log error but don't break the user's transaction
-                    _logger.error(
-                        f"Error recomputing financial data for projects {chunk}: {e}",
-                        exc_info=True
-                    )
-                    # NO ROLLBACK HERE! Let Odoo handle transaction rollback if needed
-                    continue
+        # Only mark the projects dirty: they are recomputed once, right before commit
+        self.env['project.project']._schedule_financial_data_recompute(project_ids, groups)
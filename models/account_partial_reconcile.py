@@ -0,0 +1,63 @@
+from odoo import models, api
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class AccountPartialReconcile(models.Model):
+    _inherit = 'account.partial.reconcile'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """
+        Override create to refresh the paid amounts of the projects of reconciled customer invoices.
+
+        Reconciling a payment changes amount_residual of the invoice (a stored
+        computed field that does not go through account.move.write()), so neither
+        the journal item nor the move hooks see it.
+        """
+        partials = super().create(vals_list)
+        partials._trigger_project_analytics_recompute()
+        return partials
+
+    def unlink(self):
+        """
+        Override unlink to refresh the paid amounts when a payment is unreconciled.
+        """
+        # Trigger BEFORE deletion so the reconciled invoices are still known
+        self._trigger_project_analytics_recompute()
+        return super().unlink()
+
+    def _trigger_project_analytics_recompute(self):
+        """
+        Mark the projects of the reconciled customer invoices dirty (payments group only).
+
+        Only the paid amounts are recomputed from the new residuals: the invoiced
+        amounts, costs and labor fields of the projects are not touched.
+        """
+        invoices = (self.debit_move_id | self.credit_move_id).move_id.filtered(
+            lambda move: move.move_type in ('out_invoice', 'out_refund')
+        )
+        if not invoices:
+            return
+
+        # Analytic accounts of the invoices from the distribution index
+        Distribution = self.env['project.statistic.distribution']
+        Distribution._sync_pending()
+        self.env['account.move.line'].flush_model(['move_id'])
+        self.env.cr.execute("""
+            SELECT DISTINCT dist.analytic_account_id
+              FROM project_statistic_distribution dist
+              JOIN account_move_line aml ON aml.id = dist.move_line_id
+             WHERE aml.move_id = ANY(%s)
+        """, [invoices.ids])
+        analytic_account_ids = [row[0] for row in self.env.cr.fetchall()]
+        if not analytic_account_ids:
+            return
+
+        Project = self.env['project.project']
+        project_ids = Project._get_project_ids_by_analytic_accounts(analytic_account_ids)
+        _logger.debug(
+            f"Reconciliation of {len(invoices)} customer invoice(s): refreshing paid amounts of {len(project_ids)} project(s)"
+        )
+        Project._schedule_financial_data_recompute(project_ids, {'payments'})
@@ -1,4 +1,7 @@
 from odoo import models, fields, api
+import logging
+
+_logger = logging.getLogger(__name__)
 
 
 class HrEmployee(models.Model):
@@ -10,3 +13,45 @@ class HrEmployee(models.Model):
         help="Hourly Forecast Correction Factor. This factor is used to adjust the booked hours for this employee. "
              "Default is 1.0 (no adjustment). For example, 0.8 means 80% of booked hours count towards adjusted calculations."
     )
+
+    def write(self, vals):
+        """
+        Override write to recompute the labor fields of the projects the employees
+        booked time on when their HFC factor changes.
+        """
+        changed = self.browse()
+        if 'faktor_hfc' in vals:
+            changed = self.filtered(lambda employee: employee.faktor_hfc != vals['faktor_hfc'])
+
+        result = super().write(vals)
+
+        if changed:
+            changed._trigger_project_analytics_recompute()
+        return result
+
+    def _trigger_project_analytics_recompute(self):
+        """
+        Mark the projects with timesheets of these employees dirty (labor group only).
+
+        The analytic accounts are looked up with one query on the
+        (employee_id, account_id) index of account_analytic_line, so a factor
+        change only recomputes the projects the employees worked on, never the
+        whole portfolio.
+        """
+        self.env['account.analytic.line'].flush_model(['employee_id', 'account_id'])
+        self.env.cr.execute("""
+            SELECT DISTINCT account_id
+              FROM account_analytic_line
+             WHERE employee_id = ANY(%s)
+               AND account_id IS NOT NULL
+        """, [self.ids])
+        analytic_account_ids = [row[0] for row in self.env.cr.fetchall()]
+        if not analytic_account_ids:
+            return
+
+        Project = self.env['project.project']
+        project_ids = Project._get_project_ids_by_analytic_accounts(analytic_account_ids)
+        _logger.info(
+            f"HFC factor changed for {len(self)} employee(s): recomputing labor fields of {len(project_ids)} project(s)"
+        )
+        Project._schedule_financial_data_recompute(project_ids, {'labor'})
@@ -1,14 +1,120 @@
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
+from odoo.osv import expression
+from odoo.tools import SQL, float_is_zero
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from psycopg2.extras import execute_values
 import logging
-import json
+import time
 
 _logger = logging.getLogger(__name__)
 
+# Source fields the incremental mode maintains by applying per-line deltas.
+# All other amounts are derived from them (see _get_derived_financial_values).
+INCREMENTAL_FIELDS = (
+    'customer_invoiced_amount_net',
+    'customer_invoiced_amount_gross',
+    'vendor_bills_total_net',
+    'vendor_bills_total_gross',
+    'customer_skonto_taken',
+    'vendor_skonto_received',
+    'total_hours_booked',
+    'labor_costs',
+    'total_hours_booked_adjusted',
+    'other_costs_net',
+)
+
+# Source fields stored per project and calendar month (project.statistic.monthly).
+# The lifetime fields of a project are the sum of its monthly buckets.
+MONTHLY_FIELDS = INCREMENTAL_FIELDS + (
+    'customer_paid_amount_net',
+    'customer_paid_amount_gross',
+)
+
+# Hybrid layout (see OPTIMIZATION_PROPOSAL.md): only the core aggregation and sort
+# fields are stored. The detail fields (gross amounts, skonto, other costs, ...) are
+# computed on demand from the monthly buckets by _compute_financial_details().
+# The stored fields live in project.statistic.aggregate, delegated to the project.
+STORED_FINANCIAL_FIELDS = (
+    'customer_invoiced_amount_net',
+    'vendor_bills_total_net',
+    'total_hours_booked',
+    'labor_costs',
+    'labor_costs_adjusted',
+    'profit_loss_net',
+    'sale_order_amount_net',
+    'sale_order_tax_names',
+    'sale_order_tax_ids',
+    'has_analytic_account',
+    'data_availability_status',
+)
+
+# Non-stored detail fields, computed from the monthly buckets by _compute_financial_details()
+DETAIL_FINANCIAL_FIELDS = (
+    'customer_paid_amount_net',
+    'customer_outstanding_amount_net',
+    'customer_invoiced_amount_gross',
+    'customer_paid_amount_gross',
+    'customer_outstanding_amount_gross',
+    'vendor_bills_total_gross',
+    'customer_skonto_taken',
+    'vendor_skonto_received',
+    'total_hours_booked_adjusted',
+    'other_costs_net',
+    'total_costs_net',
+    'negative_difference_net',
+)
+
+# Stored source fields per field group. Triggers recompute only the groups their
+# source can affect; the derived totals (outstanding, total costs, profit/loss)
+# are recalculated from the stored group results.
+FIELD_GROUPS = {
+    'revenue': ('customer_invoiced_amount_net', 'customer_invoiced_amount_gross'),
+    'payments': ('customer_paid_amount_net', 'customer_paid_amount_gross'),
+    'vendor_costs': ('vendor_bills_total_net', 'vendor_bills_total_gross'),
+    'skonto': ('customer_skonto_taken', 'vendor_skonto_received'),
+    'labor': ('total_hours_booked', 'labor_costs', 'total_hours_booked_adjusted'),
+    'other_costs': ('other_costs_net',),
+    'sales_orders': ('sale_order_amount_net', 'sale_order_tax_names', 'sale_order_tax_ids'),
+}
+
+# Hours are not money: they are compared with a fixed precision (two decimals,
+# as displayed) instead of the currency rounding of the project.
+HOURS_FIELDS = ('total_hours_booked', 'total_hours_booked_adjusted')
+HOURS_PRECISION_ROUNDING = 0.01
+
+# Batch-wide settings of a financial data compute, resolved once per registry
+# (see _get_compute_context). Only IDs and plain values: safe to share across
+# environments and threads.
+ComputeContext = namedtuple('ComputeContext', [
+    'project_plan_id',              # account.analytic.plan ID of the projects plan, or None
+    'general_hourly_rate',          # float, rate for the adjusted labor costs
+    'customer_skonto_account_ids',  # frozenset of account.account IDs
+    'vendor_skonto_account_ids',    # frozenset of account.account IDs
+])
+
 
 class ProjectAnalytics(models.Model):
     _inherit = 'project.project'
+    _inherits = {'project.statistic.aggregate': 'statistic_id'}
     _description = 'Project Analytics Extension'
 
+    # Stored aggregates (STORED_FINANCIAL_FIELDS) live in their own one-to-one table and
+    # are read through delegation: recomputes never write (or lock) the project row.
+    statistic_id = fields.Many2one(
+        'project.statistic.aggregate',
+        string='Financial Statistics',
+        required=True,
+        ondelete='cascade',
+        auto_join=True,
+        index=True,
+        copy=False,
+    )
+
+    _sql_constraints = [
+        ('statistic_uniq', 'unique(statistic_id)', 'A statistics record belongs to exactly one project.'),
+    ]
+
     # Currency field for monetary widgets
     currency_id = fields.Many2one(
         'res.currency',
@@ -40,191 +146,132 @@ class ProjectAnalytics(models.Model):
     )
 
     # Data Availability Status
-    has_analytic_account = fields.Boolean(
-        string='Has Analytic Account',
-        compute='_compute_financial_data',
-        store=True,
-        help="Indicates whether this project has a valid analytic account for financial tracking. If False, no financial data can be calculated."
-    )
     analytic_status_display = fields.Char(
         string='Analytic Status',
         compute='_compute_analytic_status_display',
         store=False,
         help="Display text for analytic account status: 'Has Account' or 'No Account'"
     )
-    data_availability_status = fields.Selection([
-        ('available', 'Data Available'),
-        ('no_analytic_account', 'No Analytic Account'),
-    ], string='Data Status',
-        compute='_compute_financial_data',
-        store=True,
-        help="Shows whether financial data is available for this project. 'No Analytic Account' means the project is not configured for financial tracking."
-    )
 
     # Sales Order fields (from linked sale orders)
-    sale_order_amount_net = fields.Float(
-        string='Sales Orders (NET)',
-        compute='_compute_financial_data',
-        store=True,
-        aggregator='sum',
-        help="Total amount (NET) of all confirmed sales orders linked to this project. Only includes orders in 'sale' or 'done' state. If no sales orders are linked, uses manual_sales_order_amount_net as fallback."
-    )
     manual_sales_order_amount_net = fields.Float(
         string='Manual Sales Order Amount (NET)',
         default=0.0,
         help="Fallback sales order amount for projects without linked sales orders. This value will be used if no sales orders are found."
     )
-    sale_order_tax_names = fields.Char(
-        string='SO Tax Codes',
-        compute='_compute_financial_data',
-        store=True,
-        help="Tax codes used in confirmed sales orders linked to this project. Multiple taxes are shown as comma-separated values."
-    )
 
     # Customer Invoice fields - NET (without tax)
-    customer_invoiced_amount_net = fields.Float(
-        string='Invoiced Amount (Net)',
-        compute='_compute_financial_data',
-        store=True,
-        aggregator='sum',
-        help="Net amount invoiced to customers (without VAT/tax). This is the base amount before taxes are added. Uses price_subtotal from invoice lines."
-    )
     customer_paid_amount_net = fields.Float(
         string='Paid Amount (Net)',
-        compute='_compute_financial_data',
-        store=True,
-        aggregator='sum',
+        compute='_compute_financial_details',
+        store=False,
         help="Net amount actually paid by customers (without VAT/tax). Calculated proportionally based on invoice payment status."
     )
     customer_outstanding_amount_net = fields.Float(
         string='Outstanding Amount (Net)',
-        compute='_compute_financial_data',
-        store=True,
-        aggregator='sum',
+        compute='_compute_financial_details',
+        store=False,
         help="Net amount still owed by customers (without VAT/tax). This is Invoiced Net - Paid Net."
     )
 
     # Customer Invoice fields - GROSS (with tax)
     customer_invoiced_amount_gross = fields.Float(
         string='Invoiced Amount (Gross)',
-        compute='_compute_financial_data',
-        store=True,
-        aggregator='sum',
+        compute='_compute_financial_details',
+        store=False,
         help="Gross amount invoiced to customers (with VAT/tax). This is the total amount including all taxes. Uses price_total from invoice lines."
     )
     customer_paid_amount_gross = fields.Float(
         string='Paid Amount (Gross)',
-        compute='_compute_financial_data',
-        store=True,
-        aggregator='sum',
+        compute='_compute_financial_details',
+        store=False,
         help="Gross amount actually paid by customers (with VAT/tax). Calculated proportionally based on invoice payment status."
     )
     customer_outstanding_amount_gross = fields.Float(
         string='Outstanding Amount (Gross)',
-        compute='_compute_financial_data',
-        store=True,
-        aggregator='sum',
+        compute='_compute_financial_details',
+        store=False,
         help="Gross amount still owed by customers (with VAT/tax). This is Invoiced Gross - Paid Gross."
     )
 
-    # Vendor Bill fields - NET (without tax)
-    vendor_bills_total_net = fields.Float(
-        string='Vendor Bills (Net)',
-        compute='_compute_financial_data',
-        store=True,
-        aggregator='sum',
-        help="Net amount of vendor bills (without VAT/tax). This is the base cost before taxes. Uses price_subtotal from bill lines."
-    )
-
     # Vendor Bill fields - GROSS (with tax)
     vendor_bills_total_gross = fields.Float(
         string='Vendor Bills (Gross)',
-        compute='_compute_financial_data',
-        store=True,
-        aggregator='sum',
+        compute='_compute_financial_details',
+        store=False,
         help="Gross amount of vendor bills (with VAT/tax). This is the total cost including all taxes. Uses price_total from bill lines."
     )
 
     # Skonto (Cash Discount) fields
     customer_skonto_taken = fields.Float(
         string='Customer Cash Discounts (Skonto)',
-        compute='_compute_financial_data',
-        store=True,
-        aggregator='sum',
+        compute='_compute_financial_details',
+        store=False,
         help="Cash discounts granted to customers for early payment (Gewährte Skonti). This reduces project revenue. Calculated from expense accounts 7300-7303 and liability account 2130."
     )
     vendor_skonto_received = fields.Float(
         string='Vendor Cash Discounts Received',
-        compute='_compute_financial_data',
-        store=True,
-        aggregator='sum',
+        compute='_compute_financial_details',
+        store=False,
         help="Cash discounts received from vendors for early payment (Erhaltene Skonti). This reduces project costs and increases profit. Calculated from income accounts 4730-4733 and asset account 2670."
     )
 
     # Labor/Timesheet fields
-    total_hours_booked = fields.Float(
-        string='Total Hours Booked',
-        compute='_compute_financial_data',
-        store=True,
-        aggregator='sum',
-        help="Total hours logged in timesheets for this project (Gebuchte Stunden). This includes all timesheet entries from employees working on this project. Used to track resource utilization and calculate labor costs."
-    )
-    labor_costs = fields.Float(
-        string='Labor Costs',
-        compute='_compute_financial_data',
-        store=True,
-        aggregator='sum',
-        help="Total cost of labor based on timesheets (Personalkosten). Calculated from timesheet entries multiplied by employee hourly rates. This is a major component of internal project costs. NET amount (no VAT on internal labor)."
-    )
     total_hours_booked_adjusted = fields.Float(
         string='Total Hours Booked (Adjusted)',
-        compute='_compute_financial_data',
-        store=True,
-        aggregator='sum',
+        compute='_compute_financial_details',
+        store=False,
         help="Adjusted total hours based on employee HFC (Hourly Forecast Correction) factors. Formula: sum(hours * employee.faktor_hfc). This provides a more accurate forecast of actual work effort by adjusting for employee efficiency factors."
     )
-    labor_costs_adjusted = fields.Float(
-        string='Labor Costs (Adjusted)',
-        compute='_compute_financial_data',
-        store=True,
-        aggregator='sum',
-        help="Adjusted labor costs calculated using general hourly rate from system parameters. Formula: total_hours_booked_adjusted * general_hourly_rate. Default rate is 66 EUR per hour. This provides standardized cost calculation across all employees."
-    )
 
     # Other Cost fields
     other_costs_net = fields.Float(
         string='Other Costs (Net)',
-        compute='_compute_financial_data',
-        store=True,
-        aggregator='sum',
+        compute='_compute_financial_details',
+        store=False,
         help="Other internal costs excluding labor and vendor bills (net amount without VAT). These are miscellaneous project expenses tracked via analytic lines."
     )
 
     # Total Cost fields - NET (without tax)
     total_costs_net = fields.Float(
         string='Total Costs (Net)',
-        compute='_compute_financial_data',
-        store=True,
-        aggregator='sum',
+        compute='_compute_financial_details',
+        store=False,
         help="Total internal project costs without tax (Nettokosten). Calculated as: Labor Costs + Other Costs (Net). Vendor bills are tracked separately. All amounts are NET (without VAT)."
     )
 
     # Summary fields - NET-based calculations
-    profit_loss_net = fields.Float(
-        string='Profit/Loss (Net)',
-        compute='_compute_financial_data',
-        store=True,
-        aggregator='sum',
-        help="Project profitability based on NET amounts (Gewinn/Verlust Netto). Formula: (Invoiced Net - Customer Skonto) - (Vendor Bills Net - Vendor Skonto + Total Costs Net). Consistent NET-to-NET calculation for accurate accounting. A positive value indicates profit, negative indicates loss."
-    )
     negative_difference_net = fields.Float(
         string='Losses (Net)',
-        compute='_compute_financial_data',
-        store=True,
-        aggregator='sum',
+        compute='_compute_financial_details',
+        store=False,
         help="Total project losses as a positive number, NET basis (Verluste Netto). This shows the absolute value of negative profit/loss. If profit/loss is positive, this field is 0. Useful for tracking and reporting total losses."
     )
 
+    # Asynchronous recompute queue status
+    financial_data_stale_since = fields.Datetime(
+        string='Stale Since',
+        compute='_compute_financial_data_stale_since',
+        store=False,
+        help="Set while the project waits in the recompute queue (asynchronous recompute mode). "
+             "The financial figures shown are outdated since this date and will be refreshed by the scheduled job."
+    )
+
+    def _compute_financial_data_stale_since(self):
+        """
+        Read the queue date of each project from the recompute queue (one search per batch).
+        """
+        queue_items = self.env['project.statistic.queue'].sudo().search([
+            ('project_id', 'in', self.ids),
+        ])
+        stale_since = {}
+        for item in queue_items:
+            # A project may have a regular and a requeued item: the oldest one counts
+            project_id = item.project_id.id
+            stale_since[project_id] = min(stale_since.get(project_id, item.stale_since), item.stale_since)
+        for project in self:
+            project.financial_data_stale_since = stale_since.get(project.id, False)
+
     @api.depends('has_analytic_account')
     def _compute_analytic_status_display(self):
         """
@@ -237,7 +284,48 @@ class ProjectAnalytics(models.Model):
             else:
                 project.analytic_status_display = 'No Account'
 
-    @api.depends('account_id')
+    @api.model_create_multi
+    def create(self, vals_list):
+        projects = super().create(vals_list)
+        if projects.filtered('account_id'):
+            # Reverse index analytic account -> projects of the recompute triggers
+            self._clear_statistic_cache()
+        # The figures are no computed fields any more: fill the new statistics records
+        # through the regular path (precommit flush, queue or bulk mode)
+        self._schedule_financial_data_recompute(set(projects.ids))
+        return projects
+
+    def write(self, vals):
+        had_account = 'account_id' in vals and bool(self.filtered('account_id'))
+        result = super().write(vals)
+        if had_account or vals.get('account_id') or ('active' in vals and self.filtered('account_id')):
+            self._clear_statistic_cache()
+        if 'account_id' in vals:
+            # The figures are no computed fields any more: recompute them for the new account
+            self._schedule_financial_data_recompute(set(self.ids))
+        return result
+
+    def unlink(self):
+        # The delegation does not delete the parent records: remove the statistics with the projects
+        statistics = self.statistic_id
+        had_account = bool(self.filtered('account_id'))
+        result = super().unlink()
+        statistics.sudo().unlink()
+        if had_account:
+            self._clear_statistic_cache()
+        return result
+
+    @api.model
+    def _clear_statistic_cache(self):
+        """
+        Invalidate the cached compute context and the analytic account index.
+
+        Both are ormcaches of the 'default' registry cache: only that cache is
+        cleared (not the templates, assets, routing or groups caches), and the
+        callers only clear it when an input of these two caches really changed.
+        """
+        self.env.registry.clear_cache('default')
+
     def _compute_financial_data(self):
         """
         Compute all financial data for the project based on analytic account lines.
@@ -249,88 +337,117 @@ class ProjectAnalytics(models.Model):
         for customer invoices and vendor bills. Profit/Loss is calculated on NET basis for
         accurate accounting (comparing apples to apples).
 
-        Dependencies:
-        - account_id: Triggers recompute when project's analytic account changes
+        BATCH ENGINE: The whole recordset is computed at once. Every data source
+        (invoices, bills, skonto, timesheets, other costs, sales orders) is read
+        with a fixed number of queries grouped by analytic account, so the cost of
+        a refresh no longer grows with (projects x move lines).
 
-        Additional triggers:
-        1. account.move.line records with analytic_distribution change (via hooks in account_move_line.py)
-        2. account.analytic.line records change (via hooks in account_analytic_line.py)
-        3. Manual trigger via the "Refresh Financial Data" wizard
-        4. Explicit call to _compute_financial_data()
+        Triggers:
+        1. project.project: creating a project or changing its analytic account
+        2. account.move.line records with analytic_distribution change (via hooks in account_move_line.py)
+        3. account.analytic.line records change (via hooks in account_analytic_line.py)
+        4. Manual trigger via the "Refresh Financial Data" wizard
+        5. Explicit call to _compute_financial_data()
 
-        This hybrid approach (depends + triggers) ensures data is always fresh when:
-        - The project's analytic account changes
-        - Invoices, bills, or timesheets are created/modified/deleted
+        The line triggers only mark the projects dirty, they are computed once
+        before commit (see _schedule_financial_data_recompute).
+
+        MONTHLY BUCKETS: The source figures are aggregated per calendar month and
+        stored in project.statistic.monthly together with the project fields. The
+        lifetime fields are the sum of these buckets.
+
+        STATISTICS TABLE: The stored figures live in project.statistic.aggregate
+        (one record per project, read through delegation). Only the fields whose
+        value really changed are written, with one bulk UPDATE on that table for
+        the whole recordset (see _write_financial_values); the project row is
+        neither updated nor locked.
+
+        Returns:
+            dict: {'projects': int, 'fields': int} changed projects and field values
         """
+        projects = self.filtered('id')  # skip NewIds (onchange)
+        monthly_values = projects._get_monthly_financial_values()
+        values_by_project = projects._get_financial_data_values(monthly_values)
+        self.env['project.statistic.monthly']._store_monthly_values(projects.ids, monthly_values)
+        # The buckets changed: cached detail fields are outdated
+        projects.invalidate_recordset(DETAIL_FINANCIAL_FIELDS)
+        return projects._write_financial_values(values_by_project)
+
+    @api.depends(
+        'customer_invoiced_amount_net', 'vendor_bills_total_net', 'total_hours_booked',
+        'labor_costs', 'labor_costs_adjusted', 'profit_loss_net',
+    )
+    def _compute_financial_details(self):
+        """
+        Compute the non-stored detail fields (hybrid layout).
+
+        Batched: one grouped query on the monthly buckets for the whole
+        recordset, no journal items or analytic lines are read. The detail fields
+        are invalidated whenever the stored core fields are rewritten.
+
+        Projects without buckets (queued for their first full recompute after an
+        upgrade) fall back to their stored core figures; the figures that are
+        only kept in the buckets (paid, gross, skonto, other costs) are 0.0 until
+        the recompute.
+        """
+        Monthly = self.env['project.statistic.monthly']
+        project_ids = [project_id for project_id in self.ids if project_id]
+        totals = Monthly._get_project_totals(project_ids)
+        bucketed_ids = Monthly._get_bucketed_project_ids(project_ids)
+        general_hourly_rate = self._get_general_hourly_rate()
+        empty_totals = dict.fromkeys(MONTHLY_FIELDS, 0.0)
+
         for project in self:
-            # Initialize all fields
-            customer_invoiced_amount_net = 0.0
-            customer_paid_amount_net = 0.0
-            customer_outstanding_amount_net = 0.0
-            customer_invoiced_amount_gross = 0.0
-            customer_paid_amount_gross = 0.0
-            customer_outstanding_amount_gross = 0.0
+            if project.id in bucketed_ids:
+                values = dict(totals[project.id])
+            else:
+                values = dict(
+                    empty_totals,
+                    customer_invoiced_amount_net=project.customer_invoiced_amount_net,
+                    vendor_bills_total_net=project.vendor_bills_total_net,
+                    total_hours_booked=project.total_hours_booked,
+                    labor_costs=project.labor_costs,
+                    total_hours_booked_adjusted=(
+                        project.labor_costs_adjusted / general_hourly_rate if general_hourly_rate
+                        else project.total_hours_booked
+                    ),
+                )
+            values.update(self._get_derived_financial_values(values, general_hourly_rate))
+            if project.id not in bucketed_ids:
+                values['negative_difference_net'] = abs(min(0.0, project.profit_loss_net))
+            project.update({field_name: values[field_name] for field_name in DETAIL_FINANCIAL_FIELDS})
 
-            vendor_bills_total_net = 0.0
-            vendor_bills_total_gross = 0.0
+    def _get_financial_data_values(self, monthly_values=None):
+        """
+        Compute the financial field values of all projects in the recordset without
+        assigning them. Used by _compute_financial_data() and by the verifier of
+        the incremental mode.
 
-            customer_skonto_taken = 0.0
-            vendor_skonto_received = 0.0
+        The lifetime source fields are the sum of the monthly buckets, the derived
+        fields (outstanding, total costs, profit/loss, ...) are computed from them.
 
-            sale_order_amount_net = 0.0
-            sale_order_tax_names = ''
+        Args:
+            monthly_values: result of _get_monthly_financial_values(), computed if not given
 
-            total_hours_booked = 0.0
-            labor_costs = 0.0
-            other_costs_net = 0.0
-            total_costs_net = 0.0
+        Returns:
+            dict: {project_id: {field_name: value}} including the status fields
+        """
+        result = {}
+        if not self:
+            return result
 
-            profit_loss_net = 0.0
-            negative_difference_net = 0.0
+        if monthly_values is None:
+            monthly_values = self._get_monthly_financial_values()
 
-            # Get the analytic account associated with the project (projects plan ONLY)
-            analytic_account = None
+        # Batch-wide settings come from the cached compute context (not once per project)
+        general_hourly_rate = self._get_general_hourly_rate()
 
-            # Get the standard project analytic plan reference
-            # In Odoo 18, analytic_account_id was removed from projects
-            # Projects now use account_id for their primary analytic account
-            try:
-                project_plan = self.env.ref('analytic.analytic_plan_projects', raise_if_not_found=False)
-            except Exception as e:
-                _logger.warning(f"Could not load external ID 'analytic.analytic_plan_projects': {e}")
-                project_plan = None
-
-            # FALLBACK: If external ID not found, search for plan by name
-            if not project_plan:
-                try:
-                    project_plan = self.env['account.analytic.plan'].search([
-                        ('name', 'ilike', 'project')
-                    ], limit=1)
-                    if project_plan:
-                        _logger.info(f"Using analytic plan '{project_plan.name}' (ID: {project_plan.id}) as projects plan")
-                except Exception as e:
-                    _logger.error(f"Could not find projects analytic plan: {e}")
-
-            # In Odoo 18, use account_id (analytic_account_id was removed)
-            if hasattr(project, 'account_id') and project.account_id:
-                # Verify this is the project plan (if we have one)
-                if project_plan:
-                    if hasattr(project.account_id, 'plan_id') and project.account_id.plan_id == project_plan:
-                        analytic_account = project.account_id
-                    else:
-                        _logger.debug(
-                            f"Project '{project.name}' has analytic account '{project.account_id.name}' "
-                            f"but it belongs to plan '{project.account_id.plan_id.name if project.account_id.plan_id else 'None'}', "
-                            f"not the projects plan '{project_plan.name}'"
-                        )
-                else:
-                    # No project plan found, use any analytic account
-                    analytic_account = project.account_id
-                    _logger.warning(
-                        f"No projects analytic plan found, using account '{analytic_account.name}' without plan verification"
-                    )
+        # Projects with a valid analytic account (projects plan) have an entry in monthly_values
+        projects_with_account = self.filtered(lambda p: p.id in monthly_values)
+        sales_order_totals = self._get_sales_order_totals(projects_with_account)
 
-            if not analytic_account:
+        for project in self:
+            if project.id not in monthly_values:
                 _logger.warning(
                     f"Project '{project.name}' (ID: {project.id}) has no analytic account linked. "
                     f"Financial data cannot be calculated. Please ensure: "
@@ -338,430 +455,1511 @@ class ProjectAnalytics(models.Model):
                     f"2) This project has an analytic account assigned (Projects plan), "
                     f"3) Invoice/bill lines have analytic_distribution set."
                 )
-                # Set status fields
-                project.has_analytic_account = False
-                project.data_availability_status = 'no_analytic_account'
-
-                # Set all fields to 0.0 (not -1.0) to indicate no data
-                project.customer_invoiced_amount_net = 0.0
-                project.customer_paid_amount_net = 0.0
-                project.customer_outstanding_amount_net = 0.0
-                project.customer_invoiced_amount_gross = 0.0
-                project.customer_paid_amount_gross = 0.0
-                project.customer_outstanding_amount_gross = 0.0
-                project.vendor_bills_total_net = 0.0
-                project.vendor_bills_total_gross = 0.0
-                project.customer_skonto_taken = 0.0
-                project.vendor_skonto_received = 0.0
-                project.sale_order_amount_net = 0.0
-                project.sale_order_tax_names = ''
-                project.total_hours_booked = 0.0
-                project.labor_costs = 0.0
-                project.other_costs_net = 0.0
-                project.total_costs_net = 0.0
-                project.profit_loss_net = 0.0
-                project.negative_difference_net = 0.0
+                # Set status fields and all amounts to 0.0 (not -1.0) to indicate no data
+                result[project.id] = dict(
+                    self._get_empty_financial_values(),
+                    has_analytic_account=False,
+                    data_availability_status='no_analytic_account',
+                )
                 continue
 
-            # 1. Calculate Customer Invoices (Revenue) - Both NET and GROSS
-            customer_data = self._get_customer_invoices_from_analytic(analytic_account)
-            customer_invoiced_amount_net = customer_data['invoiced_net']
-            customer_paid_amount_net = customer_data['paid_net']
-            customer_invoiced_amount_gross = customer_data['invoiced_gross']
-            customer_paid_amount_gross = customer_data['paid_gross']
-
-            # 2. Calculate Vendor Bills (Direct Costs) - Both NET and GROSS
-            vendor_data = self._get_vendor_bills_from_analytic(analytic_account)
-            vendor_bills_total_net = vendor_data['total_net']
-            vendor_bills_total_gross = vendor_data['total_gross']
-
-            # 3. Calculate Skonto (Cash Discounts) from analytic lines
-            skonto_data = self._get_skonto_from_analytic(analytic_account)
-            customer_skonto_taken = skonto_data['customer_skonto']
-            vendor_skonto_received = skonto_data['vendor_skonto']
-
-            # 3a. Calculate Sales Order data (confirmed orders linked to project)
-            sales_order_data = self._get_sales_order_data(project)
-            sale_order_amount_net = sales_order_data['amount_net']
-            sale_order_tax_names = sales_order_data['tax_names']
-
-            # 4. Calculate Labor Costs (Timesheets) - NET amount
-            timesheet_data = self._get_timesheet_costs(analytic_account)
-            total_hours_booked = timesheet_data['hours']
-            labor_costs = timesheet_data['costs']
-            total_hours_booked_adjusted = timesheet_data['adjusted_hours']
-
-            # 4a. Calculate Adjusted Labor Costs using general hourly rate from system parameters
-            general_hourly_rate = float(
-                self.env['ir.config_parameter'].sudo().get_param(
-                    'project_statistic.general_hourly_rate', default='66.0'
-                )
+            values = self._get_financial_values(
+                source_values=self._sum_monthly_values(monthly_values[project.id]),
+                sales_order_data=sales_order_totals[project.id],
+                general_hourly_rate=general_hourly_rate,
             )
-            labor_costs_adjusted = total_hours_booked_adjusted * general_hourly_rate
 
-            # 5. Calculate Other Costs (non-timesheet, non-bill analytic lines) - NET amount
-            other_costs_net = self._get_other_costs_from_analytic(analytic_account)
+            # Status fields (data available) and all computed fields
+            result[project.id] = dict(
+                values,
+                has_analytic_account=True,
+                data_availability_status='available',
+            )
 
-            # 6. Calculate totals
-            customer_outstanding_amount_net = customer_invoiced_amount_net - customer_paid_amount_net
-            customer_outstanding_amount_gross = customer_invoiced_amount_gross - customer_paid_amount_gross
+        return result
 
-            total_costs_net = labor_costs + other_costs_net
+    def _get_monthly_financial_values(self, groups=None):
+        """
+        Aggregate the source figures of the projects per calendar month.
 
-            # 7. Calculate Profit/Loss - NET basis (consistent comparison)
-            # Formula: (Revenue NET - Customer Skonto) - (Vendor Bills NET - Vendor Skonto + Internal Costs NET)
-            # This ensures we're comparing NET revenue to NET costs (apples to apples)
-            adjusted_revenue_net = customer_invoiced_amount_net - customer_skonto_taken
-            adjusted_vendor_costs_net = vendor_bills_total_net - vendor_skonto_received
-            profit_loss_net = adjusted_revenue_net - (adjusted_vendor_costs_net + total_costs_net)
-            negative_difference_net = abs(min(0, profit_loss_net))
+        Every data source (invoices, bills, skonto, timesheets, other costs) is
+        read once for the whole batch, grouped by analytic account and month.
+        With `groups`, only the sources of these field groups are read; the
+        fields of the other groups are 0.0 in the result.
+        Invoices and bills are bucketed by the accounting date of the journal
+        item, analytic lines by their date. Paid amounts stay in the month of the
+        invoice they belong to.
 
-            # Update status fields (data available)
-            project.has_analytic_account = True
-            project.data_availability_status = 'available'
+        Args:
+            groups: iterable of FIELD_GROUPS keys, None for all groups
 
-            # Update all computed fields
-            project.customer_invoiced_amount_net = customer_invoiced_amount_net
-            project.customer_paid_amount_net = customer_paid_amount_net
-            project.customer_outstanding_amount_net = customer_outstanding_amount_net
-            project.customer_invoiced_amount_gross = customer_invoiced_amount_gross
-            project.customer_paid_amount_gross = customer_paid_amount_gross
-            project.customer_outstanding_amount_gross = customer_outstanding_amount_gross
+        Returns:
+            dict: {project_id: {month: {field_name: amount}}} for every project with
+                  a valid analytic account (projects plan); month is the first day
+                  of the month (date)
+        """
+        result = {}
+        if not self:
+            return result
 
-            project.vendor_bills_total_net = vendor_bills_total_net
-            project.vendor_bills_total_gross = vendor_bills_total_gross
+        groups = set(FIELD_GROUPS if groups is None else groups)
 
-            project.customer_skonto_taken = customer_skonto_taken
-            project.vendor_skonto_received = vendor_skonto_received
+        project_plan = self._get_compute_context_plan()
 
-            project.sale_order_amount_net = sale_order_amount_net
-            project.sale_order_tax_names = sale_order_tax_names
+        # 1. Get the analytic account of every project (projects plan ONLY)
+        project_accounts = {
+            project.id: self._get_project_analytic_account(project, project_plan)
+            for project in self
+        }
+        analytic_account_ids = sorted({
+            account.id for account in project_accounts.values() if account
+        })
+
+        # 2. Aggregate the data sources of the requested groups, grouped by analytic account and month
+        def get_totals(source_groups, method):
+            if not groups & set(source_groups):
+                return {account_id: {} for account_id in analytic_account_ids}
+            return method(analytic_account_ids)
+
+        # Invoiced and paid amounts come from the same customer invoice query
+        customer_totals = get_totals(('revenue', 'payments'), self._get_customer_invoice_totals)
+        vendor_totals = get_totals(('vendor_costs',), self._get_vendor_bill_totals)
+        skonto_totals = get_totals(('skonto',), self._get_skonto_totals)
+        timesheet_totals = get_totals(('labor',), self._get_timesheet_totals)
+        other_costs_totals = get_totals(('other_costs',), self._get_other_costs_totals)
+
+        if self._is_diagnostics_mode() and groups & {'revenue', 'vendor_costs'}:
+            self._log_move_line_diagnostics()
+            self._log_batch_summary(analytic_account_ids, customer_totals, vendor_totals)
+
+        # 3. Build the monthly buckets of every project
+        for project in self:
+            analytic_account = project_accounts[project.id]
+            if not analytic_account:
+                continue
 
-            project.total_hours_booked = total_hours_booked
-            project.labor_costs = labor_costs
-            project.total_hours_booked_adjusted = total_hours_booked_adjusted
-            project.labor_costs_adjusted = labor_costs_adjusted
-            project.other_costs_net = other_costs_net
-            project.total_costs_net = total_costs_net
+            account_id = analytic_account.id
+            months = (
+                set(customer_totals[account_id]) | set(vendor_totals[account_id])
+                | set(skonto_totals[account_id]) | set(timesheet_totals[account_id])
+                | set(other_costs_totals[account_id])
+            )
+            result[project.id] = {
+                month: self._get_monthly_bucket_values(
+                    customer_data=customer_totals[account_id].get(month, {}),
+                    vendor_data=vendor_totals[account_id].get(month, {}),
+                    skonto_data=skonto_totals[account_id].get(month, {}),
+                    timesheet_data=timesheet_totals[account_id].get(month, {}),
+                    other_costs_net=other_costs_totals[account_id].get(month, 0.0),
+                )
+                for month in months
+            }
 
-            project.profit_loss_net = profit_loss_net
-            project.negative_difference_net = negative_difference_net
+        return result
 
-    def _get_customer_invoices_from_analytic(self, analytic_account):
+    @api.model
+    def _get_monthly_bucket_values(self, customer_data, vendor_data, skonto_data, timesheet_data, other_costs_net):
         """
-        Get customer invoices and credit notes via analytic_distribution in account.move.line.
-        This is the Odoo v18 way to link invoices to projects.
+        Combine the aggregated source data of one project and month into a bucket.
 
-        IMPORTANT: We calculate BOTH NET and GROSS amounts:
-        - NET: price_subtotal (base amount without taxes)
-        - GROSS: price_total (total amount including all taxes)
+        Returns:
+            dict: {field_name: amount} for all MONTHLY_FIELDS
+        """
+        return {
+            'customer_invoiced_amount_net': customer_data.get('invoiced_net', 0.0),
+            'customer_paid_amount_net': customer_data.get('paid_net', 0.0),
+            'customer_invoiced_amount_gross': customer_data.get('invoiced_gross', 0.0),
+            'customer_paid_amount_gross': customer_data.get('paid_gross', 0.0),
+            'vendor_bills_total_net': vendor_data.get('total_net', 0.0),
+            'vendor_bills_total_gross': vendor_data.get('total_gross', 0.0),
+            'customer_skonto_taken': skonto_data.get('customer_skonto', 0.0),
+            'vendor_skonto_received': skonto_data.get('vendor_skonto', 0.0),
+            'total_hours_booked': timesheet_data.get('hours', 0.0),
+            'labor_costs': timesheet_data.get('costs', 0.0),
+            'total_hours_booked_adjusted': timesheet_data.get('adjusted_hours', 0.0),
+            'other_costs_net': other_costs_net,
+        }
 
-        We must calculate the project portion based on invoice LINE amounts,
-        not full invoice amounts, because different lines may go to different projects.
+    @api.model
+    def _sum_monthly_values(self, monthly_values):
+        """
+        Sum the monthly buckets of one project into lifetime totals.
 
-        Handles both:
-        - out_invoice: Customer invoices (positive revenue)
-        - out_refund: Customer credit notes (negative revenue)
+        Args:
+            monthly_values: {month: {field_name: amount}}
+
+        Returns:
+            dict: {field_name: amount} for all MONTHLY_FIELDS
+        """
+        totals = dict.fromkeys(MONTHLY_FIELDS, 0.0)
+        for values in monthly_values.values():
+            for field_name in MONTHLY_FIELDS:
+                totals[field_name] += values.get(field_name, 0.0)
+        return totals
+
+    def _recompute_financial_groups(self, groups):
+        """
+        Recompute only some field groups of the projects.
+
+        Only the data sources of the given groups are read: the group's columns
+        of the monthly buckets are rebuilt, the group's lifetime fields re-summed
+        from the buckets, and the derived totals recalculated from the stored
+        results of all groups. A timesheet change therefore never reads invoice
+        or bill tables. Projects without buckets have no stored group results to
+        re-sum and are computed in full.
+
+        Args:
+            groups: iterable of FIELD_GROUPS keys
+        """
+        groups = set(groups)
+        if groups >= set(FIELD_GROUPS):
+            self._compute_financial_data()
+            return
+
+        project_plan = self._get_compute_context_plan()
+        # Projects without analytic account have no data; an account change recomputes everything
+        projects = self.filtered(lambda p: self._get_project_analytic_account(p, project_plan))
+        if not projects:
+            return
+
+        # The other groups are re-summed from the buckets: projects without buckets
+        # yet (upgrade, last computed before the buckets existed) are computed in full
+        Monthly = self.env['project.statistic.monthly']
+        bucketed_ids = Monthly._get_bucketed_project_ids(projects.ids)
+        unbucketed = projects.filtered(lambda p: p.id not in bucketed_ids)
+        if unbucketed:
+            unbucketed._compute_financial_data()
+            projects -= unbucketed
+            if not projects:
+                return
+
+        bucket_fields = [
+            field_name for group in groups if group != 'sales_orders'
+            for field_name in FIELD_GROUPS[group]
+        ]
+        values_by_project = {project.id: {} for project in projects}
+
+        if bucket_fields:
+            monthly_values = projects._get_monthly_financial_values(groups - {'sales_orders'})
+            Monthly._store_monthly_values(projects.ids, monthly_values, field_names=bucket_fields)
+            # Detail fields (paid, outstanding, ...) are read from the buckets
+            projects.invalidate_recordset(DETAIL_FINANCIAL_FIELDS)
+        # Lifetime source figures of all groups: the new group results and the stored ones
+        totals = Monthly._get_project_totals(projects.ids)
+
+        if 'sales_orders' in groups:
+            sales_order_totals = self._get_sales_order_totals(projects)
+            for project in projects:
+                values_by_project[project.id].update(
+                    sale_order_amount_net=sales_order_totals[project.id]['amount_net'],
+                    sale_order_tax_names=sales_order_totals[project.id]['tax_names'],
+                    sale_order_tax_ids=sales_order_totals[project.id]['tax_ids'],
+                )
+
+        general_hourly_rate = self._get_general_hourly_rate()
+        for project in projects:
+            values = dict(totals[project.id], **values_by_project[project.id])
+            values.update(self._get_derived_financial_values(values, general_hourly_rate))
+            values_by_project[project.id] = values
+        changes = projects._write_financial_values(values_by_project)
+
+        _logger.debug(
+            f"Recomputed field groups {', '.join(sorted(groups))} for {len(projects)} project(s), "
+            f"{changes['projects']} project(s) / {changes['fields']} field(s) changed"
+        )
+
+    def _write_financial_values(self, values_by_project):
+        """
+        Write computed financial values of many projects with one UPDATE statement.
+
+        The values are written to the projects' statistics records
+        (project.statistic.aggregate), the project rows are neither updated nor
+        locked. Only values that actually changed are written: the new values are
+        compared with the stored ones (amounts within the rounding of the project's
+        currency, hours within HOURS_PRECISION_ROUNDING) and one bulk UPDATE per
+        call writes the changed fields of the changed projects. Unchanged
+        statistics records keep their row, write_date and index entries.
+
+        Used by the batch recomputes (precommit flush, parallel refresh, group and
+        delta updates, bulk mode rebuild) instead of one write() per project.
+
+        Args:
+            values_by_project: {project_id: {field_name: value}}, same fields for every project
 
         Returns:
             dict: {
-                'invoiced_net': float,
-                'paid_net': float,
-                'invoiced_gross': float,
-                'paid_gross': float
+                'projects': int,  # projects with at least one changed field
+                'fields': int,    # changed field values over all projects
             }
         """
-        result = {
-            'invoiced_net': 0.0,
-            'paid_net': 0.0,
-            'invoiced_gross': 0.0,
-            'paid_gross': 0.0
+        changes = {'projects': 0, 'fields': 0}
+        if not values_by_project:
+            return changes
+        # Only the stored fields have columns (hybrid layout), the taxes live in a relation table
+        write_fields = set(next(iter(values_by_project.values()))) & set(STORED_FINANCIAL_FIELDS)
+        column_fields = sorted(write_fields - {'sale_order_tax_ids'})
+
+        Aggregate = self.env['project.statistic.aggregate']
+        Aggregate.flush_model(sorted(write_fields))
+        self.flush_model(['statistic_id'])
+        stored_by_project = self._read_stored_financial_values(list(values_by_project), sorted(write_fields))
+        currency_rounding = {
+            project.id: project.currency_id.rounding or 0.01
+            for project in self.sudo().browse(list(values_by_project))
         }
 
-        # DEBUG: Log what we're searching for
-        _logger.info(f"Searching for invoice lines for analytic account: {analytic_account.id} ({analytic_account.name})")
+        changed_by_project = {}
+        for project_id, values in values_by_project.items():
+            stored = stored_by_project.setdefault(project_id, {})
+            changed = {
+                field_name for field_name in write_fields
+                if self._is_financial_value_changed(
+                    field_name, stored.get(field_name), values[field_name], currency_rounding[project_id]
+                )
+            }
+            if changed:
+                changed_by_project[project_id] = changed
+                changes['fields'] += len(changed)
+        changes['projects'] = len(changed_by_project)
+        if not changed_by_project:
+            return changes
+
+        # One UPDATE for the union of changed columns; unchanged columns of a row keep their stored value
+        update_fields = sorted(set().union(*changed_by_project.values()) & set(column_fields))
+        if update_fields:
+            rows = [
+                (project_id, self.env.uid, *(
+                    values_by_project[project_id][field_name] if field_name in changed
+                    else stored_by_project[project_id].get(field_name)
+                    for field_name in update_fields
+                ))
+                for project_id, changed in changed_by_project.items()
+                if changed & set(update_fields)
+            ]
+            execute_values(self.env.cr._obj, f"""
+                UPDATE project_statistic_aggregate AS aggregate
+                   SET {', '.join(f'{field_name} = data.{field_name}' for field_name in update_fields)},
+                       write_uid = data.write_uid,
+                       write_date = now() at time zone 'UTC'
+                  FROM (VALUES %s) AS data(project_id, write_uid, {', '.join(update_fields)})
+                  JOIN project_project project ON project.id = data.project_id
+                 WHERE aggregate.id = project.statistic_id
+            """, rows, page_size=len(rows))
+        tax_changed = {
+            project_id: values_by_project[project_id]['sale_order_tax_ids']
+            for project_id, changed in changed_by_project.items()
+            if 'sale_order_tax_ids' in changed
+        }
+        if tax_changed:
+            self._write_sale_order_tax_ids(tax_changed)
+        Aggregate.invalidate_model(column_fields + ['sale_order_tax_ids', 'write_uid', 'write_date'])
+        self.browse(list(changed_by_project)).invalidate_recordset(
+            column_fields + list(DETAIL_FINANCIAL_FIELDS) + ['sale_order_tax_ids']
+        )
+        return changes
+
+    def _read_stored_financial_values(self, project_ids, field_names):
+        """
+        Read the stored financial values of many projects straight from their
+        statistics records (project.statistic.aggregate).
 
-        # DIAGNOSTIC: Check each filter condition separately to find the issue
-        all_move_lines = self.env['account.move.line'].search([])
-        _logger.info(f"DIAGNOSTIC: Total move lines in database: {len(all_move_lines)}")
+        Args:
+            project_ids: list of project.project IDs
+            field_names: stored financial fields to read (sale_order_tax_ids from its relation table)
 
-        customer_moves = self.env['account.move.line'].search([
-            ('move_id.move_type', 'in', ['out_invoice', 'out_refund'])
-        ])
-        _logger.info(f"DIAGNOSTIC: Customer invoice lines (any state): {len(customer_moves)}")
+        Returns:
+            dict: {project_id: {field_name: value}}, sale_order_tax_ids as a set of account.tax IDs
+        """
+        column_fields = [field_name for field_name in field_names if field_name != 'sale_order_tax_ids']
+        result = {project_id: {} for project_id in project_ids}
+        if column_fields:
+            self.env.cr.execute(f"""
+                SELECT project.id, {', '.join(f'aggregate.{field_name}' for field_name in column_fields)}
+                  FROM project_project project
+                  JOIN project_statistic_aggregate aggregate ON aggregate.id = project.statistic_id
+                 WHERE project.id = ANY(%s)
+            """, [project_ids])
+            for row in self.env.cr.fetchall():
+                result[row[0]].update(zip(column_fields, row[1:]))
+        if 'sale_order_tax_ids' in field_names:
+            field = self.env['project.statistic.aggregate']._fields['sale_order_tax_ids']
+            for values in result.values():
+                values['sale_order_tax_ids'] = set()
+            self.env.cr.execute(f"""
+                SELECT project.id, ARRAY_AGG(rel.{field.column2})
+                  FROM {field.relation} rel
+                  JOIN project_project project ON project.statistic_id = rel.{field.column1}
+                 WHERE project.id = ANY(%s)
+                 GROUP BY project.id
+            """, [project_ids])
+            for project_id, tax_ids in self.env.cr.fetchall():
+                result[project_id]['sale_order_tax_ids'] = set(tax_ids)
+        return result
 
-        posted_customer_moves = self.env['account.move.line'].search([
-            ('parent_state', '=', 'posted'),
-            ('move_id.move_type', 'in', ['out_invoice', 'out_refund'])
-        ])
-        _logger.info(f"DIAGNOSTIC: Posted customer invoice lines: {len(posted_customer_moves)}")
+    @api.model
+    def _is_financial_value_changed(self, field_name, stored, value, currency_rounding):
+        """
+        Compare a computed value with the stored one.
 
-        with_analytic = self.env['account.move.line'].search([
-            ('analytic_distribution', '!=', False),
-            ('parent_state', '=', 'posted'),
-            ('move_id.move_type', 'in', ['out_invoice', 'out_refund'])
-        ])
-        _logger.info(f"DIAGNOSTIC: Posted customer lines WITH analytic_distribution: {len(with_analytic)}")
-
-        # Find all posted customer invoice/credit note lines with this analytic account
-        # RELAXED FILTER: Removed account_type filter to catch all invoice lines
-        # German accounting (SKR03/SKR04) might use different account types
-        invoice_lines = self.env['account.move.line'].search([
-            ('analytic_distribution', '!=', False),
-            ('parent_state', '=', 'posted'),
-            ('move_id.move_type', 'in', ['out_invoice', 'out_refund']),
-            ('display_type', 'not in', ['line_section', 'line_note']),  # Exclude section/note lines
+        Amounts are equal within the given currency rounding, hours within
+        HOURS_PRECISION_ROUNDING (NULL counts as 0.0), sale_order_tax_ids
+        compares the sets of tax IDs, other fields compare by value (empty
+        strings and NULL are equal).
+        """
+        field = self._fields[field_name]
+        if field.type == 'float':
+            precision_rounding = HOURS_PRECISION_ROUNDING if field_name in HOURS_FIELDS else currency_rounding
+            return not float_is_zero((value or 0.0) - (stored or 0.0), precision_rounding=precision_rounding)
+        if field.type == 'many2many':
+            return set(value or ()) != (stored or set())
+        return (value or False) != (stored or False)
+
+    def _write_sale_order_tax_ids(self, tax_ids_by_project):
+        """
+        Replace the sales order taxes of many projects (relation table of the
+        statistics records, DELETE + INSERT).
+
+        Args:
+            tax_ids_by_project: {project_id: [account.tax IDs]}
+        """
+        field = self.env['project.statistic.aggregate']._fields['sale_order_tax_ids']
+        self.env.cr.execute(f"""
+            DELETE FROM {field.relation} rel
+             USING project_project project
+             WHERE project.statistic_id = rel.{field.column1}
+               AND project.id = ANY(%s)
+        """, [list(tax_ids_by_project)])
+        rows = [
+            (project_id, tax_id)
+            for project_id, tax_ids in tax_ids_by_project.items()
+            for tax_id in tax_ids
+        ]
+        if rows:
+            execute_values(self.env.cr._obj, f"""
+                INSERT INTO {field.relation} ({field.column1}, {field.column2})
+                SELECT project.statistic_id, data.tax_id
+                  FROM (VALUES %s) AS data(project_id, tax_id)
+                  JOIN project_project project ON project.id = data.project_id
+            """, rows, page_size=len(rows))
+
+    @api.model
+    def _apply_general_hourly_rate(self):
+        """
+        Apply the current general hourly rate to all projects (rate-only refresh).
+
+        labor_costs_adjusted is the only stored field that depends on the rate:
+        it is recalculated from the adjusted hours of the monthly buckets with a
+        single set-based UPDATE of the statistics records. Only rows whose value
+        changes (beyond the rounding of the project's currency) are written. No invoice, bill, timesheet or sales order is read
+        and no project row is locked. The non-stored detail fields are
+        recomputed on the next read.
+
+        Projects with an analytic account but no buckets yet have no adjusted
+        hours to multiply: they are scheduled for a full recompute instead.
+
+        Returns:
+            int: number of projects updated
+        """
+        general_hourly_rate = self._get_general_hourly_rate()
+        Aggregate = self.env['project.statistic.aggregate']
+        Aggregate.flush_model(['labor_costs_adjusted', 'has_analytic_account'])
+        self.flush_model(['statistic_id'])
+
+        self.env.cr.execute("""
+            UPDATE project_statistic_aggregate aggregate
+               SET labor_costs_adjusted = bucket.labor_costs_adjusted,
+                   write_uid = %(uid)s,
+                   write_date = now() at time zone 'UTC'
+              FROM project_project project
+              JOIN (
+                    SELECT project_id, SUM(total_hours_booked_adjusted) * %(rate)s AS labor_costs_adjusted
+                      FROM project_statistic_monthly
+                     GROUP BY project_id
+                   ) bucket ON bucket.project_id = project.id
+              LEFT JOIN res_company company ON company.id = project.company_id
+              LEFT JOIN res_currency currency ON currency.id = company.currency_id
+             WHERE aggregate.id = project.statistic_id
+               AND aggregate.has_analytic_account
+               AND (aggregate.labor_costs_adjusted IS NULL
+                    OR ABS(aggregate.labor_costs_adjusted - bucket.labor_costs_adjusted)
+                       >= COALESCE(currency.rounding, 0.01) / 2)
+        """, {'rate': general_hourly_rate, 'uid': self.env.uid})
+        count = self.env.cr.rowcount
+
+        self.env.cr.execute("""
+            SELECT project.id
+              FROM project_project project
+              JOIN project_statistic_aggregate aggregate ON aggregate.id = project.statistic_id
+             WHERE aggregate.has_analytic_account
+               AND NOT EXISTS (SELECT 1 FROM project_statistic_monthly bucket WHERE bucket.project_id = project.id)
+        """)
+        unbucketed_ids = {row[0] for row in self.env.cr.fetchall()}
+        if unbucketed_ids:
+            self._schedule_financial_data_recompute(unbucketed_ids)
+
+        Aggregate.invalidate_model(['labor_costs_adjusted', 'write_uid', 'write_date'])
+        self.invalidate_model(['labor_costs_adjusted', *DETAIL_FINANCIAL_FIELDS])
+        _logger.info(
+            f"General hourly rate {general_hourly_rate:.2f} applied to {count} project(s), "
+            f"{len(unbucketed_ids)} project(s) without monthly buckets scheduled for a full recompute"
+        )
+        return count
+
+    def _refresh_financial_data_parallel(self, workers=4):
+        """
+        Recompute the financial data of the projects in parallel shards.
+
+        The projects are split into `workers` shards. Every shard aggregates its
+        source figures (_get_monthly_financial_values) in its own worker thread on
+        its own database cursor, so the aggregation queries run side by side in
+        separate PostgreSQL backends. The results are merged on the current cursor
+        with one bulk write per shard (project fields and monthly buckets).
+
+        The shards read committed data only: uncommitted changes of the current
+        transaction are not visible to them.
+
+        Args:
+            workers: number of shards / worker threads
+
+        Returns:
+            dict: {
+                'total': float,     # wall-clock seconds of the whole refresh
+                'shards': [(project_count, seconds), ...],  # aggregation time per shard
+                'changes': {'projects': int, 'fields': int},  # really modified projects / field values
+            }
+        """
+        started = time.monotonic()
+        self.env.flush_all()
+        # Resolve the compute context on this cursor, the shards reuse the cached one
+        self._get_compute_context()
+
+        project_ids = self.ids
+        workers = max(1, min(workers, len(project_ids)))
+        shards = [project_ids[i::workers] for i in range(workers)]
+        registry, uid, context = self.env.registry, self.env.uid, dict(self.env.context)
+
+        def compute_shard(shard_ids):
+            shard_started = time.monotonic()
+            with registry.cursor() as cr:
+                env = api.Environment(cr, uid, context)
+                monthly_values = env['project.project'].browse(shard_ids)._get_monthly_financial_values()
+            return monthly_values, time.monotonic() - shard_started
+
+        shard_timings = []
+        changes = {'projects': 0, 'fields': 0}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='project_statistic_refresh') as executor:
+            for shard_ids, (monthly_values, elapsed) in zip(shards, executor.map(compute_shard, shards)):
+                projects = self.browse(shard_ids)
+                shard_changes = projects._write_financial_values(projects._get_financial_data_values(monthly_values))
+                changes['projects'] += shard_changes['projects']
+                changes['fields'] += shard_changes['fields']
+                self.env['project.statistic.monthly']._store_monthly_values(shard_ids, monthly_values)
+                shard_timings.append((len(shard_ids), elapsed))
+
+        total = time.monotonic() - started
+        _logger.info(
+            f"Parallel refresh of {len(project_ids)} project(s) in {len(shards)} shard(s): {total:.2f}s total, "
+            f"shards: {', '.join(f'{count} in {seconds:.2f}s' for count, seconds in shard_timings)}, "
+            f"{changes['projects']} project(s) / {changes['fields']} field(s) changed"
+        )
+        return {'total': total, 'shards': shard_timings, 'changes': changes}
+
+    @api.model
+    def _schedule_financial_data_recompute(self, project_ids, groups=None):
+        """
+        Mark projects as dirty for the current transaction.
+
+        Only the given field groups are recomputed in the flush (all groups if
+        None); groups requested by several triggers are merged per project.
+
+        The account.move.line / account.analytic.line hooks call this instead of
+        recomputing on the spot. Posting an invoice, reconciling it or editing a
+        timesheet grid row fires the hooks many times per request; the project ids
+        are collected in a per-transaction dirty set and computed ONCE in a
+        precommit hook, right before the transaction is committed.
+
+        Projects of companies in asynchronous recompute mode are put into the
+        durable recompute queue instead and computed later by the cron job. In
+        bulk mode only the projects' analytic accounts are recorded for the
+        rebuild (see project.statistic.bulk.account).
+
+        Args:
+            project_ids: iterable of project.project IDs
+            groups: iterable of FIELD_GROUPS keys, None for all groups
+        """
+        project_ids = set(project_ids or ())
+        if not project_ids:
+            return
+        groups = set(FIELD_GROUPS if groups is None else groups)
+        if not groups:
+            return
+
+        Bulk = self.env['project.statistic.bulk.account']
+        if Bulk._is_active():
+            Bulk._record(self.env['project.project'].sudo().browse(project_ids).account_id.ids)
+            return
+
+        async_projects = self.env['project.project'].sudo().browse(project_ids).filtered(
+            lambda p: (p.company_id or self.env.company).project_statistic_recompute_mode == 'async'
+        )
+        if async_projects:
+            self.env['project.statistic.queue'].sudo()._enqueue(async_projects.ids)
+            project_ids -= set(async_projects.ids)
+            if not project_ids:
+                return
+
+        self._register_financial_data_flush()
+        dirty_groups = self.env.cr.precommit.data.setdefault('project_statistic.dirty_project_groups', {})
+        for project_id in project_ids:
+            dirty_groups.setdefault(project_id, set()).update(groups)
+
+    @api.model
+    def _register_financial_data_flush(self):
+        """Register the end-of-transaction flush (once per transaction)."""
+        data = self.env.cr.precommit.data
+        if not data.get('project_statistic.flush_registered'):
+            data['project_statistic.flush_registered'] = True
+            self.env.cr.precommit.add(self._flush_financial_data_recompute)
+
+    @api.model
+    def _is_incremental_mode(self):
+        """
+        Check whether line changes are applied as deltas (system parameter
+        project_statistic.recompute_strategy = 'incremental', default 'full').
+        """
+        return self.env['ir.config_parameter'].sudo().get_param(
+            'project_statistic.recompute_strategy', default='full'
+        ) == 'incremental'
+
+    @api.model
+    def _add_financial_deltas(self, before, after):
+        """
+        Record the change of contribution of some changed lines (incremental mode).
+
+        The difference after - before is accumulated per analytic account and
+        month for the current transaction and applied to the monthly buckets and
+        the stored totals once, in the precommit flush. The per-write cost is
+        O(changed lines), the project's other lines are never read.
+
+        Args:
+            before: {analytic_account_id: {month: {field: amount}}} contribution before the change
+            after: {analytic_account_id: {month: {field: amount}}} contribution after the change
+        """
+        Bulk = self.env['project.statistic.bulk.account']
+        if Bulk._is_active():
+            Bulk._record(set(before or {}) | set(after or {}))
+            return
+
+        deltas = self.env.cr.precommit.data.setdefault('project_statistic.pending_deltas', {})
+        changed = False
+        for sign, contributions in ((-1.0, before or {}), (1.0, after or {})):
+            for account_id, months in contributions.items():
+                for month, values in months.items():
+                    month_deltas = deltas.setdefault(account_id, {}).setdefault(month, {})
+                    for field_name, amount in values.items():
+                        if amount:
+                            month_deltas[field_name] = month_deltas.get(field_name, 0.0) + sign * amount
+                            changed = True
+        if changed:
+            self._register_financial_data_flush()
+
+    @api.model
+    def _apply_financial_deltas(self, deltas, exclude_project_ids=()):
+        """
+        Apply accumulated per-account deltas to the monthly buckets and the stored
+        totals of the projects.
+
+        Only INCREMENTAL_FIELDS are changed by the deltas. The lifetime fields are
+        then re-summed from the buckets and the derived fields (outstanding, total
+        costs, profit/loss, ...) recalculated from them. Paid amounts and sales
+        orders are not touched.
+
+        Projects without any bucket yet (computed before the monthly buckets
+        existed) get a full recompute instead, which builds their buckets.
+
+        Projects of companies in asynchronous recompute mode never get deltas:
+        the queue is their only maintenance path, they are queued instead.
+
+        Args:
+            deltas: {analytic_account_id: {month: {field: delta}}}
+            exclude_project_ids: projects that get a full recompute anyway
+        """
+        account_ids = [
+            account_id for account_id, months in deltas.items()
+            if any(abs(amount) > 1e-9 for values in months.values() for amount in values.values())
+        ]
+        if not account_ids:
+            return
+
+        Project = self.env['project.project'].sudo()
+        projects = Project.search([
+            ('account_id', 'in', account_ids),
+            ('id', 'not in', list(exclude_project_ids)),
         ])
+        async_projects = projects.filtered(
+            lambda p: (p.company_id or self.env.company).project_statistic_recompute_mode == 'async'
+        )
+        if async_projects:
+            self.env['project.statistic.queue'].sudo()._enqueue(async_projects.ids)
+            projects -= async_projects
+        if not projects:
+            return
+
+        project_plan = self._get_compute_context_plan()
+        general_hourly_rate = self._get_general_hourly_rate()
+        Monthly = self.env['project.statistic.monthly']
+
+        projects = projects.filtered(lambda p: self._get_project_analytic_account(p, project_plan))
+        bucketed_ids = Monthly._get_bucketed_project_ids(projects.ids)
+        unbucketed = projects.filtered(lambda p: p.id not in bucketed_ids)
+        if unbucketed:
+            unbucketed._compute_financial_data()
+        projects -= unbucketed
+        if not projects:
+            return
+
+        Monthly._add_monthly_deltas({
+            project.id: deltas[project.account_id.id] for project in projects
+        })
+        totals = Monthly._get_project_totals(projects.ids)
+
+        values_by_project = {}
+        for project in projects:
+            values = dict(totals[project.id])
+            values.update(self._get_derived_financial_values(values, general_hourly_rate))
+            values_by_project[project.id] = values
+        changes = projects._write_financial_values(values_by_project)
+
+        _logger.debug(
+            f"Applied incremental financial deltas to {len(projects)} project(s), "
+            f"{changes['projects']} project(s) / {changes['fields']} field(s) changed"
+        )
+
+    def _verify_financial_data(self, fix=False):
+        """
+        Verify the stored figures against a full recompute.
 
-        _logger.info(f"Found {len(invoice_lines)} potential invoice lines (before analytic filter)")
+        The full recompute is the fallback of the incremental mode: drifted
+        projects are logged and, with fix=True, rewritten with the exact values.
+        All projects are compared first - the detail fields are read from the
+        current buckets - and only then repaired: the monthly buckets of all
+        verified projects are rebuilt and the drifted stored fields rewritten.
 
-        matched_lines = 0
-        for line in invoice_lines:
-            if not line.analytic_distribution:
-                continue
+        Returns:
+            dict: {project_id: [field_name, ...]} of the fields that differ
+        """
+        mismatches = {}
+        monthly_values = self._get_monthly_financial_values()
+        values_by_project = self._get_financial_data_values(monthly_values)
+        for project in self:
+            currency_rounding = project.currency_id.rounding or 0.01
+            fields_differing = [
+                field_name for field_name, value in values_by_project[project.id].items()
+                if isinstance(value, float) and abs(project[field_name] - value) >= (
+                    HOURS_PRECISION_ROUNDING if field_name in HOURS_FIELDS else currency_rounding
+                ) / 2
+            ]
+            if fields_differing:
+                mismatches[project.id] = fields_differing
+                _logger.warning(
+                    f"Project '{project.name}' (ID: {project.id}) drifted from full recompute: "
+                    f"{', '.join(fields_differing)}"
+                )
 
-            # Skip reversal entries (Storno) - they cancel out the original entry
-            # In Odoo 18, only reversed_entry_id exists (reversal_move_id was removed)
-            if line.move_id.reversed_entry_id:
-                continue
+        if fix:
+            self.env['project.statistic.monthly']._store_monthly_values(self.ids, monthly_values)
+            self.invalidate_recordset(DETAIL_FINANCIAL_FIELDS)
+            for project_id, fields_differing in mismatches.items():
+                self.browse(project_id).statistic_id.write({
+                    field_name: values_by_project[project_id][field_name]
+                    for field_name in fields_differing
+                    if field_name in STORED_FINANCIAL_FIELDS
+                })
+        return mismatches
+
+    @api.model
+    def _cron_verify_financial_data(self):
+        """
+        Cron: verify (and fix) all projects against a full recompute.
+        Only does work in incremental mode; the full mode recomputes anyway.
+        """
+        if not self._is_incremental_mode():
+            return
+        projects = self.sudo().search([('account_id', '!=', False)])
+        chunk_size = 100
+        drifted = 0
+        for i in range(0, len(projects), chunk_size):
+            chunk = projects[i:i + chunk_size]
+            drifted += len(chunk._verify_financial_data(fix=True))
+        _logger.info(f"Verified {len(projects)} project(s), fixed {drifted} drifted project(s)")
+
+    @api.model
+    def _flush_financial_data_recompute(self):
+        """
+        Precommit hook: apply the incremental deltas and recompute every project
+        marked dirty in this transaction - in full, or only the dirty field groups.
 
-            # Parse the analytic_distribution JSON
+        Runs as superuser: the stored figures are maintained by the system, the
+        user posting an invoice or a timesheet does not need write access to projects.
+
+        The delta application, every group batch and every chunk run in their own
+        savepoint: a failing statement is rolled back to the savepoint and logged,
+        the cursor stays usable and the user's transaction is still committed.
+        Projects whose deltas failed are scheduled for a full recompute.
+        """
+        data = self.env.cr.precommit.data
+        data.pop('project_statistic.flush_registered', None)
+        dirty_groups = data.pop('project_statistic.dirty_project_groups', {})
+        deltas = data.pop('project_statistic.pending_deltas', {})
+
+        all_groups = set(FIELD_GROUPS)
+        dirty_ids = {project_id for project_id, groups in dirty_groups.items() if groups >= all_groups}
+
+        if deltas:
+            try:
+                with self.env.cr.savepoint():
+                    # Projects recomputed in full below must not get the deltas on top
+                    self.sudo()._apply_financial_deltas(deltas, exclude_project_ids=dirty_ids)
+            except Exception as e:
+                # The deltas are lost with the savepoint: recompute the affected projects in full
+                # (in a flush registered after this one, or through the queue for async companies)
+                affected_ids = set(self._get_project_ids_by_analytic_accounts(deltas)) - dirty_ids
+                _logger.error(
+                    f"Error applying financial deltas, scheduling a full recompute of projects "
+                    f"{sorted(affected_ids)}: {e}",
+                    exc_info=True
+                )
+                self._schedule_financial_data_recompute(affected_ids)
+
+        # Projects with only some groups dirty: recompute these groups, batched per group set
+        projects_by_groups = {}
+        for project_id, groups in dirty_groups.items():
+            if project_id not in dirty_ids:
+                projects_by_groups.setdefault(frozenset(groups), []).append(project_id)
+        for groups, project_ids in projects_by_groups.items():
             try:
-                distribution = line.analytic_distribution
-                if isinstance(distribution, str):
-                    distribution = json.loads(distribution)
-
-                # Check if this project's analytic account is in the distribution
-                if str(analytic_account.id) in distribution:
-                    matched_lines += 1
-                    # Get the percentage allocated to this project for THIS LINE
-                    percentage = distribution.get(str(analytic_account.id), 0.0) / 100.0
-
-                    # Get the invoice to calculate payment proportion
-                    invoice = line.move_id
-
-                    # Calculate this line's contribution to the project
-                    # NET: price_subtotal (without taxes)
-                    line_amount_net = line.price_subtotal * percentage
-                    # GROSS: price_total (with taxes)
-                    line_amount_gross = line.price_total * percentage
-
-                    # Credit notes (out_refund) reduce revenue, so subtract them
-                    if invoice.move_type == 'out_refund':
-                        line_amount_net = -abs(line_amount_net)  # Ensure negative
-                        line_amount_gross = -abs(line_amount_gross)  # Ensure negative
-
-                    result['invoiced_net'] += line_amount_net
-                    result['invoiced_gross'] += line_amount_gross
-
-                    _logger.info(f"  - Invoice {invoice.name}: NET={line_amount_net:.2f}, GROSS={line_amount_gross:.2f}, Account={line.account_id.code} ({line.account_id.account_type})")
-
-                    # Calculate paid amount for this line
-                    # Payment proportion = (invoice.amount_total - invoice.amount_residual) / invoice.amount_total
-                    if abs(invoice.amount_total) > 0:
-                        payment_ratio = (invoice.amount_total - invoice.amount_residual) / invoice.amount_total
-                        line_paid_net = line_amount_net * payment_ratio
-                        line_paid_gross = line_amount_gross * payment_ratio
-                        result['paid_net'] += line_paid_net
-                        result['paid_gross'] += line_paid_gross
+                with self.env.cr.savepoint():
+                    self.env['project.project'].sudo().browse(sorted(project_ids)).exists()._recompute_financial_groups(groups)
+            except Exception as e:
+                # Log error but don't break the user's transaction
+                _logger.error(
+                    f"Error recomputing field groups {', '.join(sorted(groups))} for projects {project_ids}: {e}",
+                    exc_info=True
+                )
+
+        if not dirty_ids:
+            self.env.flush_all()
+            return
+
+        projects = self.env['project.project'].sudo().browse(sorted(dirty_ids)).exists()
+        project_ids_list = projects.ids
+        chunk_size = 100
+        total_projects = len(project_ids_list)
+
+        _logger.info(f"Recomputing financial data for {total_projects} project(s) before commit")
 
+        for i in range(0, total_projects, chunk_size):
+            chunk = project_ids_list[i:i + chunk_size]
+            chunk_projects = projects.browse(chunk)
+
+            try:
+                # CRITICAL: Invalidate cache first to ensure fresh data
+                chunk_projects.invalidate_recordset()
+                with self.env.cr.savepoint():
+                    changes = chunk_projects._compute_financial_data()
+                _logger.debug(
+                    f"Recomputed financial data for {len(chunk_projects)} project(s), "
+                    f"{changes['projects']} project(s) / {changes['fields']} field(s) changed"
+                )
             except Exception as e:
-                _logger.warning(f"Error parsing analytic_distribution for line {line.id}: {e}")
+                # Log error but don't break the user's transaction
+                _logger.error(
+                    f"Error recomputing financial data for projects {chunk}: {e}",
+                    exc_info=True
+                )
                 continue
 
-        _logger.info(f"Matched {matched_lines} invoice lines for analytic account {analytic_account.id}")
-        _logger.info(f"Result: NET invoiced={result['invoiced_net']:.2f}, GROSS invoiced={result['invoiced_gross']:.2f}")
+        # Precommit hooks run after the ORM flush: write the results ourselves
+        self.env.flush_all()
 
-        return result
+    @api.model
+    def _get_empty_financial_values(self):
+        """
+        Return the values of all computed financial fields for a project without data.
+
+        Returns:
+            dict: {field_name: value} with 0.0 for every amount and '' for the tax names
+        """
+        return {
+            'customer_invoiced_amount_net': 0.0,
+            'customer_paid_amount_net': 0.0,
+            'customer_outstanding_amount_net': 0.0,
+            'customer_invoiced_amount_gross': 0.0,
+            'customer_paid_amount_gross': 0.0,
+            'customer_outstanding_amount_gross': 0.0,
+            'vendor_bills_total_net': 0.0,
+            'vendor_bills_total_gross': 0.0,
+            'customer_skonto_taken': 0.0,
+            'vendor_skonto_received': 0.0,
+            'sale_order_amount_net': 0.0,
+            'sale_order_tax_names': '',
+            'sale_order_tax_ids': [],
+            'total_hours_booked': 0.0,
+            'labor_costs': 0.0,
+            'total_hours_booked_adjusted': 0.0,
+            'labor_costs_adjusted': 0.0,
+            'other_costs_net': 0.0,
+            'total_costs_net': 0.0,
+            'profit_loss_net': 0.0,
+            'negative_difference_net': 0.0,
+        }
 
-    def _get_vendor_bills_from_analytic(self, analytic_account):
+    @api.model
+    def _get_financial_values(self, source_values, sales_order_data, general_hourly_rate):
         """
-        Get vendor bills and refunds via analytic_distribution in account.move.line.
-        This is the Odoo v18 way to link bills to projects.
+        Combine the lifetime source figures of one project into the computed field values.
 
-        IMPORTANT: We calculate BOTH NET and GROSS amounts:
-        - NET: price_subtotal (base amount without taxes)
-        - GROSS: price_total (total amount including all taxes)
+        Args:
+            source_values: {field_name: amount} for all MONTHLY_FIELDS (sum of the buckets)
+            sales_order_data: {'amount_net': float, 'tax_names': str, 'tax_ids': list}
+            general_hourly_rate: rate for the adjusted labor costs
 
-        We must calculate the project portion based on bill LINE amounts,
-        not full bill amounts, because different lines may go to different projects.
+        Returns:
+            dict: {field_name: value} for all computed financial fields
+        """
+        values = dict(
+            source_values,
+            sale_order_amount_net=sales_order_data['amount_net'],
+            sale_order_tax_names=sales_order_data['tax_names'],
+            sale_order_tax_ids=sales_order_data['tax_ids'],
+        )
+        values.update(self._get_derived_financial_values(values, general_hourly_rate))
+        return values
+
+    @api.model
+    def _get_derived_financial_values(self, values, general_hourly_rate):
+        """
+        Compute the fields derived from the aggregated source fields: outstanding
+        amounts, adjusted labor costs, total costs and profit/loss.
 
-        Handles both:
-        - in_invoice: Vendor bills (positive cost)
-        - in_refund: Vendor refunds (negative cost)
+        Args:
+            values: dict with the source fields (invoiced, paid, bills, skonto, labor, other costs)
+            general_hourly_rate: rate for the adjusted labor costs
 
         Returns:
-            dict: {
-                'total_net': float,
-                'total_gross': float
-            }
+            dict: {field_name: value} for the derived fields
         """
-        result = {
-            'total_net': 0.0,
-            'total_gross': 0.0
+        # Adjusted Labor Costs using general hourly rate from system parameters
+        labor_costs_adjusted = values['total_hours_booked_adjusted'] * general_hourly_rate
+
+        # Calculate totals
+        customer_outstanding_amount_net = values['customer_invoiced_amount_net'] - values['customer_paid_amount_net']
+        customer_outstanding_amount_gross = values['customer_invoiced_amount_gross'] - values['customer_paid_amount_gross']
+
+        total_costs_net = values['labor_costs'] + values['other_costs_net']
+
+        # Calculate Profit/Loss - NET basis (consistent comparison)
+        # Formula: (Revenue NET - Customer Skonto) - (Vendor Bills NET - Vendor Skonto + Internal Costs NET)
+        # This ensures we're comparing NET revenue to NET costs (apples to apples)
+        adjusted_revenue_net = values['customer_invoiced_amount_net'] - values['customer_skonto_taken']
+        adjusted_vendor_costs_net = values['vendor_bills_total_net'] - values['vendor_skonto_received']
+        profit_loss_net = adjusted_revenue_net - (adjusted_vendor_costs_net + total_costs_net)
+        negative_difference_net = abs(min(0, profit_loss_net))
+
+        return {
+            'customer_outstanding_amount_net': customer_outstanding_amount_net,
+            'customer_outstanding_amount_gross': customer_outstanding_amount_gross,
+            'labor_costs_adjusted': labor_costs_adjusted,
+            'total_costs_net': total_costs_net,
+            'profit_loss_net': profit_loss_net,
+            'negative_difference_net': negative_difference_net,
         }
 
-        # DEBUG: Log what we're searching for
-        _logger.info(f"Searching for vendor bill lines for analytic account: {analytic_account.id} ({analytic_account.name})")
+    @api.model
+    def _get_compute_context(self):
+        """
+        Get the batch-wide settings of a financial data compute.
 
-        # DIAGNOSTIC: Check each filter condition separately to find the issue
-        vendor_moves = self.env['account.move.line'].search([
-            ('move_id.move_type', 'in', ['in_invoice', 'in_refund'])
-        ])
-        _logger.info(f"DIAGNOSTIC: Vendor bill lines (any state): {len(vendor_moves)}")
+        Resolved once per registry and cached (ormcache): the projects plan, the
+        general hourly rate and the Skonto account IDs. Every batch compute and
+        both recompute triggers read it instead of resolving the plan, the system
+        parameter and the account codes again.
 
-        posted_vendor_moves = self.env['account.move.line'].search([
-            ('parent_state', '=', 'posted'),
-            ('move_id.move_type', 'in', ['in_invoice', 'in_refund'])
-        ])
-        _logger.info(f"DIAGNOSTIC: Posted vendor bill lines: {len(posted_vendor_moves)}")
+        Invalidation: the 'default' registry cache is cleared when a system
+        parameter changes, and by _clear_statistic_cache() when a Skonto account
+        group, a general account matching a Skonto prefix or the projects plan is
+        created, changed or deleted.
 
-        vendor_with_analytic = self.env['account.move.line'].search([
-            ('analytic_distribution', '!=', False),
-            ('parent_state', '=', 'posted'),
-            ('move_id.move_type', 'in', ['in_invoice', 'in_refund'])
-        ])
-        _logger.info(f"DIAGNOSTIC: Posted vendor lines WITH analytic_distribution: {len(vendor_with_analytic)}")
-
-        # Find all posted vendor bill/refund lines with this analytic account
-        # RELAXED FILTER: Removed account_type filter to catch all bill lines
-        # German accounting (SKR03/SKR04) might use different account types
-        bill_lines = self.env['account.move.line'].search([
-            ('analytic_distribution', '!=', False),
-            ('parent_state', '=', 'posted'),
-            ('move_id.move_type', 'in', ['in_invoice', 'in_refund']),
-            ('display_type', 'not in', ['line_section', 'line_note']),  # Exclude section/note lines
-        ])
+        Returns:
+            ComputeContext (immutable)
+        """
+        return self._build_compute_context()
+
+    @api.model
+    @tools.ormcache()
+    def _build_compute_context(self):
+        project_plan = self.sudo()._get_projects_analytic_plan()
+        general_hourly_rate = float(
+            self.env['ir.config_parameter'].sudo().get_param(
+                'project_statistic.general_hourly_rate', default='66.0'
+            )
+        )
+        # Configurable Skonto account groups (project.statistic.skonto.account)
+        skonto_groups = self.env['project.statistic.skonto.account'].sudo().search([])
+        context = ComputeContext(
+            project_plan_id=project_plan.id or None,
+            general_hourly_rate=general_hourly_rate,
+            customer_skonto_account_ids=self._get_accounts_by_code_prefixes(
+                skonto_groups.filtered(lambda group: group.skonto_type == 'customer').mapped('code_prefix')
+            ),
+            vendor_skonto_account_ids=self._get_accounts_by_code_prefixes(
+                skonto_groups.filtered(lambda group: group.skonto_type == 'vendor').mapped('code_prefix')
+            ),
+        )
+        _logger.debug(f"Project statistic compute context resolved: {context}")
+        return context
+
+    @api.model
+    def _get_accounts_by_code_prefixes(self, prefixes):
+        """
+        Get the IDs of the general accounts whose code starts with one of the prefixes.
 
-        _logger.info(f"Found {len(bill_lines)} potential bill lines (before analytic filter)")
+        Account codes are company dependent, so every company is searched.
 
-        matched_lines = 0
-        for line in bill_lines:
-            if not line.analytic_distribution:
-                continue
+        Returns:
+            frozenset of account.account IDs
+        """
+        if not prefixes:
+            return frozenset()
+        domain = expression.OR([[('code', '=like', f'{prefix}%')] for prefix in prefixes])
+        Account = self.env['account.account'].sudo()
+        account_ids = set()
+        for company in self.env['res.company'].sudo().search([]):
+            account_ids.update(Account.with_company(company).search(domain).ids)
+        return frozenset(account_ids)
+
+    @api.model
+    def _get_project_ids_by_analytic_accounts(self, analytic_account_ids):
+        """
+        Get the IDs of the projects whose analytic account (projects plan) is one of the given accounts.
 
-            # Skip reversal entries (Storno) - they cancel out the original entry
-            # In Odoo 18, only reversed_entry_id exists (reversal_move_id was removed)
-            if line.move_id.reversed_entry_id:
-                continue
+        Used by the recompute triggers that start from analytic accounts. Served
+        from the cached reverse index, no database query once the index is built.
+
+        Returns:
+            list of project.project IDs
+        """
+        project_ids_by_account = self._get_analytic_account_project_index()
+        return [
+            project_id
+            for account_id in analytic_account_ids
+            for project_id in project_ids_by_account.get(account_id, ())
+        ]
+
+    @api.model
+    @tools.ormcache()
+    def _get_analytic_account_project_index(self):
+        """
+        Reverse index from analytic account to projects, limited to the projects plan.
+
+        Built with one query and cached per registry (ormcache). It is invalidated
+        by _clear_statistic_cache() when a project with an analytic account is
+        created or deleted, when project.account_id or project.active changes and
+        when an analytic account enters or leaves the projects plan. The returned
+        dict is shared: callers must not modify it.
+
+        Returns:
+            dict: {analytic_account_id: (project_id, ...)}
+        """
+        project_plan_id = self._get_compute_context().project_plan_id
+        if not project_plan_id:
+            _logger.debug("Project analytic plan not found - recompute triggers are inactive")
+            return {}
+
+        self.flush_model(['account_id'])
+        self.env['account.analytic.account'].flush_model(['plan_id'])
+        self.env.cr.execute("""
+            SELECT project.account_id, array_agg(project.id ORDER BY project.id)
+              FROM project_project project
+              JOIN account_analytic_account account ON account.id = project.account_id
+             WHERE account.plan_id = %s
+               AND project.active
+             GROUP BY project.account_id
+        """, [project_plan_id])
+        return {account_id: tuple(project_ids) for account_id, project_ids in self.env.cr.fetchall()}
+
+    @api.model
+    def _get_compute_context_plan(self):
+        """Get the projects plan of the compute context as record (may be empty)."""
+        return self.env['account.analytic.plan'].browse(self._get_compute_context().project_plan_id)
+
+    @api.model
+    def _get_projects_analytic_plan(self):
+        """
+        Get the standard project analytic plan (analytic.analytic_plan_projects).
 
-            # Parse the analytic_distribution JSON
+        FALLBACK: If the external ID is not found, search for a plan by name.
+
+        Returns:
+            account.analytic.plan record (may be empty)
+        """
+        try:
+            project_plan = self.env.ref('analytic.analytic_plan_projects', raise_if_not_found=False)
+        except Exception as e:
+            _logger.warning(f"Could not load external ID 'analytic.analytic_plan_projects': {e}")
+            project_plan = None
+
+        if not project_plan:
             try:
-                distribution = line.analytic_distribution
-                if isinstance(distribution, str):
-                    distribution = json.loads(distribution)
+                project_plan = self.env['account.analytic.plan'].search([
+                    ('name', 'ilike', 'project')
+                ], limit=1)
+                if project_plan:
+                    _logger.info(f"Using analytic plan '{project_plan.name}' (ID: {project_plan.id}) as projects plan")
+            except Exception as e:
+                _logger.error(f"Could not find projects analytic plan: {e}")
 
-                # Check if this project's analytic account is in the distribution
-                if str(analytic_account.id) in distribution:
-                    matched_lines += 1
-                    # Get the percentage allocated to this project for THIS LINE
-                    percentage = distribution.get(str(analytic_account.id), 0.0) / 100.0
+        return project_plan or self.env['account.analytic.plan']
 
-                    # Get the bill to check type
-                    bill = line.move_id
+    @api.model
+    def _get_general_hourly_rate(self):
+        """Get the general hourly rate for adjusted labor costs (system parameter, cached)."""
+        return self._get_compute_context().general_hourly_rate
 
-                    # Calculate this line's contribution to the project
-                    # NET: price_subtotal (without taxes)
-                    line_amount_net = line.price_subtotal * percentage
-                    # GROSS: price_total (with taxes)
-                    line_amount_gross = line.price_total * percentage
+    @api.model
+    def _get_project_analytic_account(self, project, project_plan):
+        """
+        Get the analytic account of a project, restricted to the projects plan.
+
+        In Odoo 18, analytic_account_id was removed from projects.
+        Projects now use account_id for their primary analytic account.
 
-                    # Vendor refunds (in_refund) reduce costs, so subtract them
-                    if bill.move_type == 'in_refund':
-                        line_amount_net = -abs(line_amount_net)  # Ensure negative
-                        line_amount_gross = -abs(line_amount_gross)  # Ensure negative
+        Returns:
+            account.analytic.account record or None
+        """
+        if not (hasattr(project, 'account_id') and project.account_id):
+            return None
 
-                    result['total_net'] += line_amount_net
-                    result['total_gross'] += line_amount_gross
+        # No project plan found, use any analytic account
+        if not project_plan:
+            _logger.warning(
+                f"No projects analytic plan found, using account '{project.account_id.name}' without plan verification"
+            )
+            return project.account_id
 
-                    _logger.info(f"  - Bill {bill.name}: NET={line_amount_net:.2f}, GROSS={line_amount_gross:.2f}, Account={line.account_id.code} ({line.account_id.account_type})")
+        # Verify this is the project plan
+        if hasattr(project.account_id, 'plan_id') and project.account_id.plan_id == project_plan:
+            return project.account_id
 
-            except Exception as e:
-                _logger.warning(f"Error parsing analytic_distribution for bill line {line.id}: {e}")
-                continue
+        _logger.debug(
+            f"Project '{project.name}' has analytic account '{project.account_id.name}' "
+            f"but it belongs to plan '{project.account_id.plan_id.name if project.account_id.plan_id else 'None'}', "
+            f"not the projects plan '{project_plan.name}'"
+        )
+        return None
 
-        _logger.info(f"Matched {matched_lines} bill lines for analytic account {analytic_account.id}")
-        _logger.info(f"Result: NET bills={result['total_net']:.2f}, GROSS bills={result['total_gross']:.2f}")
+    @api.model
+    def _get_move_line_totals(self, analytic_account_ids, move_types, refund_type):
+        """
+        Aggregate posted invoice/bill lines per analytic account and month in a single SQL query.
 
+        Reads the normalized distribution index (project.statistic.distribution)
+        with an indexed lookup on analytic_account_id instead of scanning the
+        analytic_distribution jsonb of every move line. Each (line, analytic
+        account) pair contributes its percentage of the line amount; Odoo 18
+        multi-plan keys ("12,34") count for every account of the key.
+        Reversal entries (Storno) and section/note lines are excluded, lines of
+        the refund type are always counted as negative.
+
+        Args:
+            analytic_account_ids: list of account.analytic.account IDs
+            move_types: tuple of account.move move_type values to include
+            refund_type: move_type whose amounts are subtracted
+
+        Returns:
+            dict: {analytic_account_id: {month: {
+                'line_count': int,
+                'amount_net': float,
+                'amount_gross': float,
+                'paid_net': float,
+                'paid_gross': float
+            }}} with month = first day of the accounting month of the journal item
+        """
+        result = {}
+        if not analytic_account_ids:
+            return result
+
+        # Raw SQL below: make sure pending ORM writes and index rows of this transaction are visible
+        self.env['project.statistic.distribution']._sync_pending()
+        self.env['account.move.line'].flush_model(['display_type', 'date', 'price_subtotal', 'price_total'])
+        self.env['account.move'].flush_model(['amount_total', 'amount_residual'])
+
+        self.env.cr.execute("""
+            WITH project_lines AS (
+                SELECT dist.analytic_account_id,
+                       date_trunc('month', aml.date)::date AS month,
+                       dist.move_type,
+                       COALESCE(am.amount_total, 0) AS amount_total,
+                       COALESCE(am.amount_residual, 0) AS amount_residual,
+                       COALESCE(aml.price_subtotal, 0) * dist.percentage / 100.0 AS amount_net,
+                       COALESCE(aml.price_total, 0) * dist.percentage / 100.0 AS amount_gross
+                  FROM project_statistic_distribution dist
+                  JOIN account_move_line aml ON aml.id = dist.move_line_id
+                  JOIN account_move am ON am.id = aml.move_id
+                 WHERE dist.analytic_account_id = ANY(%(account_ids)s)
+                   AND dist.parent_state = 'posted'
+                   AND dist.move_type IN %(move_types)s
+                   AND NOT dist.is_reversal
+                   AND (aml.display_type IS NULL OR aml.display_type NOT IN ('line_section', 'line_note'))
+            ), signed_lines AS (
+                SELECT analytic_account_id,
+                       month,
+                       CASE WHEN move_type = %(refund_type)s THEN -ABS(amount_net) ELSE amount_net END AS amount_net,
+                       CASE WHEN move_type = %(refund_type)s THEN -ABS(amount_gross) ELSE amount_gross END AS amount_gross,
+                       CASE WHEN amount_total != 0
+                            THEN (amount_total - amount_residual) / amount_total
+                            ELSE 0 END AS payment_ratio
+                  FROM project_lines
+            )
+            SELECT analytic_account_id,
+                   month,
+                   COUNT(*),
+                   SUM(amount_net),
+                   SUM(amount_gross),
+                   SUM(amount_net * payment_ratio),
+                   SUM(amount_gross * payment_ratio)
+              FROM signed_lines
+             GROUP BY analytic_account_id, month
+        """, {
+            'account_ids': list(analytic_account_ids),
+            'move_types': tuple(move_types),
+            'refund_type': refund_type,
+        })
+
+        for account_id, month, line_count, amount_net, amount_gross, paid_net, paid_gross in self.env.cr.fetchall():
+            result.setdefault(account_id, {})[month] = {
+                'line_count': line_count,
+                'amount_net': float(amount_net or 0.0),
+                'amount_gross': float(amount_gross or 0.0),
+                'paid_net': float(paid_net or 0.0),
+                'paid_gross': float(paid_gross or 0.0),
+            }
         return result
 
-    def _get_skonto_from_analytic(self, analytic_account):
+    @api.model
+    def _is_diagnostics_mode(self):
+        """
+        Check whether diagnostics mode is enabled (system parameter
+        project_statistic.diagnostics_mode, off by default).
+
+        In diagnostics mode every batch logs the move line filter counts and one
+        summary of the matched lines. Outside of it the compute runs silently.
+        """
+        value = self.env['ir.config_parameter'].sudo().get_param(
+            'project_statistic.diagnostics_mode', default='False'
+        )
+        return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+    @api.model
+    def _log_move_line_diagnostics(self):
+        """
+        Log how many move lines pass each filter stage of the invoice/bill aggregation.
+        Helps to find out why a project shows no revenue or costs.
+
+        All counts come from a single COUNT query, run once per batch.
         """
-        Get Skonto (cash discounts) by querying analytic lines from discount accounts.
+        self.env['account.move.line'].flush_model(['move_id', 'parent_state', 'analytic_distribution'])
+        self.env['account.move'].flush_model(['move_type'])
+
+        self.env.cr.execute("""
+            SELECT CASE WHEN am.move_type IN ('out_invoice', 'out_refund')
+                        THEN 'Customer invoice' ELSE 'Vendor bill' END AS label,
+                   COUNT(*),
+                   COUNT(*) FILTER (WHERE aml.parent_state = 'posted'),
+                   COUNT(*) FILTER (WHERE aml.parent_state = 'posted'
+                                      AND aml.analytic_distribution IS NOT NULL)
+              FROM account_move_line aml
+              JOIN account_move am ON am.id = aml.move_id
+             WHERE am.move_type IN ('out_invoice', 'out_refund', 'in_invoice', 'in_refund')
+             GROUP BY label
+        """)
+        for label, any_state, posted, with_analytic in self.env.cr.fetchall():
+            _logger.info(
+                f"DIAGNOSTIC: {label} lines (any state): {any_state}, posted: {posted}, "
+                f"posted WITH analytic_distribution: {with_analytic}"
+            )
+
+    def _log_batch_summary(self, analytic_account_ids, customer_totals, vendor_totals):
+        """
+        Log one summary line per batch instead of one line per matched invoice/bill line.
+        """
+        customer_months = [data for months in customer_totals.values() for data in months.values()]
+        vendor_months = [data for months in vendor_totals.values() for data in months.values()]
+        invoice_lines = sum(data['line_count'] for data in customer_months)
+        bill_lines = sum(data['line_count'] for data in vendor_months)
+        accounts_with_data = sum(
+            1 for account_id in analytic_account_ids
+            if customer_totals[account_id] or vendor_totals[account_id]
+        )
+        _logger.info(
+            f"DIAGNOSTIC: Computed {len(self)} project(s) / {len(analytic_account_ids)} analytic account(s): "
+            f"{invoice_lines} invoice lines, {bill_lines} bill lines matched, "
+            f"{accounts_with_data} account(s) with data, "
+            f"NET invoiced={sum(d['invoiced_net'] for d in customer_months):.2f}, "
+            f"NET bills={sum(d['total_net'] for d in vendor_months):.2f}"
+        )
+
+    @api.model
+    def _get_customer_invoice_totals(self, analytic_account_ids):
+        """
+        Get customer invoices and credit notes via analytic_distribution in account.move.line.
+        This is the Odoo v18 way to link invoices to projects.
+
+        IMPORTANT: We calculate BOTH NET and GROSS amounts:
+        - NET: price_subtotal (base amount without taxes)
+        - GROSS: price_total (total amount including all taxes)
+
+        We must calculate the project portion based on invoice LINE amounts,
+        not full invoice amounts, because different lines may go to different projects.
+
+        Handles both:
+        - out_invoice: Customer invoices (positive revenue)
+        - out_refund: Customer credit notes (negative revenue)
+
+        Paid amounts are split by the payment ratio of each invoice:
+        (invoice.amount_total - invoice.amount_residual) / invoice.amount_total
+
+        Args:
+            analytic_account_ids: list of account.analytic.account IDs
+
+        Returns:
+            dict: {analytic_account_id: {month: {
+                'invoiced_net': float,
+                'paid_net': float,
+                'invoiced_gross': float,
+                'paid_gross': float,
+                'line_count': int
+            }}}
+        """
+        result = {account_id: {} for account_id in analytic_account_ids}
+        if not analytic_account_ids:
+            return result
+
+        totals = self._get_move_line_totals(
+            analytic_account_ids, ('out_invoice', 'out_refund'), 'out_refund'
+        )
+        for account_id, months in totals.items():
+            result[account_id] = {
+                month: {
+                    'invoiced_net': data['amount_net'],
+                    'paid_net': data['paid_net'],
+                    'invoiced_gross': data['amount_gross'],
+                    'paid_gross': data['paid_gross'],
+                    'line_count': data['line_count'],
+                }
+                for month, data in months.items()
+            }
+
+        return result
+
+    @api.model
+    def _get_vendor_bill_totals(self, analytic_account_ids):
+        """
+        Get vendor bills and refunds via analytic_distribution in account.move.line.
+        This is the Odoo v18 way to link bills to projects.
+
+        IMPORTANT: We calculate BOTH NET and GROSS amounts:
+        - NET: price_subtotal (base amount without taxes)
+        - GROSS: price_total (total amount including all taxes)
+
+        We must calculate the project portion based on bill LINE amounts,
+        not full bill amounts, because different lines may go to different projects.
+
+        Handles both:
+        - in_invoice: Vendor bills (positive cost)
+        - in_refund: Vendor refunds (negative cost)
+
+        Args:
+            analytic_account_ids: list of account.analytic.account IDs
+
+        Returns:
+            dict: {analytic_account_id: {month: {
+                'total_net': float,
+                'total_gross': float,
+                'line_count': int
+            }}}
+        """
+        result = {account_id: {} for account_id in analytic_account_ids}
+        if not analytic_account_ids:
+            return result
+
+        totals = self._get_move_line_totals(
+            analytic_account_ids, ('in_invoice', 'in_refund'), 'in_refund'
+        )
+        for account_id, months in totals.items():
+            result[account_id] = {
+                month: {
+                    'total_net': data['amount_net'],
+                    'total_gross': data['amount_gross'],
+                    'line_count': data['line_count'],
+                }
+                for month, data in months.items()
+            }
+
+        return result
+
+    @api.model
+    def _get_skonto_totals(self, analytic_account_ids):
+        """
+        Get Skonto (cash discounts) from the analytic lines of the Skonto accounts.
 
         This is a simpler and more reliable approach than analyzing reconciliation.
         Skonto entries are typically posted to specific accounts with analytic distribution.
 
-        Customer Skonto (Gewährte Skonti):
-        - Accounts 7300-7303 (expense - reduces profit)
-        - Account 2130 (liability account for customer discounts)
+        The Skonto accounts are configured as account groups
+        (project.statistic.skonto.account, defaults: customer 7300-7303 and 2130,
+        vendor 4730-4733 and 2670). Their account IDs come from the cached compute
+        context, and customer/vendor Skonto are summed in one grouped SQL query for
+        the whole batch: no analytic line is loaded and no account code is compared.
+        The analytic lines are selected with the ORM domain (subselect), so record
+        rules and the company scoping still apply.
 
-        Vendor Skonto (Erhaltene Skonti):
-        - Accounts 4730-4733 (income - increases profit)
-        - Account 2670 (asset account for vendor discounts)
+        Args:
+            analytic_account_ids: list of account.analytic.account IDs
 
         Returns:
-            dict: {'customer_skonto': amount, 'vendor_skonto': amount}
+            dict: {analytic_account_id: {month: {'customer_skonto': amount, 'vendor_skonto': amount}}}
         """
-        result = {'customer_skonto': 0.0, 'vendor_skonto': 0.0}
+        result = {account_id: {} for account_id in analytic_account_ids}
+        context = self._get_compute_context()
+        skonto_account_ids = context.customer_skonto_account_ids | context.vendor_skonto_account_ids
+        if not analytic_account_ids or not skonto_account_ids:
+            return result
+
+        AnalyticLine = self.env['account.analytic.line']
+        AnalyticLine.flush_model(['account_id', 'amount', 'date', 'move_line_id'])
+        self.env['account.move.line'].flush_model(['account_id'])
 
-        # Get all analytic lines for this account
-        analytic_lines = self.env['account.analytic.line'].search([
-            ('account_id', '=', analytic_account.id)
+        # Analytic lines of the batch with a journal item
+        skonto_query = AnalyticLine._search([
+            ('account_id', 'in', list(analytic_account_ids)),
+            ('move_line_id', '!=', False),
         ])
 
-        for line in analytic_lines:
-            if not line.move_line_id or not line.move_line_id.account_id:
-                continue
+        customer_account_ids = list(context.customer_skonto_account_ids)
+        self.env.cr.execute(SQL("""
+            SELECT aal.account_id,
+                   date_trunc('month', aal.date)::date AS month,
+                   COALESCE(SUM(ABS(aal.amount)) FILTER (WHERE aml.account_id = ANY(%s)), 0),
+                   COALESCE(SUM(ABS(aal.amount)) FILTER (WHERE aml.account_id = ANY(%s)
+                                                           AND NOT aml.account_id = ANY(%s)), 0)
+              FROM account_analytic_line aal
+              JOIN account_move_line aml ON aml.id = aal.move_line_id
+             WHERE aal.id IN %s
+               AND aml.account_id = ANY(%s)
+             GROUP BY aal.account_id, month
+        """,
+            customer_account_ids,
+            list(context.vendor_skonto_account_ids),
+            customer_account_ids,
+            skonto_query.subselect(),
+            list(skonto_account_ids),
+        ))
+
+        for account_id, month, customer_skonto, vendor_skonto in self.env.cr.fetchall():
+            result[account_id][month] = {
+                'customer_skonto': float(customer_skonto),
+                'vendor_skonto': float(vendor_skonto),
+            }
 
-            account_code = line.move_line_id.account_id.code
-            if not account_code:
-                continue
+        return result
 
-            # Customer Skonto (Gewährte Skonti) - expense accounts 7300-7303 + liability 2130
-            # These reduce our revenue/profit (customer got discount)
-            if account_code.startswith(('7300', '7301', '7302', '7303', '2130')):
-                result['customer_skonto'] += abs(line.amount)
+    @api.model
+    def _get_skonto_type(self, account_id, context=None):
+        """
+        Classify a general account as Skonto account.
 
-            # Vendor Skonto (Erhaltene Skonti) - income accounts 4730-4733 + asset 2670
-            # These increase our profit (we got discount from vendor)
-            elif account_code.startswith(('4730', '4731', '4732', '4733', '2670')):
-                result['vendor_skonto'] += abs(line.amount)
+        Uses the Skonto account IDs of the compute context, no account code is read.
 
-        return result
+        Args:
+            account_id: account.account ID (or False)
+            context: ComputeContext, the cached one if not given
+
+        Returns:
+            str: 'customer', 'vendor' or None
+        """
+        if not account_id:
+            return None
+        context = context or self._get_compute_context()
 
-    def _get_timesheet_costs(self, analytic_account):
+        # Customer Skonto (Gewährte Skonti) - reduces our revenue/profit (customer got discount)
+        if account_id in context.customer_skonto_account_ids:
+            return 'customer'
+
+        # Vendor Skonto (Erhaltene Skonti) - increases our profit (we got discount from vendor)
+        if account_id in context.vendor_skonto_account_ids:
+            return 'vendor'
+
+        return None
+
+    @api.model
+    def _get_timesheet_totals(self, analytic_account_ids):
         """
         Get timesheet hours and costs from account.analytic.line.
         Timesheets have is_timesheet=True.
 
         Returns NET amounts (timesheets don't have VAT).
         Also calculates adjusted hours based on employee HFC factors.
+
+        One grouped SQL query for the whole batch, joined to hr.employee for the
+        HFC factor: no timesheet line or employee is loaded into the ORM. A line
+        without employee or with a falsy factor counts with 1.0 (no adjustment).
+        The timesheet lines are selected with the ORM domain (subselect), so
+        record rules and the definition of is_timesheet still apply.
+
+        Args:
+            analytic_account_ids: list of account.analytic.account IDs
+
+        Returns:
+            dict: {analytic_account_id: {month: {'hours': float, 'costs': float, 'adjusted_hours': float}}}
         """
-        result = {'hours': 0.0, 'costs': 0.0, 'adjusted_hours': 0.0}
+        result = {account_id: {} for account_id in analytic_account_ids}
+        if not analytic_account_ids:
+            return result
 
-        # Find all timesheet lines for this analytic account
-        timesheet_lines = self.env['account.analytic.line'].search([
-            ('account_id', '=', analytic_account.id),
+        AnalyticLine = self.env['account.analytic.line']
+        AnalyticLine.flush_model(['account_id', 'amount', 'date', 'employee_id', 'unit_amount'])
+        self.env['hr.employee'].flush_model(['faktor_hfc'])
+
+        # Timesheet lines of the batch
+        timesheet_query = AnalyticLine._search([
+            ('account_id', 'in', list(analytic_account_ids)),
             ('is_timesheet', '=', True)
         ])
 
-        for line in timesheet_lines:
-            hours = line.unit_amount or 0.0
-            result['hours'] += hours
-            result['costs'] += abs(line.amount or 0.0)
-
-            # Calculate adjusted hours using employee HFC factor
-            if line.employee_id and hasattr(line.employee_id, 'faktor_hfc'):
-                faktor_hfc = line.employee_id.faktor_hfc or 1.0
-                result['adjusted_hours'] += hours * faktor_hfc
-            else:
-                # If no employee or no HFC factor, use 1.0 (no adjustment)
-                result['adjusted_hours'] += hours
+        self.env.cr.execute(SQL("""
+            SELECT aal.account_id,
+                   date_trunc('month', aal.date)::date AS month,
+                   COALESCE(SUM(aal.unit_amount), 0),
+                   COALESCE(SUM(ABS(aal.amount)), 0),
+                   COALESCE(SUM(aal.unit_amount * COALESCE(NULLIF(employee.faktor_hfc, 0), 1.0)), 0)
+              FROM account_analytic_line aal
+              LEFT JOIN hr_employee employee ON employee.id = aal.employee_id
+             WHERE aal.id IN %s
+             GROUP BY aal.account_id, month
+        """, timesheet_query.subselect()))
+
+        for account_id, month, hours, costs, adjusted_hours in self.env.cr.fetchall():
+            result[account_id][month] = {
+                'hours': float(hours),
+                'costs': float(costs),
+                'adjusted_hours': float(adjusted_hours),
+            }
 
         return result
 
-    def _get_other_costs_from_analytic(self, analytic_account):
+    @api.model
+    def _get_other_costs_totals(self, analytic_account_ids):
         """
         Get other costs from analytic lines that are:
         - NOT timesheets (is_timesheet=False)
@@ -769,30 +1967,143 @@ class ProjectAnalytics(models.Model):
         - Negative amounts (costs are negative in Odoo)
 
         Returns NET amounts.
+
+        One grouped SQL query for the whole batch: the analytic lines are joined
+        to their journal items and moves, and vendor bill lines are excluded on
+        the database side instead of following move_line_id.move_id per line.
+        The cost lines are selected with the ORM domain (subselect), so record
+        rules and the definition of is_timesheet still apply.
+
+        Args:
+            analytic_account_ids: list of account.analytic.account IDs
+
+        Returns:
+            dict: {analytic_account_id: {month: float}}
         """
-        other_costs = 0.0
+        result = {account_id: {} for account_id in analytic_account_ids}
+        if not analytic_account_ids:
+            return result
+
+        AnalyticLine = self.env['account.analytic.line']
+        AnalyticLine.flush_model(['account_id', 'amount', 'date', 'move_line_id'])
+        self.env['account.move.line'].flush_model(['move_id'])
+        self.env['account.move'].flush_model(['move_type'])
 
-        # Find all cost lines (negative amounts, not timesheets)
-        cost_lines = self.env['account.analytic.line'].search([
-            ('account_id', '=', analytic_account.id),
+        # Cost lines of the batch (negative amounts, not timesheets)
+        cost_query = AnalyticLine._search([
+            ('account_id', 'in', list(analytic_account_ids)),
             ('amount', '<', 0),
             ('is_timesheet', '=', False)
         ])
 
-        for line in cost_lines:
-            # Check if this line is NOT from a vendor bill
-            is_from_vendor_bill = False
-            if line.move_line_id:
-                move = line.move_line_id.move_id
-                if move and move.move_type in ['in_invoice', 'in_refund']:
-                    is_from_vendor_bill = True
+        # Vendor bills are counted separately in vendor_bills_total
+        self.env.cr.execute(SQL("""
+            SELECT aal.account_id,
+                   date_trunc('month', aal.date)::date AS month,
+                   SUM(ABS(aal.amount))
+              FROM account_analytic_line aal
+              LEFT JOIN account_move_line aml ON aml.id = aal.move_line_id
+              LEFT JOIN account_move am ON am.id = aml.move_id
+             WHERE aal.id IN %s
+               AND (am.move_type IS NULL OR am.move_type NOT IN ('in_invoice', 'in_refund'))
+             GROUP BY aal.account_id, month
+        """, cost_query.subselect()))
+
+        for account_id, month, amount in self.env.cr.fetchall():
+            result[account_id][month] = float(amount or 0.0)
+
+        return result
+
+    @api.model
+    def _get_sales_order_totals(self, projects):
+        """
+        Get sales order data for the projects: total NET amount and tax codes.
+
+        Only includes confirmed sales orders (state in ['sale', 'done']).
+        Sales orders are linked via project_id field (standard Odoo field).
+
+        Two grouped SQL queries for the whole batch: the totals on sale_order and
+        the distinct taxes through the order line tax relation. No sales order or
+        order line is loaded into the ORM. The orders are selected with the ORM
+        domain (subselect), so record rules still apply.
 
-            # Only count if it's not from a vendor bill
-            # (vendor bills are counted separately in vendor_bills_total)
-            if not is_from_vendor_bill:
-                other_costs += abs(line.amount)
+        FALLBACK: If no sales orders are found, uses manual_sales_order_amount_net field.
+
+        Args:
+            projects: project.project recordset
+
+        Returns:
+            dict: {project_id: {
+                'amount_net': float,  # Total untaxed amount (amount_untaxed) or manual fallback
+                'tax_names': str,     # Comma-separated tax names
+                'tax_ids': list,      # account.tax IDs
+            }}
+        """
+        amounts = {}
+        tax_ids_by_project = {project_id: set() for project_id in projects.ids}
+
+        if projects:
+            SaleOrder = self.env['sale.order']
+            SaleOrderLine = self.env['sale.order.line']
+            SaleOrder.flush_model(['project_id', 'state', 'amount_untaxed'])
+            SaleOrderLine.flush_model(['order_id', 'tax_id'])
+
+            # state='sale' means confirmed, 'done' means fully delivered
+            order_query = SaleOrder._search([
+                ('project_id', 'in', projects.ids),
+                ('state', 'in', ['sale', 'done']),
+            ])
+
+            self.env.cr.execute(SQL("""
+                SELECT project_id, SUM(amount_untaxed)
+                  FROM sale_order
+                 WHERE id IN %s
+                 GROUP BY project_id
+            """, order_query.subselect()))
+            amounts = {project_id: float(amount or 0.0) for project_id, amount in self.env.cr.fetchall()}
+
+            tax_field = SaleOrderLine._fields['tax_id']
+            self.env.cr.execute(SQL("""
+                SELECT DISTINCT so.project_id, rel.%s
+                  FROM sale_order so
+                  JOIN sale_order_line sol ON sol.order_id = so.id
+                  JOIN %s rel ON rel.%s = sol.id
+                 WHERE so.id IN %s
+            """,
+                SQL.identifier(tax_field.column2),
+                SQL.identifier(tax_field.relation),
+                SQL.identifier(tax_field.column1),
+                order_query.subselect(),
+            ))
+            for project_id, tax_id in self.env.cr.fetchall():
+                tax_ids_by_project[project_id].add(tax_id)
+
+        # Tax names of the whole batch in one read
+        all_taxes = self.env['account.tax'].sudo().browse(
+            sorted(set().union(*tax_ids_by_project.values()))
+        )
+        tax_names = {tax.id: tax.name for tax in all_taxes}
+
+        result = {}
+        for project in projects:
+            if project.id not in amounts:
+                # FALLBACK: Use manual amount if no sales orders found
+                result[project.id] = {
+                    'amount_net': project.manual_sales_order_amount_net or 0.0,
+                    'tax_names': '',
+                    'tax_ids': [],
+                }
+                continue
 
-        return other_costs
+            tax_ids = sorted(tax_ids_by_project[project.id])
+            result[project.id] = {
+                'amount_net': amounts[project.id],
+                # Distinct tax names as comma-separated string
+                'tax_names': ', '.join(sorted({tax_names[tax_id] for tax_id in tax_ids if tax_names[tax_id]})),
+                'tax_ids': tax_ids,
+            }
+
+        return result
 
     def action_view_account_analytic_line(self):
         """
@@ -836,6 +2147,17 @@ class ProjectAnalytics(models.Model):
             'target': 'current',
         }
 
+    def action_view_financial_trend(self):
+        """
+        Open the trend history (snapshots) of this project.
+        Reads only the snapshot table, not the accounting data.
+        """
+        self.ensure_one()
+        action = self.env['ir.actions.act_window']._for_xml_id('project_statistic.action_project_statistic_snapshot')
+        action['name'] = _('Financial Trend - %s') % self.name
+        action['domain'] = [('project_id', '=', self.id)]
+        return action
+
     def action_open_project_dashboard(self):
         """
         Open the standard project dashboard/form view for this project.
@@ -894,60 +2216,6 @@ class ProjectAnalytics(models.Model):
             'context': dict(self.env.context, form_view_initial_mode='readonly'),
         }
 
-    def _get_sales_order_data(self, project):
-        """
-        Get sales order data for the project: total NET amount and tax codes.
-
-        Only includes confirmed sales orders (state in ['sale', 'done']).
-        Sales orders are linked via project_id field (standard Odoo field).
-
-        FALLBACK: If no sales orders are found, uses manual_sales_order_amount_net field.
-
-        Args:
-            project: project.project record
-
-        Returns:
-            dict: {
-                'amount_net': float,  # Total untaxed amount (price_subtotal) or manual fallback
-                'tax_names': str,     # Comma-separated tax names
-            }
-        """
-        result = {
-            'amount_net': 0.0,
-            'tax_names': '',
-        }
-
-        # Search for confirmed sales orders linked to this project
-        # state='sale' means confirmed, 'done' means fully delivered
-        sales_orders = self.env['sale.order'].search([
-            ('project_id', '=', project.id),
-            ('state', 'in', ['sale', 'done'])
-        ])
-
-        if not sales_orders:
-            # FALLBACK: Use manual amount if no sales orders found
-            result['amount_net'] = project.manual_sales_order_amount_net or 0.0
-            return result
-
-        # Collect tax names (use set to avoid duplicates)
-        tax_names_set = set()
-
-        # Calculate total NET amount
-        for order in sales_orders:
-            result['amount_net'] += order.amount_untaxed  # NET amount (without taxes)
-
-            # Collect tax names from order lines
-            for line in order.order_line:
-                for tax in line.tax_id:
-                    if tax.name:
-                        tax_names_set.add(tax.name)
-
-        # Convert set to comma-separated string
-        if tax_names_set:
-            result['tax_names'] = ', '.join(sorted(tax_names_set))
-
-        return result
-
     def action_refresh_financial_data(self):
         """
         Manually refresh/recompute all financial data for selected projects.
@@ -0,0 +1,158 @@
+from odoo import models, fields, tools
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class ProjectStatisticAggregate(models.Model):
+    """
+    Stored financial aggregates of a project (one record per project).
+
+    The figures used to live as stored computed columns on project_project.
+    Every recompute then took a row lock on the project record that project
+    managers edit at the same time and bumped the project's write_date. They
+    now live in this one-to-one table; project.project reads them through
+    delegation (_inherits on statistic_id), so the dashboard, searches,
+    sorting and grouping keep using the same field names.
+
+    Only project.project writes these values, with bulk UPDATE statements on
+    this table (see project.project._write_financial_values()). The record has
+    no field pointing back to its project: every field of this model is also a
+    field of project.project. SQL reaches it through project_project.statistic_id.
+    """
+    _name = 'project.statistic.aggregate'
+    _description = 'Project Statistic Aggregates'
+
+    has_analytic_account = fields.Boolean(
+        string='Has Analytic Account',
+        readonly=True,
+        index=True,
+        help="Indicates whether this project has a valid analytic account for financial tracking. If False, no financial data can be calculated."
+    )
+
+    data_availability_status = fields.Selection([
+        ('available', 'Data Available'),
+        ('no_analytic_account', 'No Analytic Account'),
+    ], string='Data Status',
+        default='no_analytic_account',
+        readonly=True,
+        help="Shows whether financial data is available for this project. 'No Analytic Account' means the project is not configured for financial tracking."
+    )
+
+    sale_order_amount_net = fields.Float(
+        string='Sales Orders (NET)',
+        aggregator='sum',
+        readonly=True,
+        help="Total amount (NET) of all confirmed sales orders linked to this project. Only includes orders in 'sale' or 'done' state. If no sales orders are linked, uses manual_sales_order_amount_net as fallback."
+    )
+
+    sale_order_tax_names = fields.Char(
+        string='SO Tax Codes',
+        readonly=True,
+        help="Tax codes used in confirmed sales orders linked to this project. Multiple taxes are shown as comma-separated values."
+    )
+
+    sale_order_tax_ids = fields.Many2many(
+        'account.tax',
+        'project_statistic_aggregate_sale_order_tax_rel',
+        'aggregate_id',
+        'tax_id',
+        string='SO Taxes',
+        readonly=True,
+        help="Taxes used in confirmed sales orders linked to this project (for filtering and grouping by tax code)."
+    )
+
+    customer_invoiced_amount_net = fields.Float(
+        string='Invoiced Amount (Net)',
+        aggregator='sum',
+        readonly=True,
+        help="Net amount invoiced to customers (without VAT/tax). This is the base amount before taxes are added. Uses price_subtotal from invoice lines."
+    )
+
+    vendor_bills_total_net = fields.Float(
+        string='Vendor Bills (Net)',
+        aggregator='sum',
+        readonly=True,
+        help="Net amount of vendor bills (without VAT/tax). This is the base cost before taxes. Uses price_subtotal from bill lines."
+    )
+
+    total_hours_booked = fields.Float(
+        string='Total Hours Booked',
+        aggregator='sum',
+        readonly=True,
+        help="Total hours logged in timesheets for this project (Gebuchte Stunden). This includes all timesheet entries from employees working on this project. Used to track resource utilization and calculate labor costs."
+    )
+
+    labor_costs = fields.Float(
+        string='Labor Costs',
+        aggregator='sum',
+        readonly=True,
+        help="Total cost of labor based on timesheets (Personalkosten). Calculated from timesheet entries multiplied by employee hourly rates. This is a major component of internal project costs. NET amount (no VAT on internal labor)."
+    )
+
+    labor_costs_adjusted = fields.Float(
+        string='Labor Costs (Adjusted)',
+        aggregator='sum',
+        readonly=True,
+        help="Adjusted labor costs calculated using general hourly rate from system parameters. Formula: total_hours_booked_adjusted * general_hourly_rate. Default rate is 66 EUR per hour. This provides standardized cost calculation across all employees."
+    )
+
+    profit_loss_net = fields.Float(
+        string='Profit/Loss (Net)',
+        aggregator='sum',
+        readonly=True,
+        help="Project profitability based on NET amounts (Gewinn/Verlust Netto). Formula: (Invoiced Net - Customer Skonto) - (Vendor Bills Net - Vendor Skonto + Total Costs Net). Consistent NET-to-NET calculation for accurate accounting. A positive value indicates profit, negative indicates loss."
+    )
+
+    def init(self):
+        """
+        Create the statistics records of projects that have none yet.
+
+        Runs after project.project got its statistic_id column (module import
+        order). The IDs are drawn from the sequence up front to pair every
+        project with its new record. On upgrade the values still stored on
+        project_project are copied, so the figures survive the move without a
+        full recompute.
+        """
+        cr = self.env.cr
+        if not tools.column_exists(cr, 'project_project', 'statistic_id'):
+            return
+        columns = [
+            'has_analytic_account', 'data_availability_status', 'sale_order_amount_net', 'sale_order_tax_names',
+            'customer_invoiced_amount_net', 'vendor_bills_total_net', 'total_hours_booked', 'labor_costs',
+            'labor_costs_adjusted', 'profit_loss_net',
+        ]
+        legacy_columns = [column for column in columns if tools.column_exists(cr, 'project_project', column)]
+        cr.execute("""
+            CREATE TEMPORARY TABLE project_statistic_aggregate_missing AS
+            SELECT id AS project_id, nextval('project_statistic_aggregate_id_seq') AS aggregate_id
+              FROM project_project
+             WHERE statistic_id IS NULL
+        """)
+        count = cr.rowcount
+        if count:
+            cr.execute(f"""
+                INSERT INTO project_statistic_aggregate
+                       (id, create_uid, create_date, write_uid, write_date
+                        {''.join(f', {column}' for column in legacy_columns)})
+                SELECT missing.aggregate_id, project.create_uid, now() at time zone 'UTC',
+                       project.write_uid, now() at time zone 'UTC'
+                       {''.join(f', project.{column}' for column in legacy_columns)}
+                  FROM project_statistic_aggregate_missing missing
+                  JOIN project_project project ON project.id = missing.project_id
+            """)
+            cr.execute("""
+                UPDATE project_project project
+                   SET statistic_id = missing.aggregate_id
+                  FROM project_statistic_aggregate_missing missing
+                 WHERE missing.project_id = project.id
+            """)
+            if tools.table_exists(cr, 'project_project_sale_order_tax_rel'):
+                cr.execute("""
+                    INSERT INTO project_statistic_aggregate_sale_order_tax_rel (aggregate_id, tax_id)
+                    SELECT missing.aggregate_id, legacy.tax_id
+                      FROM project_project_sale_order_tax_rel legacy
+                      JOIN project_statistic_aggregate_missing missing ON missing.project_id = legacy.project_id
+                """)
+            _logger.info(f"Created statistics records for {count} project(s)")
+        cr.execute("DROP TABLE project_statistic_aggregate_missing")
@@ -0,0 +1,185 @@
+from odoo import models, fields, api, _
+from odoo.exceptions import AccessError
+from odoo.tools import split_every
+from datetime import timedelta
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Context key that puts the recompute triggers into bulk mode (imports, migrations)
+BULK_MODE_CONTEXT_KEY = 'project_statistic_bulk_mode'
+
+
+class ProjectStatisticBulkAccount(models.Model):
+    """
+    Analytic accounts touched while the bulk import / migration mode was active.
+
+    In bulk mode the recompute triggers (journal items, analytic lines, moves,
+    reconciliations, ...) neither compute deltas nor mark projects dirty: they
+    only record the affected analytic accounts here (INSERT ... ON CONFLICT DO
+    NOTHING). Leaving the mode rebuilds the projects of these accounts in one
+    batched pass.
+
+    Bulk mode is active when:
+    - the context key `project_statistic_bulk_mode` is set (e.g. an import
+      script or the import dialog with that context), or
+    - a project manager switched it on in the "Refresh Financial Data" wizard;
+      it ends automatically after the chosen number of hours
+      (system parameter project_statistic.bulk_mode_until).
+
+    With the context key the rebuild runs in a precommit hook, at the end of the
+    importing transaction. With the wizard it runs when the manager ends the
+    mode, or at the latest by the "Project Statistic: Finish Bulk Mode" cron
+    job once the deadline has passed.
+    """
+    _name = 'project.statistic.bulk.account'
+    _description = 'Project Statistic Bulk Mode Account'
+    _rec_name = 'analytic_account_id'
+    _log_access = False
+
+    analytic_account_id = fields.Many2one(
+        'account.analytic.account',
+        string='Analytic Account',
+        required=True,
+        ondelete='cascade',
+        readonly=True,
+    )
+
+    _sql_constraints = [
+        ('analytic_account_uniq', 'unique(analytic_account_id)', 'The analytic account is already recorded.'),
+    ]
+
+    @api.model
+    def _get_deadline(self):
+        """Return the end of the bulk mode switched on in the wizard (datetime), or None."""
+        bulk_mode_until = self.env['ir.config_parameter'].sudo().get_param('project_statistic.bulk_mode_until')
+        return fields.Datetime.to_datetime(bulk_mode_until) if bulk_mode_until else None
+
+    @api.model
+    def _is_scheduled(self):
+        """Check whether the bulk mode switched on in the wizard is still running."""
+        deadline = self._get_deadline()
+        return bool(deadline) and deadline > fields.Datetime.now()
+
+    @api.model
+    def _is_active(self):
+        """Check whether the bulk import / migration mode is active."""
+        return bool(self.env.context.get(BULK_MODE_CONTEXT_KEY)) or self._is_scheduled()
+
+    @api.model
+    def _check_bulk_mode_access(self):
+        """Only project managers may switch the bulk mode on or off."""
+        if not self.env.su and not self.env.user.has_group('project.group_project_manager'):
+            raise AccessError(_('Only project managers can start or end the bulk import / migration mode.'))
+
+    @api.model
+    def _record(self, analytic_account_ids):
+        """
+        Record analytic accounts whose projects need a rebuild after bulk mode.
+
+        Args:
+            analytic_account_ids: iterable of account.analytic.account IDs
+        """
+        analytic_account_ids = sorted(set(analytic_account_ids or ()))
+        if not analytic_account_ids:
+            return
+        self.env.cr.execute("""
+            INSERT INTO project_statistic_bulk_account (analytic_account_id)
+            SELECT UNNEST(%s::integer[])
+            ON CONFLICT (analytic_account_id) DO NOTHING
+        """, [analytic_account_ids])
+
+        # Context-scoped bulk mode: rebuild once, when the importing transaction ends
+        data = self.env.cr.precommit.data
+        if not self._is_scheduled() and not data.get('project_statistic.bulk_rebuild_registered'):
+            data['project_statistic.bulk_rebuild_registered'] = True
+            self.env.cr.precommit.add(self._rebuild_after_import)
+
+    @api.model
+    def _rebuild_after_import(self):
+        """
+        Precommit hook: rebuild the accounts recorded under the context key.
+
+        If a project manager switched the bulk mode on in the meantime, the
+        rebuild is left to the end of that mode.
+        """
+        self.env.cr.precommit.data.pop('project_statistic.bulk_rebuild_registered', None)
+        if not self._is_scheduled():
+            self.sudo().with_context(**{BULK_MODE_CONTEXT_KEY: False})._rebuild()
+
+    @api.model
+    def _start(self, hours):
+        """Switch the bulk mode on for the given number of hours."""
+        self._check_bulk_mode_access()
+        until = fields.Datetime.now() + timedelta(hours=hours)
+        self.env['ir.config_parameter'].sudo().set_param(
+            'project_statistic.bulk_mode_until', fields.Datetime.to_string(until)
+        )
+        _logger.info(f"Project statistic bulk mode active until {until}")
+        return until
+
+    @api.model
+    def _finish(self):
+        """
+        Switch the bulk mode off and rebuild the projects of the recorded accounts.
+
+        Returns:
+            int: number of projects rebuilt
+        """
+        self._check_bulk_mode_access()
+        self.env['ir.config_parameter'].sudo().set_param('project_statistic.bulk_mode_until', False)
+        return self.with_context(**{BULK_MODE_CONTEXT_KEY: False})._rebuild()
+
+    @api.model
+    def _cron_finish(self):
+        """
+        Cron entry point: nothing happens while the bulk mode switched on in the
+        wizard is still running. Once its deadline has passed the mode is ended
+        and the recorded accounts are rebuilt; without a deadline, accounts left
+        over from a context-scoped import are rebuilt.
+        """
+        deadline = self._get_deadline()
+        if deadline and deadline > fields.Datetime.now():
+            return
+        if deadline:
+            self.sudo()._finish()
+        else:
+            self._rebuild()
+
+    @api.model
+    def _rebuild(self, chunk_size=1000):
+        """
+        Rebuild the projects of the recorded analytic accounts in one batched pass.
+
+        Every chunk is aggregated with the batch engine and written with one bulk
+        UPDATE for the project fields and one INSERT for the monthly buckets.
+
+        Returns:
+            int: number of projects rebuilt
+        """
+        self.env.cr.execute("DELETE FROM project_statistic_bulk_account RETURNING analytic_account_id")
+        analytic_account_ids = [row[0] for row in self.env.cr.fetchall()]
+        if not analytic_account_ids:
+            return 0
+
+        started = time.monotonic()
+        Project = self.env['project.project']
+        Monthly = self.env['project.statistic.monthly']
+        project_ids = Project._get_project_ids_by_analytic_accounts(analytic_account_ids)
+
+        changed_projects = changed_fields = 0
+        for chunk_ids in split_every(chunk_size, project_ids, list):
+            projects = Project.browse(chunk_ids)
+            monthly_values = projects._get_monthly_financial_values()
+            changes = projects._write_financial_values(projects._get_financial_data_values(monthly_values))
+            Monthly._store_monthly_values(chunk_ids, monthly_values)
+            changed_projects += changes['projects']
+            changed_fields += changes['fields']
+
+        _logger.info(
+            f"Bulk mode finished: {len(project_ids)} project(s) of {len(analytic_account_ids)} analytic account(s) "
+            f"rebuilt in {time.monotonic() - started:.2f}s, "
+            f"{changed_projects} project(s) / {changed_fields} field(s) changed"
+        )
+        return len(project_ids)
@@ -0,0 +1,161 @@
+from odoo import models, fields, api
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class ProjectStatisticDistribution(models.Model):
+    """
+    Normalized index of account.move.line.analytic_distribution.
+
+    One row per (move line, analytic account) with the percentage allocated to
+    the account and the move attributes the aggregations filter on. Odoo 18
+    multi-plan keys such as "12,34" are split into one row per account.
+
+    The table is kept in sync by the account.move.line / account.move overrides:
+    changed lines are marked dirty and re-indexed lazily, right before the index
+    is read and at the latest before the transaction commits. Deleted lines
+    disappear through the ON DELETE CASCADE foreign key.
+    """
+    _name = 'project.statistic.distribution'
+    _description = 'Project Statistic Analytic Distribution Index'
+    _log_access = False
+
+    move_line_id = fields.Many2one(
+        'account.move.line',
+        string='Journal Item',
+        required=True,
+        ondelete='cascade',
+        index=True,
+        readonly=True,
+    )
+    analytic_account_id = fields.Many2one(
+        'account.analytic.account',
+        string='Analytic Account',
+        required=True,
+        ondelete='cascade',
+        index=True,
+        readonly=True,
+    )
+    percentage = fields.Float(
+        string='Percentage',
+        readonly=True,
+        help="Share of the journal item allocated to the analytic account (0-100)."
+    )
+    move_type = fields.Char(
+        string='Move Type',
+        readonly=True,
+    )
+    parent_state = fields.Char(
+        string='Move State',
+        readonly=True,
+    )
+    is_reversal = fields.Boolean(
+        string='Is Reversal',
+        readonly=True,
+        help="The journal entry is a reversal (Storno) of another entry."
+    )
+
+    def init(self):
+        """Fill the index on module install (or after it was emptied)."""
+        self.env.cr.execute("SELECT 1 FROM project_statistic_distribution LIMIT 1")
+        if not self.env.cr.fetchone():
+            self._rebuild_index()
+
+    @api.model
+    def _split_distribution_key(self, key):
+        """
+        Split an analytic_distribution key into analytic account IDs.
+
+        Odoo 18 multi-plan distributions use keys like "12,34": the percentage
+        applies to each of the accounts. Invalid parts are skipped.
+
+        Returns:
+            list of int
+        """
+        account_ids = []
+        for part in str(key).split(','):
+            part = part.strip()
+            if part.isdigit():
+                account_ids.append(int(part))
+        return account_ids
+
+    @api.model
+    def _mark_dirty(self, move_line_ids):
+        """
+        Mark move lines for re-indexing in the current transaction.
+
+        Args:
+            move_line_ids: iterable of account.move.line IDs
+        """
+        move_line_ids = set(move_line_ids or ())
+        if not move_line_ids:
+            return
+
+        data = self.env.cr.precommit.data
+        dirty_ids = data.get('project_statistic.dirty_move_line_ids')
+        if dirty_ids is None:
+            dirty_ids = data['project_statistic.dirty_move_line_ids'] = set()
+            self.env.cr.precommit.add(self._sync_pending)
+        dirty_ids.update(move_line_ids)
+
+    @api.model
+    def _sync_pending(self):
+        """
+        Re-index the move lines marked dirty in this transaction.
+        Called before every read of the index and as precommit hook.
+        """
+        dirty_ids = self.env.cr.precommit.data.get('project_statistic.dirty_move_line_ids')
+        if not dirty_ids:
+            return
+        move_line_ids = sorted(dirty_ids)
+        dirty_ids.clear()
+        self._sync_move_lines(move_line_ids)
+
+    @api.model
+    def _sync_move_lines(self, move_line_ids):
+        """
+        Rebuild the index rows of the given move lines (DELETE + INSERT).
+
+        Args:
+            move_line_ids: list of account.move.line IDs, None for all lines
+        """
+        self.env['account.move.line'].flush_model(['analytic_distribution', 'parent_state', 'move_id'])
+        self.env['account.move'].flush_model(['move_type', 'reversed_entry_id'])
+
+        line_filter = "" if move_line_ids is None else "AND aml.id = ANY(%(move_line_ids)s)"
+        if move_line_ids is None:
+            self.env.cr.execute("DELETE FROM project_statistic_distribution")
+        else:
+            self.env.cr.execute(
+                "DELETE FROM project_statistic_distribution WHERE move_line_id = ANY(%(move_line_ids)s)",
+                {'move_line_ids': move_line_ids},
+            )
+
+        self.env.cr.execute(f"""
+            INSERT INTO project_statistic_distribution
+                   (move_line_id, analytic_account_id, percentage, move_type, parent_state, is_reversal)
+            SELECT aml.id,
+                   account.id,
+                   dist.value::numeric,
+                   am.move_type,
+                   aml.parent_state,
+                   am.reversed_entry_id IS NOT NULL
+              FROM account_move_line aml
+              JOIN account_move am ON am.id = aml.move_id
+             CROSS JOIN LATERAL jsonb_each_text(aml.analytic_distribution) AS dist(key, value)
+             CROSS JOIN LATERAL unnest(string_to_array(dist.key, ',')) AS split(account_key)
+              JOIN account_analytic_account account
+                ON account.id = CASE WHEN btrim(split.account_key) ~ '^[0-9]+$'
+                                     THEN btrim(split.account_key)::integer END
+             WHERE aml.analytic_distribution IS NOT NULL
+                   {line_filter}
+        """, {'move_line_ids': move_line_ids})
+        self.invalidate_model()
+
+    @api.model
+    def _rebuild_index(self):
+        """Rebuild the whole index from account.move.line (install / repair)."""
+        self._sync_move_lines(None)
+        self.env.cr.execute("SELECT COUNT(*) FROM project_statistic_distribution")
+        _logger.info(f"Analytic distribution index rebuilt: {self.env.cr.fetchone()[0]} row(s)")
@@ -0,0 +1,233 @@
+from odoo import models, fields, api, tools
+from psycopg2.extras import execute_values
+import logging
+
+from .project_analytics import MONTHLY_FIELDS
+
+_logger = logging.getLogger(__name__)
+
+
+class ProjectStatisticMonthly(models.Model):
+    """
+    Financial source figures of a project per calendar month.
+
+    Written by project.project._compute_financial_data() (full rebuild of the
+    computed projects) and by the incremental mode (deltas added to the month of
+    the changed line). The lifetime fields of project.project are the sum of the
+    buckets; date-range statistics are served by summing the buckets of the range
+    instead of scanning journal items and analytic lines.
+    """
+    _name = 'project.statistic.monthly'
+    _description = 'Project Statistic Monthly Figures'
+    _order = 'project_id, month'
+    _rec_name = 'project_id'
+    _log_access = False
+
+    project_id = fields.Many2one(
+        'project.project',
+        string='Project',
+        required=True,
+        ondelete='cascade',
+        index=True,
+        readonly=True,
+    )
+    month = fields.Date(
+        string='Month',
+        required=True,
+        index=True,
+        readonly=True,
+        help="First day of the calendar month the figures belong to."
+    )
+    customer_invoiced_amount_net = fields.Float(string='Invoiced Amount (Net)', readonly=True)
+    customer_invoiced_amount_gross = fields.Float(string='Invoiced Amount (Gross)', readonly=True)
+    customer_paid_amount_net = fields.Float(string='Paid Amount (Net)', readonly=True)
+    customer_paid_amount_gross = fields.Float(string='Paid Amount (Gross)', readonly=True)
+    vendor_bills_total_net = fields.Float(string='Vendor Bills (Net)', readonly=True)
+    vendor_bills_total_gross = fields.Float(string='Vendor Bills (Gross)', readonly=True)
+    customer_skonto_taken = fields.Float(string='Customer Cash Discounts (Skonto)', readonly=True)
+    vendor_skonto_received = fields.Float(string='Vendor Cash Discounts Received', readonly=True)
+    total_hours_booked = fields.Float(string='Total Hours Booked', readonly=True)
+    total_hours_booked_adjusted = fields.Float(string='Total Hours Booked (Adjusted)', readonly=True)
+    labor_costs = fields.Float(string='Labor Costs', readonly=True)
+    other_costs_net = fields.Float(string='Other Costs (Net)', readonly=True)
+
+    _sql_constraints = [
+        ('project_month_uniq', 'unique(project_id, month)', 'A project can only have one bucket per month.'),
+    ]
+
+    def init(self):
+        """
+        Queue the projects that have an analytic account but no buckets yet.
+
+        On upgrade (and on install into a database with projects) no project has
+        buckets: the bucket-based readers (detail fields, period report,
+        snapshots, rate-only refresh) would show zeros. The projects are put
+        into the recompute queue, whose cron job rebuilds them in committed
+        chunks; until then the detail fields fall back to the stored figures.
+        """
+        cr = self.env.cr
+        if not tools.table_exists(cr, 'project_statistic_queue'):
+            return
+        cr.execute("""
+            SELECT project.id
+              FROM project_project project
+             WHERE project.account_id IS NOT NULL
+               AND NOT EXISTS (SELECT 1 FROM project_statistic_monthly bucket WHERE bucket.project_id = project.id)
+        """)
+        project_ids = [row[0] for row in cr.fetchall()]
+        if project_ids:
+            self.env['project.statistic.queue']._enqueue(project_ids)
+            _logger.info(f"Queued {len(project_ids)} project(s) without monthly buckets for a full recompute")
+
+    @api.model
+    def _store_monthly_values(self, project_ids, monthly_values, field_names=None):
+        """
+        Replace the buckets of the given projects (DELETE + INSERT).
+
+        With field_names (recompute of some field groups), only these columns are
+        replaced and the other columns of the buckets are kept.
+
+        Args:
+            project_ids: list of project.project IDs whose buckets are rebuilt
+            monthly_values: {project_id: {month: {field_name: amount}}}, projects
+                            missing here end up without buckets
+            field_names: columns to replace, None for all MONTHLY_FIELDS
+        """
+        if not project_ids:
+            return
+        if field_names is not None:
+            self._store_monthly_columns(project_ids, monthly_values, field_names)
+            return
+
+        self.env.cr.execute(
+            "DELETE FROM project_statistic_monthly WHERE project_id = ANY(%s)",
+            [list(project_ids)],
+        )
+
+        rows = [
+            (project_id, month, *(values.get(field_name, 0.0) for field_name in MONTHLY_FIELDS))
+            for project_id in project_ids
+            for month, values in monthly_values.get(project_id, {}).items()
+            if any(values.get(field_name) for field_name in MONTHLY_FIELDS)
+        ]
+        if rows:
+            execute_values(self.env.cr._obj, f"""
+                INSERT INTO project_statistic_monthly (project_id, month, {', '.join(MONTHLY_FIELDS)})
+                VALUES %s
+            """, rows, page_size=len(rows))
+        self.invalidate_model()
+
+    @api.model
+    def _store_monthly_columns(self, project_ids, monthly_values, field_names):
+        """
+        Replace some columns of the buckets of the given projects.
+
+        The columns are reset to 0.0, the new values upserted, and buckets that
+        end up empty are removed.
+        """
+        field_names = list(field_names)
+        self.env.cr.execute(f"""
+            UPDATE project_statistic_monthly
+               SET {', '.join(f'{field_name} = 0' for field_name in field_names)}
+             WHERE project_id = ANY(%s)
+        """, [list(project_ids)])
+
+        # New buckets get 0.0 in the columns of the other groups
+        rows = [
+            (project_id, month, *(
+                values.get(field_name, 0.0) if field_name in field_names else 0.0
+                for field_name in MONTHLY_FIELDS
+            ))
+            for project_id in project_ids
+            for month, values in monthly_values.get(project_id, {}).items()
+            if any(values.get(field_name) for field_name in field_names)
+        ]
+        if rows:
+            execute_values(self.env.cr._obj, f"""
+                INSERT INTO project_statistic_monthly (project_id, month, {', '.join(MONTHLY_FIELDS)})
+                VALUES %s
+                ON CONFLICT (project_id, month) DO UPDATE
+                   SET {', '.join(f'{field_name} = EXCLUDED.{field_name}' for field_name in field_names)}
+            """, rows, page_size=len(rows))
+
+        self.env.cr.execute(f"""
+            DELETE FROM project_statistic_monthly
+             WHERE project_id = ANY(%s)
+               AND {' AND '.join(f'{field_name} = 0' for field_name in MONTHLY_FIELDS)}
+        """, [list(project_ids)])
+        self.invalidate_model()
+
+    @api.model
+    def _add_monthly_deltas(self, deltas_by_project):
+        """
+        Add deltas to the buckets (incremental mode), creating missing buckets.
+
+        Args:
+            deltas_by_project: {project_id: {month: {field_name: delta}}}
+        """
+        rows = [
+            (project_id, month, *(values.get(field_name, 0.0) for field_name in MONTHLY_FIELDS))
+            for project_id, months in deltas_by_project.items()
+            for month, values in months.items()
+        ]
+        if not rows:
+            return
+
+        updates = ', '.join(
+            f"{field_name} = project_statistic_monthly.{field_name} + EXCLUDED.{field_name}"
+            for field_name in MONTHLY_FIELDS
+        )
+        execute_values(self.env.cr._obj, f"""
+            INSERT INTO project_statistic_monthly (project_id, month, {', '.join(MONTHLY_FIELDS)})
+            VALUES %s
+            ON CONFLICT (project_id, month) DO UPDATE SET {updates}
+        """, rows, page_size=len(rows))
+        self.invalidate_model()
+
+    @api.model
+    def _get_bucketed_project_ids(self, project_ids):
+        """
+        Return the IDs of the projects (among project_ids) that have at least one bucket.
+
+        Returns:
+            set of int
+        """
+        if not project_ids:
+            return set()
+        self.env.cr.execute(
+            "SELECT DISTINCT project_id FROM project_statistic_monthly WHERE project_id = ANY(%s)",
+            [list(project_ids)],
+        )
+        return {row[0] for row in self.env.cr.fetchall()}
+
+    @api.model
+    def _get_project_totals(self, project_ids):
+        """
+        Sum the buckets of the projects into lifetime totals.
+
+        Date ranges are served by the period report (project.statistic.report).
+
+        Args:
+            project_ids: list of project.project IDs
+
+        Returns:
+            dict: {project_id: {field_name: amount}} for all MONTHLY_FIELDS,
+                  zeros for projects without buckets
+        """
+        result = {project_id: dict.fromkeys(MONTHLY_FIELDS, 0.0) for project_id in project_ids}
+        if not project_ids:
+            return result
+
+        self.env.cr.execute(f"""
+            SELECT project_id, {', '.join(f'SUM({field_name})' for field_name in MONTHLY_FIELDS)}
+              FROM project_statistic_monthly
+             WHERE project_id = ANY(%s)
+             GROUP BY project_id
+        """, [list(project_ids)])
+
+        for project_id, *amounts in self.env.cr.fetchall():
+            result[project_id] = {
+                field_name: float(amount or 0.0)
+                for field_name, amount in zip(MONTHLY_FIELDS, amounts)
+            }
+        return result
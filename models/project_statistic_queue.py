@@ -0,0 +1,262 @@
+from odoo import models, fields, api, _
+from datetime import timedelta
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+
+class ProjectStatisticQueue(models.Model):
+    """
+    Durable queue of projects whose financial data must be recomputed.
+
+    Filled by the account.move.line / account.analytic.line hooks for companies
+    running in asynchronous recompute mode, drained by the
+    "Project Statistic: Process Recompute Queue" cron job.
+
+    A project has at most two items: its regular item and a "requeued" item
+    added while the regular one exists (possibly locked by the cron job). The
+    hooks only ever INSERT ... ON CONFLICT DO NOTHING, so posting an invoice
+    never waits for a cron chunk holding the project's item.
+    """
+    _name = 'project.statistic.queue'
+    _description = 'Project Statistic Recompute Queue'
+    _order = 'stale_since, id'
+    _rec_name = 'project_id'
+
+    # After this many failed attempts an item is parked as 'failed'
+    MAX_ATTEMPTS = 5
+    # A failed item waits BACKOFF_MINUTES * 2^(attempts - 1) minutes before the next attempt
+    BACKOFF_MINUTES = 5
+
+    project_id = fields.Many2one(
+        'project.project',
+        string='Project',
+        required=True,
+        ondelete='cascade',
+        index=True,
+        readonly=True,
+    )
+    company_id = fields.Many2one(
+        'res.company',
+        string='Company',
+        related='project_id.company_id',
+        readonly=True,
+    )
+    stale_since = fields.Datetime(
+        string='Stale Since',
+        required=True,
+        default=fields.Datetime.now,
+        readonly=True,
+        help="When the project was first queued, i.e. since when its stored financial data is outdated."
+    )
+    dirty_at = fields.Datetime(
+        string='Last Change',
+        required=True,
+        default=fields.Datetime.now,
+        readonly=True,
+        help="When this item was queued."
+    )
+    requeued = fields.Boolean(
+        string='Requeued',
+        default=False,
+        readonly=True,
+        help="Queued again while the project already had an item, e.g. one being computed by the "
+             "cron job. It is processed in the next run."
+    )
+    next_attempt = fields.Datetime(
+        string='Next Attempt',
+        readonly=True,
+        help="A failed item is not picked again before this time (exponential backoff)."
+    )
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('failed', 'Failed'),
+    ], string='Status', default='pending', required=True, index=True, readonly=True)
+    attempts = fields.Integer(
+        string='Attempts',
+        default=0,
+        readonly=True,
+        help="Number of failed recompute attempts."
+    )
+    last_error = fields.Text(
+        string='Last Error',
+        readonly=True,
+    )
+
+    _sql_constraints = [
+        ('project_uniq', 'unique(project_id, requeued)', 'A project can only be queued once (plus one requeue).'),
+    ]
+
+    @api.model
+    def _enqueue(self, project_ids):
+        """
+        Add projects to the queue.
+
+        Projects without an item get their regular item. Projects that already
+        have one get a requeued item, so a change made while the cron job is
+        computing the project is not lost. Both inserts use ON CONFLICT DO
+        NOTHING: they never update, and therefore never wait for, an item
+        locked by the cron job.
+
+        Args:
+            project_ids: iterable of project.project IDs
+        """
+        project_ids = sorted(set(project_ids or ()))
+        if not project_ids:
+            return
+
+        self.env.cr.execute("""
+            WITH queued AS (
+                INSERT INTO project_statistic_queue
+                       (project_id, requeued, stale_since, dirty_at, state, attempts,
+                        create_uid, create_date, write_uid, write_date)
+                SELECT project_id, FALSE, now() at time zone 'UTC', now() at time zone 'UTC', 'pending', 0,
+                       %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+                  FROM unnest(%(project_ids)s::integer[]) AS project_id
+                ON CONFLICT (project_id, requeued) DO NOTHING
+                RETURNING project_id
+            )
+            INSERT INTO project_statistic_queue
+                   (project_id, requeued, stale_since, dirty_at, state, attempts,
+                    create_uid, create_date, write_uid, write_date)
+            SELECT project_id, TRUE, now() at time zone 'UTC', now() at time zone 'UTC', 'pending', 0,
+                   %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+              FROM unnest(%(project_ids)s::integer[]) AS project_id
+             WHERE project_id NOT IN (SELECT project_id FROM queued)
+            ON CONFLICT (project_id, requeued) DO NOTHING
+        """, {'uid': self.env.uid, 'project_ids': project_ids})
+        self.invalidate_model()
+
+    @api.model
+    def _cron_process_queue(self):
+        """Cron entry point: drain the queue in committed chunks."""
+        self._process_queue(auto_commit=True)
+
+    @api.model
+    def _process_queue(self, chunk_size=100, time_limit=240, auto_commit=False):
+        """
+        Recompute queued projects in bounded chunks.
+
+        Each chunk is computed in a savepoint and committed on its own, so a crash
+        or timeout never loses the work already done. If a chunk fails, its items
+        are retried one by one; failing items get their attempt counter increased,
+        are not picked again before their backoff time (nor again in this run)
+        and are parked as 'failed' after MAX_ATTEMPTS.
+
+        Args:
+            chunk_size: number of projects computed per chunk
+            time_limit: stop picking new chunks after this many seconds
+            auto_commit: commit after each chunk (cron); False in tests
+
+        Returns:
+            int: number of projects recomputed
+        """
+        started = time.monotonic()
+        processed = 0
+        failed_ids = []
+
+        while time.monotonic() - started < time_limit:
+            # SKIP LOCKED lets several cron workers drain the queue side by side
+            self.env.cr.execute("""
+                SELECT id
+                  FROM project_statistic_queue
+                 WHERE state = 'pending'
+                   AND (next_attempt IS NULL OR next_attempt <= %s)
+                   AND id != ALL(%s)
+                 ORDER BY stale_since, id
+                 LIMIT %s
+                   FOR UPDATE SKIP LOCKED
+            """, [fields.Datetime.now(), failed_ids, chunk_size])
+            rows = self.env.cr.fetchall()
+            if not rows:
+                break
+
+            items = self.browse([row[0] for row in rows])
+            try:
+                with self.env.cr.savepoint():
+                    self._recompute_items(items)
+                done_items = items
+            except Exception as e:
+                _logger.warning(f"Recompute of queue chunk failed ({e}), retrying items one by one")
+                done_items = self.browse()
+                for item in items:
+                    try:
+                        with self.env.cr.savepoint():
+                            self._recompute_items(item)
+                        done_items |= item
+                    except Exception as item_error:
+                        item._register_failure(item_error)
+                        failed_ids.append(item.id)
+
+            self._dequeue(done_items)
+            processed += len(done_items)
+
+            if auto_commit:
+                self.env.cr.commit()
+            if len(rows) < chunk_size or not done_items:
+                break
+
+        if processed:
+            _logger.info(
+                f"Recompute queue: {processed} project(s) recomputed in {time.monotonic() - started:.1f}s"
+            )
+        return processed
+
+    def _recompute_items(self, items):
+        """Recompute the projects of the given queue items and write the results."""
+        projects = items.sudo().project_id
+        projects.invalidate_recordset()
+        projects._compute_financial_data()
+        self.env.flush_all()
+
+    def _dequeue(self, items):
+        """
+        Remove processed items and the parked failures of their projects.
+
+        Items queued (requeued) while the chunk was being computed are not part
+        of the chunk and stay in the queue for the next run.
+
+        Args:
+            items: processed queue items
+        """
+        if not items:
+            return
+        self.env.cr.execute("""
+            DELETE FROM project_statistic_queue
+             WHERE id = ANY(%s)
+                OR (project_id = ANY(%s) AND state = 'failed')
+        """, [items.ids, items.project_id.ids])
+        self.invalidate_model()
+
+    def _register_failure(self, error):
+        """Count a failed attempt and park the item after MAX_ATTEMPTS."""
+        self.ensure_one()
+        _logger.error(f"Recompute of project {self.project_id.id} failed: {error}")
+        attempts = self.attempts + 1
+        self.write({
+            'attempts': attempts,
+            'last_error': str(error),
+            'state': 'failed' if attempts >= self.MAX_ATTEMPTS else 'pending',
+            'next_attempt': fields.Datetime.now() + timedelta(minutes=self.BACKOFF_MINUTES * 2 ** (attempts - 1)),
+        })
+
+    def action_retry(self):
+        """Put failed items back into the queue."""
+        self.write({'state': 'pending', 'attempts': 0, 'last_error': False, 'next_attempt': False})
+        return True
+
+    def action_process_now(self):
+        """Process the queue immediately (without waiting for the cron job)."""
+        processed = self._process_queue()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Recompute Queue Processed'),
+                'message': _('Financial data has been recalculated for %s project(s).') % processed,
+                'type': 'success',
+                'sticky': False,
+                'next': {'type': 'ir.actions.client', 'tag': 'reload'},
+            }
+        }
@@ -0,0 +1,120 @@
+from odoo import models, fields, api, tools
+
+
+class ProjectStatisticReport(models.Model):
+    """
+    Date-range project statistics (read-only SQL view).
+
+    One row per project and month, read from the pre-aggregated monthly buckets
+    (project.statistic.monthly) with the derived figures computed per row.
+    Filtering the month and grouping by project gives every period column of
+    the Projekt Statistik dashboard for any range without touching journal
+    items or analytic lines. The sales order columns (amount, tax codes) are
+    not time-bound and are left out; they stay in the dashboard.
+    """
+    _name = 'project.statistic.report'
+    _description = 'Project Statistics by Period'
+    _auto = False
+    _order = 'month desc, project_id'
+    _rec_name = 'project_id'
+
+    project_id = fields.Many2one('project.project', string='Project', readonly=True)
+    month = fields.Date(string='Month', readonly=True)
+    partner_id = fields.Many2one('res.partner', string='Client', readonly=True)
+    user_id = fields.Many2one('res.users', string='Project Manager', readonly=True)
+    stage_id = fields.Many2one('project.project.stage', string='Stage', readonly=True)
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+    currency_id = fields.Many2one('res.currency', string='Currency', readonly=True)
+
+    customer_invoiced_amount_net = fields.Float(string='Invoiced Amount (Net)', readonly=True)
+    customer_paid_amount_net = fields.Float(string='Paid Amount (Net)', readonly=True)
+    customer_outstanding_amount_net = fields.Float(string='Outstanding Amount (Net)', readonly=True)
+    customer_invoiced_amount_gross = fields.Float(string='Invoiced Amount (Gross)', readonly=True)
+    customer_paid_amount_gross = fields.Float(string='Paid Amount (Gross)', readonly=True)
+    customer_outstanding_amount_gross = fields.Float(string='Outstanding Amount (Gross)', readonly=True)
+    vendor_bills_total_net = fields.Float(string='Vendor Bills (Net)', readonly=True)
+    vendor_bills_total_gross = fields.Float(string='Vendor Bills (Gross)', readonly=True)
+    customer_skonto_taken = fields.Float(string='Customer Cash Discounts (Skonto)', readonly=True)
+    vendor_skonto_received = fields.Float(string='Vendor Cash Discounts Received', readonly=True)
+    total_hours_booked = fields.Float(string='Total Hours Booked', readonly=True)
+    labor_costs = fields.Float(string='Labor Costs', readonly=True)
+    total_hours_booked_adjusted = fields.Float(string='Total Hours Booked (Adjusted)', readonly=True)
+    labor_costs_adjusted = fields.Float(string='Labor Costs (Adjusted)', readonly=True)
+    other_costs_net = fields.Float(string='Other Costs (Net)', readonly=True)
+    total_costs_net = fields.Float(string='Total Costs (Net)', readonly=True)
+    profit_loss_net = fields.Float(string='Profit/Loss (Net)', readonly=True)
+    negative_difference_net = fields.Float(
+        string='Losses (Net)',
+        readonly=True,
+        help="Loss of the group as a positive number, computed from the summed Profit/Loss (Net)."
+    )
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute(f"""
+            CREATE OR REPLACE VIEW {self._table} AS (
+                SELECT bucket.id,
+                       bucket.project_id,
+                       bucket.month,
+                       project.partner_id,
+                       project.user_id,
+                       project.stage_id,
+                       project.company_id,
+                       company.currency_id,
+                       bucket.customer_invoiced_amount_net,
+                       bucket.customer_paid_amount_net,
+                       bucket.customer_invoiced_amount_net - bucket.customer_paid_amount_net
+                           AS customer_outstanding_amount_net,
+                       bucket.customer_invoiced_amount_gross,
+                       bucket.customer_paid_amount_gross,
+                       bucket.customer_invoiced_amount_gross - bucket.customer_paid_amount_gross
+                           AS customer_outstanding_amount_gross,
+                       bucket.vendor_bills_total_net,
+                       bucket.vendor_bills_total_gross,
+                       bucket.customer_skonto_taken,
+                       bucket.vendor_skonto_received,
+                       bucket.total_hours_booked,
+                       bucket.labor_costs,
+                       bucket.total_hours_booked_adjusted,
+                       bucket.total_hours_booked_adjusted * rate.general_hourly_rate AS labor_costs_adjusted,
+                       bucket.other_costs_net,
+                       bucket.labor_costs + bucket.other_costs_net AS total_costs_net,
+                       (bucket.customer_invoiced_amount_net - bucket.customer_skonto_taken)
+                           - (bucket.vendor_bills_total_net - bucket.vendor_skonto_received
+                              + bucket.labor_costs + bucket.other_costs_net) AS profit_loss_net,
+                       GREATEST(0, (bucket.vendor_bills_total_net - bucket.vendor_skonto_received
+                                    + bucket.labor_costs + bucket.other_costs_net)
+                                   - (bucket.customer_invoiced_amount_net - bucket.customer_skonto_taken))
+                           AS negative_difference_net
+                  FROM project_statistic_monthly bucket
+                  JOIN project_project project ON project.id = bucket.project_id
+                  LEFT JOIN res_company company ON company.id = project.company_id
+                 CROSS JOIN (
+                       SELECT COALESCE(
+                                  (SELECT NULLIF(value, '')::float
+                                     FROM ir_config_parameter
+                                    WHERE key = 'project_statistic.general_hourly_rate'),
+                                  66.0) AS general_hourly_rate
+                 ) rate
+            )
+        """)
+
+    @api.model
+    def read_group(self, domain, fields, groupby, offset=0, limit=None, orderby=False, lazy=True):
+        """
+        Losses are not additive: a project with a loss in one month and a profit
+        in the next has no loss over both. Derive them from the summed
+        Profit/Loss (Net) of each group instead of summing the monthly losses.
+        """
+        fields = list(fields)
+        wants_losses = any(spec.split(':')[0] == 'negative_difference_net' for spec in fields)
+        if wants_losses and not any(spec.split(':')[0] == 'profit_loss_net' for spec in fields):
+            fields.append('profit_loss_net:sum')
+
+        result = super().read_group(
+            domain, fields, groupby, offset=offset, limit=limit, orderby=orderby, lazy=lazy
+        )
+        if wants_losses:
+            for group in result:
+                group['negative_difference_net'] = abs(min(0.0, group.get('profit_loss_net') or 0.0))
+        return result
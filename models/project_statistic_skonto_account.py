@@ -0,0 +1,64 @@
+from odoo import models, fields, api
+
+
+class ProjectStatisticSkontoAccount(models.Model):
+    """
+    Skonto (cash discount) account group.
+
+    Journal items on general accounts whose code starts with code_prefix are
+    counted as customer Skonto (Gewährte Skonti) or vendor Skonto (Erhaltene
+    Skonti) of the project of their analytic line. The defaults cover the
+    SKR03/SKR04 accounts the module used to hard-code; other charts of accounts
+    only need other records.
+
+    The matching account IDs are resolved once into the cached compute context
+    of project.project (_get_compute_context), which is invalidated when a group
+    or the code of a matching general account changes.
+    """
+    _name = 'project.statistic.skonto.account'
+    _description = 'Project Statistic Skonto Account Group'
+    _order = 'skonto_type, sequence, code_prefix'
+    _rec_name = 'name'
+
+    name = fields.Char(string='Name', required=True)
+    sequence = fields.Integer(string='Sequence', default=10)
+    active = fields.Boolean(string='Active', default=True)
+    skonto_type = fields.Selection([
+        ('customer', 'Customer Skonto (granted)'),
+        ('vendor', 'Vendor Skonto (received)'),
+    ], string='Type', required=True,
+        help="Customer Skonto reduces the revenue of the project, vendor Skonto reduces its vendor costs."
+    )
+    code_prefix = fields.Char(
+        string='Account Code Prefix',
+        required=True,
+        help="All general accounts whose code starts with this prefix belong to the group, e.g. '7300'."
+    )
+
+    _sql_constraints = [
+        ('code_prefix_type_uniq', 'unique(code_prefix, skonto_type)', 'This account code prefix is already configured.'),
+    ]
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        groups = super().create(vals_list)
+        # The Skonto account IDs of the compute context are resolved from these groups
+        self.env['project.project']._clear_statistic_cache()
+        return groups
+
+    def write(self, vals):
+        result = super().write(vals)
+        if any(key in vals for key in ['code_prefix', 'skonto_type', 'active']):
+            self.env['project.project']._clear_statistic_cache()
+        return result
+
+    def unlink(self):
+        result = super().unlink()
+        self.env['project.project']._clear_statistic_cache()
+        return result
+
+    @api.model
+    def _matches_code(self, codes):
+        """Check whether one of the general account codes starts with a configured prefix."""
+        prefixes = tuple(self.sudo().search([]).mapped('code_prefix'))
+        return bool(prefixes) and any(code and code.startswith(prefixes) for code in codes)
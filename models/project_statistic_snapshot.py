@@ -0,0 +1,148 @@
+from odoo import models, fields, api
+from dateutil.relativedelta import relativedelta
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Project fields recorded in every snapshot
+SNAPSHOT_FIELDS = (
+    'profit_loss_net',
+    'customer_outstanding_amount_net',
+    'labor_costs_adjusted',
+)
+
+
+class ProjectStatisticSnapshot(models.Model):
+    """
+    Periodic snapshot of key project figures for trend history.
+
+    One narrow row per project and snapshot date (no audit columns), written by
+    the "Project Statistic: Take Snapshot" cron job with a single INSERT ... SELECT
+    per run from the stored project fields and the monthly buckets. Trend views only read this table,
+    never the accounting tables.
+
+    Retention: daily snapshots are kept for project_statistic.snapshot_daily_days
+    (default 90) days, older ones are downsampled to the last snapshot of each
+    month and dropped after project_statistic.snapshot_retention_months (default 36).
+    """
+    _name = 'project.statistic.snapshot'
+    _description = 'Project Statistic Snapshot'
+    _order = 'snapshot_date desc, project_id'
+    _rec_name = 'project_id'
+    _log_access = False
+
+    project_id = fields.Many2one(
+        'project.project',
+        string='Project',
+        required=True,
+        ondelete='cascade',
+        index=True,
+        readonly=True,
+    )
+    company_id = fields.Many2one(
+        'res.company',
+        string='Company',
+        readonly=True,
+    )
+    snapshot_date = fields.Date(
+        string='Snapshot Date',
+        required=True,
+        index=True,
+        readonly=True,
+    )
+    profit_loss_net = fields.Float(string='Profit/Loss (Net)', readonly=True)
+    customer_outstanding_amount_net = fields.Float(string='Outstanding Amount (Net)', readonly=True)
+    labor_costs_adjusted = fields.Float(string='Labor Costs (Adjusted)', readonly=True)
+
+    _sql_constraints = [
+        ('project_date_uniq', 'unique(project_id, snapshot_date)', 'A project can only have one snapshot per date.'),
+    ]
+
+    @api.model
+    def _cron_take_snapshot(self):
+        """Cron entry point: snapshot all projects, then apply the retention policy."""
+        count = self._take_snapshot()
+        self._apply_retention()
+        _logger.info(f"Project statistic snapshot taken for {count} project(s)")
+
+    @api.model
+    def _take_snapshot(self, snapshot_date=None):
+        """
+        Record the current figures of all active projects with an analytic account.
+
+        One INSERT ... SELECT for the whole portfolio; running twice on the same
+        date overwrites that date's snapshot.
+
+        Args:
+            snapshot_date: date of the snapshot, today if not given
+
+        Returns:
+            int: number of projects snapshotted
+        """
+        snapshot_date = snapshot_date or fields.Date.context_today(self)
+        self.env['project.project'].flush_model(['active', 'company_id', 'statistic_id'])
+        self.env['project.statistic.aggregate'].flush_model([
+            'has_analytic_account', 'profit_loss_net', 'labor_costs_adjusted',
+        ])
+
+        # Outstanding is not stored on the project (hybrid layout), sum it from the buckets
+        columns = ', '.join(SNAPSHOT_FIELDS)
+        self.env.cr.execute(f"""
+            INSERT INTO project_statistic_snapshot (project_id, company_id, snapshot_date, {columns})
+            SELECT project.id, project.company_id, %(snapshot_date)s,
+                   COALESCE(aggregate.profit_loss_net, 0),
+                   COALESCE(bucket.customer_outstanding_amount_net, 0),
+                   COALESCE(aggregate.labor_costs_adjusted, 0)
+              FROM project_project project
+              JOIN project_statistic_aggregate aggregate ON aggregate.id = project.statistic_id
+              LEFT JOIN (
+                   SELECT project_id,
+                          SUM(customer_invoiced_amount_net - customer_paid_amount_net)
+                              AS customer_outstanding_amount_net
+                     FROM project_statistic_monthly
+                    GROUP BY project_id
+              ) bucket ON bucket.project_id = project.id
+             WHERE project.active
+               AND aggregate.has_analytic_account
+            ON CONFLICT (project_id, snapshot_date) DO UPDATE
+               SET company_id = EXCLUDED.company_id,
+                   {', '.join(f'{field_name} = EXCLUDED.{field_name}' for field_name in SNAPSHOT_FIELDS)}
+        """, {'snapshot_date': snapshot_date})
+        count = self.env.cr.rowcount
+        self.invalidate_model()
+        return count
+
+    @api.model
+    def _apply_retention(self, today=None):
+        """
+        Downsample and expire old snapshots.
+
+        - Older than snapshot_daily_days: keep only the last snapshot of each month
+        - Older than snapshot_retention_months: delete
+
+        Returns:
+            int: number of snapshots deleted
+        """
+        today = today or fields.Date.context_today(self)
+        params = self.env['ir.config_parameter'].sudo()
+        daily_days = int(params.get_param('project_statistic.snapshot_daily_days', default='90'))
+        retention_months = int(params.get_param('project_statistic.snapshot_retention_months', default='36'))
+
+        self.env.cr.execute("""
+            DELETE FROM project_statistic_snapshot snapshot
+             WHERE snapshot.snapshot_date < %(expire_before)s
+                OR (snapshot.snapshot_date < %(downsample_before)s
+                    AND EXISTS (
+                        SELECT 1
+                          FROM project_statistic_snapshot later
+                         WHERE later.project_id = snapshot.project_id
+                           AND later.snapshot_date > snapshot.snapshot_date
+                           AND date_trunc('month', later.snapshot_date) = date_trunc('month', snapshot.snapshot_date)
+                    ))
+        """, {
+            'expire_before': today - relativedelta(months=retention_months),
+            'downsample_before': today - relativedelta(days=daily_days),
+        })
+        deleted = self.env.cr.rowcount
+        self.invalidate_model()
+        return deleted
@@ -0,0 +1,16 @@
+from odoo import models, fields
+
+
+class ResCompany(models.Model):
+    _inherit = 'res.company'
+
+    project_statistic_recompute_mode = fields.Selection([
+        ('sync', 'Synchronous (before commit)'),
+        ('async', 'Asynchronous (queue + cron)'),
+    ], string='Project Statistics Recompute',
+        default='sync',
+        required=True,
+        help="Synchronous: project financial data is recomputed at the end of the transaction that posts "
+             "the invoice or timesheet. Asynchronous: affected projects are queued and recomputed by a "
+             "scheduled job, users do not wait for the recompute. Queued projects show a 'Stale Since' date."
+    )
@@ -0,0 +1,23 @@
+from odoo import models
+
+
+class SaleOrder(models.Model):
+    _inherit = 'sale.order'
+
+    def write(self, vals):
+        """
+        Override write to refresh the sales order fields of the linked projects
+        when orders are confirmed, cancelled, reset or moved to another project.
+
+        Only the sales order field group is recomputed: invoices, bills and
+        timesheets of the projects are not read.
+        """
+        relevant = any(key in vals for key in ['state', 'project_id'])
+        project_ids = set(self.project_id.ids) if relevant else set()
+
+        result = super().write(vals)
+
+        if relevant:
+            project_ids.update(self.project_id.ids)
+            self.env['project.project']._schedule_financial_data_recompute(project_ids, {'sales_orders'})
+        return result
@@ -1,5 +1,12 @@
+from datetime import timedelta
+from unittest.mock import patch
+
 from odoo.tests.common import TransactionCase
+from odoo.tools import mute_logger
 from odoo import fields
+from odoo.exceptions import AccessError
+
+from odoo.addons.project_statistic.models.project_analytics import FIELD_GROUPS, STORED_FINANCIAL_FIELDS
 
 
 class TestProjectAnalytics(TransactionCase):
@@ -24,8 +31,10 @@ class TestProjectAnalytics(TransactionCase):
 
         self.project = self.Project.create({
             'name': 'Test Project',
-            'analytic_account_id': self.analytic_account.id,
+            'account_id': self.analytic_account.id,
         })
+        # Fill the statistics of the new project (scheduled for the end of the transaction)
+        self.env.cr.precommit.run()
 
         self.income_account = self.env['account.account'].search([
             ('account_type', '=', 'income')
@@ -35,6 +44,24 @@ class TestProjectAnalytics(TransactionCase):
             ('account_type', '=', 'expense')
         ], limit=1)
 
+    def _create_invoice(self, price_unit, move_type='out_invoice', name='Test Product',
+                        invoice_date=None, distribution=None):
+        """Create a single-line, tax-free invoice or bill booked on the test project"""
+        account = self.expense_account if move_type.startswith('in_') else self.income_account
+        return self.Invoice.create({
+            'move_type': move_type,
+            'partner_id': self.partner.id,
+            'invoice_date': invoice_date or fields.Date.today(),
+            'invoice_line_ids': [(0, 0, {
+                'name': name,
+                'quantity': 1,
+                'price_unit': price_unit,
+                'tax_ids': [(6, 0, [])],
+                'account_id': account.id,
+                'analytic_distribution': distribution or {str(self.analytic_account.id): 100},
+            })],
+        })
+
     def test_01_project_without_analytic_account(self):
         """Test that projects without analytic accounts don't crash"""
         project_no_analytic = self.Project.create({
@@ -43,9 +70,9 @@ class TestProjectAnalytics(TransactionCase):
 
         project_no_analytic._compute_financial_data()
 
-        self.assertEqual(project_no_analytic.customer_invoiced_amount, 0.0)
-        self.assertEqual(project_no_analytic.vendor_bills_total, 0.0)
-        self.assertEqual(project_no_analytic.profit_loss, 0.0)
+        self.assertEqual(project_no_analytic.customer_invoiced_amount_net, 0.0)
+        self.assertEqual(project_no_analytic.vendor_bills_total_net, 0.0)
+        self.assertEqual(project_no_analytic.profit_loss_net, 0.0)
 
     def test_02_customer_invoice_basic(self):
         """Test basic customer invoice calculation"""
@@ -65,8 +92,8 @@ class TestProjectAnalytics(TransactionCase):
 
         self.project._compute_financial_data()
 
-        self.assertGreater(self.project.customer_invoiced_amount, 0.0)
-        self.assertEqual(self.project.customer_outstanding_amount, self.project.customer_invoiced_amount)
+        self.assertGreater(self.project.customer_invoiced_amount_net, 0.0)
+        self.assertEqual(self.project.customer_outstanding_amount_net, self.project.customer_invoiced_amount_net)
 
     def test_03_vendor_bill_basic(self):
         """Test basic vendor bill calculation"""
@@ -86,7 +113,7 @@ class TestProjectAnalytics(TransactionCase):
 
         self.project._compute_financial_data()
 
-        self.assertGreater(self.project.vendor_bills_total, 0.0)
+        self.assertGreater(self.project.vendor_bills_total_net, 0.0)
 
     def test_04_skonto_customer_tracking(self):
         """Test that customer Skonto from account 7300 is tracked"""
@@ -178,5 +205,726 @@ class TestProjectAnalytics(TransactionCase):
 
         self.project._compute_financial_data()
 
-        expected_profit = self.project.customer_invoiced_amount - self.project.vendor_bills_total - self.project.total_costs_net
-        self.assertAlmostEqual(self.project.profit_loss, expected_profit, places=2)
+        expected_profit = self.project.customer_invoiced_amount_net - self.project.vendor_bills_total_net - self.project.total_costs_net
+        self.assertAlmostEqual(self.project.profit_loss_net, expected_profit, places=2)
+
+    def test_07_batch_compute_split_distribution_and_refund(self):
+        """Test that a batch computes each project's share, with refunds subtracted"""
+        other_account = self.AnalyticAccount.create({
+            'name': 'Second Project Analytic',
+            'plan_id': self.env.ref('analytic.analytic_plan_projects').id,
+        })
+        other_project = self.Project.create({
+            'name': 'Second Project',
+            'account_id': other_account.id,
+        })
+
+        invoice = self._create_invoice(1000.0, name='Shared Item', distribution={
+            str(self.analytic_account.id): 60,
+            str(other_account.id): 40,
+        })
+        invoice.action_post()
+
+        refund = self._create_invoice(100.0, move_type='out_refund', name='Credit Note')
+        refund.action_post()
+
+        (self.project | other_project)._compute_financial_data()
+
+        self.assertAlmostEqual(self.project.customer_invoiced_amount_net, 500.0, places=2)
+        self.assertAlmostEqual(other_project.customer_invoiced_amount_net, 400.0, places=2)
+        self.assertAlmostEqual(other_project.customer_paid_amount_net, 0.0, places=2)
+
+    def test_08_triggers_coalesce_into_precommit_flush(self):
+        """Test that line hooks only mark projects dirty and recompute once before commit"""
+        invoice = self._create_invoice(1000.0)
+        invoice.action_post()
+
+        dirty_groups = self.env.cr.precommit.data.get('project_statistic.dirty_project_groups')
+        self.assertEqual(set(dirty_groups), {self.project.id})
+        self.assertIn('revenue', dirty_groups[self.project.id])
+
+        self.env.cr.precommit.run()
+
+        self.assertAlmostEqual(self.project.customer_invoiced_amount_net, 1000.0, places=2)
+
+    def test_09_async_mode_queues_and_cron_drains(self):
+        """Test that async companies queue projects and the queue processor recomputes them"""
+        self.env.company.project_statistic_recompute_mode = 'async'
+        self.project.company_id = self.env.company
+
+        invoice = self._create_invoice(1000.0)
+        invoice.action_post()
+
+        Queue = self.env['project.statistic.queue']
+        self.assertEqual(Queue.search([]).project_id, self.project)
+        self.assertTrue(self.project.financial_data_stale_since)
+
+        Queue._process_queue()
+
+        self.assertFalse(Queue.search([]))
+        self.project.invalidate_recordset()
+        self.assertFalse(self.project.financial_data_stale_since)
+        self.assertAlmostEqual(self.project.customer_invoiced_amount_net, 1000.0, places=2)
+
+    def test_10_incremental_mode_applies_deltas(self):
+        """Test that incremental mode applies line deltas and matches a full recompute"""
+        self.env['ir.config_parameter'].sudo().set_param('project_statistic.recompute_strategy', 'incremental')
+        self.project._compute_financial_data()
+
+        invoice = self._create_invoice(1000.0)
+        invoice.action_post()
+        self.env.cr.precommit.run()
+
+        self.assertAlmostEqual(self.project.customer_invoiced_amount_net, 1000.0, places=2)
+        self.assertAlmostEqual(self.project.profit_loss_net, 1000.0, places=2)
+
+        invoice.button_draft()
+        self.env.cr.precommit.run()
+
+        self.assertAlmostEqual(self.project.customer_invoiced_amount_net, 0.0, places=2)
+        self.assertEqual(self.project._verify_financial_data(), {})
+
+    def test_11_distribution_index_splits_multi_plan_keys(self):
+        """Test that the distribution index splits multi-plan keys into one row per account"""
+        other_plan = self.env['account.analytic.plan'].create({'name': 'Departments'})
+        department = self.AnalyticAccount.create({
+            'name': 'Department',
+            'plan_id': other_plan.id,
+        })
+
+        invoice = self._create_invoice(1000.0, distribution={f"{self.analytic_account.id},{department.id}": 100})
+        invoice.action_post()
+
+        Distribution = self.env['project.statistic.distribution']
+        Distribution._sync_pending()
+        rows = Distribution.search([('move_line_id', 'in', invoice.invoice_line_ids.ids)])
+        self.assertEqual(rows.analytic_account_id, self.analytic_account | department)
+        self.assertTrue(all(row.parent_state == 'posted' for row in rows))
+
+        self.project._compute_financial_data()
+        self.assertAlmostEqual(self.project.customer_invoiced_amount_net, 1000.0, places=2)
+
+    def test_12_monthly_buckets_and_period_totals(self):
+        """Test that figures are bucketed per month and lifetime totals are their sum"""
+        for invoice_date, price in (('2025-01-15', 1000.0), ('2025-03-10', 500.0)):
+            invoice = self._create_invoice(price, invoice_date=invoice_date)
+            invoice.action_post()
+
+        self.project._compute_financial_data()
+
+        buckets = self.env['project.statistic.monthly'].search([('project_id', '=', self.project.id)])
+        self.assertEqual(
+            {str(bucket.month): bucket.customer_invoiced_amount_net for bucket in buckets},
+            {'2025-01-01': 1000.0, '2025-03-01': 500.0},
+        )
+        self.assertAlmostEqual(self.project.customer_invoiced_amount_net, 1500.0, places=2)
+
+        self.env.flush_all()
+        period = self.env['project.statistic.report'].read_group(
+            [('project_id', '=', self.project.id), ('month', '>=', '2025-02-01'), ('month', '<=', '2025-03-31')],
+            ['customer_invoiced_amount_net:sum', 'profit_loss_net:sum'],
+            ['project_id'],
+        )[0]
+        self.assertAlmostEqual(period['customer_invoiced_amount_net'], 500.0, places=2)
+        self.assertAlmostEqual(period['profit_loss_net'], 500.0, places=2)
+
+    def test_13_period_report_sums_buckets(self):
+        """Test that the date-range report sums the monthly figures of the selected months"""
+        for invoice_date, price in (('2025-01-15', 1000.0), ('2025-04-10', 300.0)):
+            invoice = self._create_invoice(price, invoice_date=invoice_date)
+            invoice.action_post()
+        self.project._compute_financial_data()
+        self.env.flush_all()
+
+        groups = self.env['project.statistic.report'].read_group(
+            [('project_id', '=', self.project.id), ('month', '>=', '2025-04-01'), ('month', '<=', '2025-06-30')],
+            ['customer_invoiced_amount_net:sum', 'negative_difference_net:sum'],
+            ['project_id'],
+        )
+        self.assertEqual(len(groups), 1)
+        self.assertAlmostEqual(groups[0]['customer_invoiced_amount_net'], 300.0, places=2)
+        self.assertAlmostEqual(groups[0]['negative_difference_net'], 0.0, places=2)
+
+    def test_14_snapshots_bulk_insert_and_retention(self):
+        """Test that snapshots are taken for all projects and downsampled to one per month"""
+        Snapshot = self.env['project.statistic.snapshot']
+        self.project._compute_financial_data()
+        self.env.flush_all()
+
+        for day in ('2025-01-05', '2025-01-20', '2025-01-31'):
+            Snapshot._take_snapshot(fields.Date.to_date(day))
+
+        snapshots = Snapshot.search([('project_id', '=', self.project.id)])
+        self.assertEqual(len(snapshots), 3)
+
+        Snapshot._apply_retention(today=fields.Date.to_date('2025-06-30'))
+
+        snapshots = Snapshot.search([('project_id', '=', self.project.id)])
+        self.assertEqual([str(date) for date in snapshots.mapped('snapshot_date')], ['2025-01-31'])
+
+    def test_15_parallel_refresh_matches_serial(self):
+        """Test that the parallel refresh writes the same figures as the serial compute"""
+        other_project = self.Project.create({'name': 'Second Project'})
+        projects = self.project | other_project
+        invoice = self._create_invoice(1000.0)
+        invoice.action_post()
+
+        # The shards run on their own cursors and would not see the uncommitted test data:
+        # aggregate on the test cursor up front and let the shards return that result
+        monthly_values = projects._get_monthly_financial_values()
+        with patch.object(
+            type(self.Project), '_get_monthly_financial_values', autospec=True,
+            side_effect=lambda shard: {pid: monthly_values[pid] for pid in shard.ids if pid in monthly_values},
+        ) as compute_shard:
+            timings = projects._refresh_financial_data_parallel(workers=2)
+
+        self.assertEqual(len(timings['shards']), 2)
+        self.assertEqual(
+            sorted(call.args[0].ids for call in compute_shard.call_args_list),
+            sorted([[self.project.id], [other_project.id]]),
+        )
+        self.assertAlmostEqual(self.project.customer_invoiced_amount_net, 1000.0, places=2)
+        self.assertEqual(projects._verify_financial_data(), {})
+
+    def test_16_timesheet_recomputes_labor_group_only(self):
+        """Test that a timesheet only marks the labor group dirty and keeps the other groups"""
+        invoice = self._create_invoice(1000.0)
+        invoice.action_post()
+        self.env.cr.precommit.run()
+
+        employee = self.env['hr.employee'].create({'name': 'Test Employee'})
+        self.env['account.analytic.line'].create({
+            'name': 'Work',
+            'project_id': self.project.id,
+            'employee_id': employee.id,
+            'unit_amount': 2.0,
+        })
+
+        dirty_groups = self.env.cr.precommit.data.get('project_statistic.dirty_project_groups')
+        self.assertEqual(dirty_groups, {self.project.id: {'labor'}})
+
+        self.env.cr.precommit.run()
+
+        self.assertAlmostEqual(self.project.total_hours_booked, 2.0, places=2)
+        self.assertAlmostEqual(self.project.customer_invoiced_amount_net, 1000.0, places=2)
+        self.assertEqual(self.project._verify_financial_data(), {})
+
+    def test_17_detail_fields_not_stored(self):
+        """Test that only the core fields are stored and the details are read from the buckets"""
+        # The stored fields live in the statistics record and are delegated to the project
+        stored = {
+            name for name, field in self.project._fields.items()
+            if field.inherited and field.related_field.model_name == 'project.statistic.aggregate'
+        }
+        self.assertEqual(stored, set(STORED_FINANCIAL_FIELDS))
+        self.assertFalse(self.project._fields['customer_invoiced_amount_gross'].store)
+
+        invoice = self._create_invoice(1000.0)
+        invoice.action_post()
+        self.env.cr.precommit.run()
+
+        self.assertAlmostEqual(self.project.customer_invoiced_amount_gross, 1000.0, places=2)
+        self.assertAlmostEqual(self.project.customer_outstanding_amount_net, 1000.0, places=2)
+
+    def test_18_compute_context_cached_and_invalidated(self):
+        """Test that the compute context is cached and rebuilt after a setting changes"""
+        context = self.Project._get_compute_context()
+        self.assertIs(self.Project._get_compute_context(), context)
+        self.assertEqual(context.project_plan_id, self.env.ref('analytic.analytic_plan_projects').id)
+
+        self.env['ir.config_parameter'].sudo().set_param('project_statistic.general_hourly_rate', '80.0')
+        self.assertEqual(self.Project._get_compute_context().general_hourly_rate, 80.0)
+
+        skonto_account = self.env['account.account'].create({
+            'name': 'Gewährte Skonti',
+            'code': '730099',
+            'account_type': 'expense',
+        })
+        self.assertIn(skonto_account.id, self.Project._get_compute_context().customer_skonto_account_ids)
+        self.assertEqual(self.Project._get_skonto_type(skonto_account.id), 'customer')
+
+    def test_19_configurable_skonto_accounts(self):
+        """Test that Skonto account groups are configurable and summed per batch"""
+        self.env['project.statistic.skonto.account'].create({
+            'name': 'Gewährte Skonti SKR03',
+            'skonto_type': 'customer',
+            'code_prefix': '8736',
+        })
+        skonto_account = self.env['account.account'].create({
+            'name': 'Gewährte Skonti 19%',
+            'code': '873600',
+            'account_type': 'expense',
+        })
+        self.assertEqual(self.Project._get_skonto_type(skonto_account.id), 'customer')
+
+        entry = self.Invoice.create({
+            'move_type': 'entry',
+            'date': fields.Date.today(),
+            'line_ids': [
+                (0, 0, {
+                    'name': 'Skonto',
+                    'account_id': skonto_account.id,
+                    'debit': 30.0,
+                    'analytic_distribution': {str(self.analytic_account.id): 100},
+                }),
+                (0, 0, {
+                    'name': 'Skonto',
+                    'account_id': self.income_account.id,
+                    'credit': 30.0,
+                }),
+            ],
+        })
+        entry.action_post()
+
+        totals = self.Project._get_skonto_totals([self.analytic_account.id])
+        month = fields.Date.start_of(fields.Date.today(), 'month')
+        self.assertAlmostEqual(totals[self.analytic_account.id][month]['customer_skonto'], 30.0, places=2)
+        self.assertAlmostEqual(totals[self.analytic_account.id][month]['vendor_skonto'], 0.0, places=2)
+
+    def test_20_timesheet_totals_apply_hfc_factor(self):
+        """Test that grouped timesheet totals apply the HFC factor, falsy factors count as 1.0"""
+        Employee = self.env['hr.employee']
+        employee_factor = Employee.create({'name': 'Employee HFC 0.5', 'faktor_hfc': 0.5})
+        employee_no_factor = Employee.create({'name': 'Employee HFC 0', 'faktor_hfc': 0.0})
+
+        for employee in (employee_factor, employee_no_factor):
+            self.AnalyticLine.create({
+                'name': 'Work',
+                'project_id': self.project.id,
+                'employee_id': employee.id,
+                'unit_amount': 4.0,
+            })
+
+        totals = self.Project._get_timesheet_totals([self.analytic_account.id])
+        month = fields.Date.start_of(fields.Date.today(), 'month')
+        self.assertAlmostEqual(totals[self.analytic_account.id][month]['hours'], 8.0, places=2)
+        self.assertAlmostEqual(totals[self.analytic_account.id][month]['adjusted_hours'], 6.0, places=2)
+
+    def test_21_hfc_change_recomputes_labor_of_affected_projects(self):
+        """Test that changing an employee's HFC factor recomputes only their projects' labor fields"""
+        employee = self.env['hr.employee'].create({'name': 'Test Employee', 'faktor_hfc': 1.0})
+        other_project = self.Project.create({
+            'name': 'Other Project',
+            'account_id': self.AnalyticAccount.create({
+                'name': 'Other Project Analytic',
+                'plan_id': self.env.ref('analytic.analytic_plan_projects').id,
+            }).id,
+        })
+        self.AnalyticLine.create({
+            'name': 'Work',
+            'project_id': self.project.id,
+            'employee_id': employee.id,
+            'unit_amount': 10.0,
+        })
+        self.env.cr.precommit.run()
+        self.assertAlmostEqual(self.project.total_hours_booked_adjusted, 10.0, places=2)
+
+        employee.faktor_hfc = 0.8
+
+        dirty_groups = self.env.cr.precommit.data.get('project_statistic.dirty_project_groups')
+        self.assertEqual(dirty_groups, {self.project.id: {'labor'}})
+        self.assertNotIn(other_project.id, dirty_groups)
+
+        self.env.cr.precommit.run()
+        self.assertAlmostEqual(self.project.total_hours_booked_adjusted, 8.0, places=2)
+
+    def test_22_rate_only_refresh(self):
+        """Test that a rate change only updates the adjusted labor costs"""
+        employee = self.env['hr.employee'].create({'name': 'Test Employee'})
+        self.AnalyticLine.create({
+            'name': 'Work',
+            'project_id': self.project.id,
+            'employee_id': employee.id,
+            'unit_amount': 10.0,
+        })
+        self.env.cr.precommit.run()
+        profit = self.project.profit_loss_net
+
+        wizard = self.env['refresh.financial.data.wizard'].create({
+            'general_hourly_rate': self.Project._get_general_hourly_rate() + 10.0,
+        })
+        wizard.action_refresh_data()
+
+        self.assertAlmostEqual(self.project.labor_costs_adjusted, 10.0 * wizard.general_hourly_rate, places=2)
+        self.assertAlmostEqual(self.project.profit_loss_net, profit, places=2)
+        self.assertEqual(self.project._verify_financial_data(), {})
+
+    def test_23_payment_refreshes_paid_amounts(self):
+        """Test that reconciling a payment recomputes only the paid amounts of the invoice's project"""
+        invoice = self._create_invoice(1000.0)
+        invoice.action_post()
+        self.env.cr.precommit.run()
+        self.assertAlmostEqual(self.project.customer_paid_amount_net, 0.0, places=2)
+
+        self.env['account.payment.register'].with_context(
+            active_model='account.move', active_ids=invoice.ids
+        ).create({})._create_payments()
+
+        dirty_groups = self.env.cr.precommit.data.get('project_statistic.dirty_project_groups')
+        self.assertIn('payments', dirty_groups[self.project.id])
+        self.assertNotIn('labor', dirty_groups[self.project.id])
+
+        self.env.cr.precommit.run()
+        self.assertAlmostEqual(self.project.customer_paid_amount_net, 1000.0, places=2)
+        self.assertAlmostEqual(self.project.customer_outstanding_amount_net, 0.0, places=2)
+
+    def test_24_sale_order_totals_and_taxes(self):
+        """Test that confirming a sales order refreshes only the sales order fields, including the taxes"""
+        tax = self.env['account.tax'].create({
+            'name': 'USt 19% Test',
+            'amount': 19.0,
+            'type_tax_use': 'sale',
+        })
+        product = self.env['product.product'].create({'name': 'Service', 'list_price': 500.0})
+        order = self.env['sale.order'].create({
+            'partner_id': self.partner.id,
+            'project_id': self.project.id,
+            'order_line': [(0, 0, {
+                'product_id': product.id,
+                'product_uom_qty': 2,
+                'price_unit': 500.0,
+                'tax_id': [(6, 0, tax.ids)],
+            })],
+        })
+        order.action_confirm()
+
+        dirty_groups = self.env.cr.precommit.data.get('project_statistic.dirty_project_groups')
+        self.assertEqual(dirty_groups[self.project.id], {'sales_orders'})
+
+        self.env.cr.precommit.run()
+        self.assertAlmostEqual(self.project.sale_order_amount_net, 1000.0, places=2)
+        self.assertEqual(self.project.sale_order_tax_ids, tax)
+        self.assertEqual(self.project.sale_order_tax_names, 'USt 19% Test')
+        self.assertIn(self.project, self.Project.search([('sale_order_tax_ids', 'in', tax.ids)]))
+
+    def test_25_other_costs_exclude_vendor_bills(self):
+        """Test that other costs count negative cost lines but not vendor bill lines"""
+        self.AnalyticLine.create({
+            'name': 'Material',
+            'account_id': self.analytic_account.id,
+            'amount': -250.0,
+        })
+        bill = self._create_invoice(400.0, move_type='in_invoice', name='Subcontractor')
+        bill.action_post()
+
+        totals = self.Project._get_other_costs_totals([self.analytic_account.id])
+        self.assertAlmostEqual(sum(totals[self.analytic_account.id].values()), 250.0, places=2)
+
+    def test_26_analytic_account_project_index(self):
+        """Test that the account -> project index is cached and follows project account changes"""
+        self.Project._get_project_ids_by_analytic_accounts([self.analytic_account.id])
+        with self.assertQueryCount(0):
+            project_ids = self.Project._get_project_ids_by_analytic_accounts([self.analytic_account.id])
+        self.assertEqual(project_ids, [self.project.id])
+
+        other_account = self.AnalyticAccount.create({
+            'name': 'Other Project Analytic',
+            'plan_id': self.env.ref('analytic.analytic_plan_projects').id,
+        })
+        self.project.account_id = other_account
+        self.assertEqual(self.Project._get_project_ids_by_analytic_accounts([self.analytic_account.id]), [])
+        self.assertEqual(self.Project._get_project_ids_by_analytic_accounts([other_account.id]), [self.project.id])
+
+    def test_27_draft_moves_add_no_recompute(self):
+        """Test that editing draft bills triggers nothing and posting triggers the recompute once"""
+        bill = self.Invoice.create({
+            'move_type': 'in_invoice',
+            'partner_id': self.partner.id,
+            'invoice_date': fields.Date.today(),
+            'invoice_line_ids': [(0, 0, {
+                'name': f'Line {index}',
+                'quantity': 1,
+                'price_unit': 10.0,
+                'tax_ids': [(6, 0, [])],
+                'account_id': self.expense_account.id,
+                'analytic_distribution': {str(self.analytic_account.id): 100},
+            }) for index in range(20)],
+        })
+        bill.invoice_line_ids[0].price_unit = 20.0
+
+        self.assertFalse(self.env.cr.precommit.data.get('project_statistic.dirty_project_groups'))
+        self.assertFalse(self.env.cr.precommit.data.get('project_statistic.dirty_move_line_ids'))
+
+        bill.action_post()
+        dirty_groups = self.env.cr.precommit.data.get('project_statistic.dirty_project_groups')
+        self.assertIn('vendor_costs', dirty_groups[self.project.id])
+
+        self.env.cr.precommit.run()
+        self.assertAlmostEqual(self.project.vendor_bills_total_net, 210.0, places=2)
+
+    def test_28_bulk_mode_defers_recompute_to_one_rebuild(self):
+        """Test that bulk mode only records analytic accounts and the rebuild computes the projects"""
+        Bulk = self.env['project.statistic.bulk.account']
+        bill = self._create_invoice(300.0, move_type='in_invoice', name='Imported bill')
+        bill.with_context(project_statistic_bulk_mode=True).action_post()
+
+        self.assertFalse(self.env.cr.precommit.data.get('project_statistic.dirty_project_groups'))
+        self.assertEqual(Bulk.search([]).analytic_account_id, self.analytic_account)
+
+        self.assertEqual(Bulk._finish(), 1)
+        self.assertFalse(Bulk.search([]))
+        self.assertAlmostEqual(self.project.vendor_bills_total_net, 300.0, places=2)
+
+    def test_29_unchanged_values_are_not_written(self):
+        """Test that a recompute without changes writes nothing and a change writes only changed fields"""
+        self.project._compute_financial_data()
+        self.env.flush_all()
+        write_date = self.project.write_date
+
+        changes = self.project._compute_financial_data()
+        self.assertEqual(changes, {'projects': 0, 'fields': 0})
+        self.project.invalidate_recordset(['write_date'])
+        self.assertEqual(self.project.write_date, write_date)
+
+        bill = self._create_invoice(120.0, move_type='in_invoice', name='Material')
+        bill.action_post()
+
+        changes = self.project._compute_financial_data()
+        self.assertEqual(changes['projects'], 1)
+        # Vendor bills and profit/loss changed, revenue, hours and sales orders did not
+        self.assertEqual(changes['fields'], 2)
+        self.assertAlmostEqual(self.project.vendor_bills_total_net, 120.0, places=2)
+
+    def test_30_recompute_does_not_write_project_row(self):
+        """Test that the figures live in the statistics record and recomputes leave the project row alone"""
+        self.assertTrue(self.project.statistic_id)
+        self.env.flush_all()
+        write_date = self.project.write_date
+
+        invoice = self._create_invoice(800.0, name='Milestone')
+        invoice.action_post()
+        self.project._compute_financial_data()
+
+        self.assertAlmostEqual(self.project.statistic_id.customer_invoiced_amount_net, 800.0, places=2)
+        self.assertAlmostEqual(self.project.customer_invoiced_amount_net, 800.0, places=2)
+        self.project.invalidate_recordset(['write_date'])
+        self.assertEqual(self.project.write_date, write_date)
+        # The dashboard still sorts and filters on the delegated fields
+        self.assertIn(self.project, self.Project.search(
+            [('customer_invoiced_amount_net', '>', 0)], order='profit_loss_net desc'
+        ))
+
+        statistic = self.project.statistic_id
+        self.project.unlink()
+        self.assertFalse(statistic.exists())
+
+    @mute_logger('odoo.sql_db')
+    def test_31_failed_flush_rolls_back_to_savepoint(self):
+        """Test that a failing statement in the precommit flush leaves the transaction usable"""
+        def failing_compute(projects):
+            projects.env.cr.execute("SELECT 1 / 0")
+
+        with patch.object(type(self.Project), '_compute_financial_data', failing_compute), \
+                self.assertLogs('odoo.addons.project_statistic.models.project_analytics', level='ERROR'):
+            self.Project._schedule_financial_data_recompute([self.project.id])
+            self.env.cr.precommit.run()
+
+        self.env.cr.execute("SELECT 1")
+        self.assertEqual(self.env.cr.fetchone(), (1,))
+
+    def test_32_failed_queue_item_backs_off(self):
+        """Test that a failing queue item is tried once per run and then waits for its backoff"""
+        Queue = self.env['project.statistic.queue']
+        Queue._enqueue([self.project.id])
+        Queue._enqueue([self.project.id])
+        self.assertEqual(Queue.search([]).mapped('requeued'), [False, True])
+
+        calls = []
+
+        def failing_recompute(queue, items):
+            calls.append(items.ids)
+            raise ValueError("boom")
+
+        with patch.object(type(Queue), '_recompute_items', failing_recompute), \
+                self.assertLogs('odoo.addons.project_statistic.models.project_statistic_queue', level='WARNING'):
+            self.assertEqual(Queue._process_queue(), 0)
+
+        # One chunk attempt plus one attempt per item, no retries within the run
+        self.assertEqual(len(calls), 3)
+        items = Queue.search([])
+        self.assertEqual(items.mapped('attempts'), [1, 1])
+        self.assertTrue(all(item.next_attempt > fields.Datetime.now() for item in items))
+        self.assertEqual(Queue._process_queue(), 0)
+        self.assertEqual(len(calls), 3)
+
+    def test_33_async_company_gets_no_inline_deltas(self):
+        """Test that incremental deltas of async companies are queued instead of applied inline"""
+        self.env['ir.config_parameter'].sudo().set_param('project_statistic.recompute_strategy', 'incremental')
+        self.env.company.project_statistic_recompute_mode = 'async'
+        self.project.company_id = self.env.company
+        self.project._compute_financial_data()
+
+        self._create_invoice(500.0, move_type='in_invoice').action_post()
+        self.env.cr.precommit.run()
+
+        self.assertEqual(self.env['project.statistic.queue'].search([]).project_id, self.project)
+        self.assertAlmostEqual(self.project.vendor_bills_total_net, 0.0, places=2)
+
+    def test_34_verify_reports_detail_drift_before_repair(self):
+        """Test that the verifier reports drifted bucket-based detail fields and then repairs them"""
+        self._create_invoice(500.0, move_type='in_invoice').action_post()
+        self.project._compute_financial_data()
+
+        self.env.flush_all()
+        self.env.cr.execute("""
+            UPDATE project_statistic_monthly
+               SET vendor_bills_total_gross = vendor_bills_total_gross + 10
+             WHERE project_id = %s
+        """, [self.project.id])
+        self.project.invalidate_recordset()
+
+        with self.assertLogs('odoo.addons.project_statistic.models.project_analytics', level='WARNING'):
+            mismatches = self.project._verify_financial_data(fix=True)
+        self.assertIn('vendor_bills_total_gross', mismatches[self.project.id])
+        self.assertEqual(self.project._verify_financial_data(), {})
+
+    def test_35_context_bulk_mode_rebuilds_at_commit(self):
+        """Test that a context-scoped bulk import is rebuilt once when its transaction ends"""
+        Bulk = self.env['project.statistic.bulk.account']
+        bill = self._create_invoice(300.0, move_type='in_invoice', name='Imported bill')
+        bill.with_context(project_statistic_bulk_mode=True).action_post()
+        self.assertEqual(Bulk.search([]).analytic_account_id, self.analytic_account)
+
+        self.env.cr.precommit.run()
+
+        self.assertFalse(Bulk.search([]))
+        self.assertAlmostEqual(self.project.vendor_bills_total_net, 300.0, places=2)
+
+    def test_36_bulk_mode_access_and_cron_deadline(self):
+        """Test that only project managers switch bulk mode and the cron waits for the deadline"""
+        Bulk = self.env['project.statistic.bulk.account']
+        user = self.env['res.users'].create({
+            'name': 'Bulk Mode User',
+            'login': 'bulk_mode_user',
+            'groups_id': [(6, 0, [self.env.ref('base.group_user').id])],
+        })
+        with self.assertRaises(AccessError):
+            Bulk.with_user(user)._start(1)
+        with self.assertRaises(AccessError):
+            Bulk.with_user(user)._finish()
+
+        Bulk._start(1)
+        Bulk._record(self.analytic_account.ids)
+        Bulk._cron_finish()
+        self.assertEqual(Bulk.search([]).analytic_account_id, self.analytic_account)
+
+        self.env['ir.config_parameter'].sudo().set_param(
+            'project_statistic.bulk_mode_until', fields.Datetime.to_string(fields.Datetime.now() - timedelta(minutes=1))
+        )
+        Bulk._cron_finish()
+        self.assertFalse(Bulk.search([]))
+        self.assertFalse(Bulk._get_deadline())
+
+    def test_37_change_detection_uses_project_currency_and_hours_precision(self):
+        """Test that amounts compare within the project's currency rounding and hours within their own precision"""
+        company = self.env['res.company'].create({
+            'name': 'Yen Company',
+            'currency_id': self.env.ref('base.JPY').id,
+        })
+        project = self.Project.create({'name': 'Yen Project', 'company_id': company.id})
+        self.assertEqual(project.currency_id.rounding, 1.0)
+
+        changes = project._write_financial_values({project.id: {
+            'customer_invoiced_amount_net': 0.4,
+            'total_hours_booked': 0.4,
+        }})
+
+        self.assertEqual(changes, {'projects': 1, 'fields': 1})
+        project.invalidate_recordset()
+        self.assertEqual(project.customer_invoiced_amount_net, 0.0)
+        self.assertAlmostEqual(project.total_hours_booked, 0.4, places=2)
+
+    def test_38_project_create_schedules_and_keeps_unrelated_caches(self):
+        """Test that a new project is scheduled for the flush and unrelated changes keep the cached context"""
+        context = self.Project._get_compute_context()
+        self.env['account.account'].create({
+            'name': 'Office Supplies',
+            'code': '999990',
+            'account_type': 'expense',
+        })
+        self.Project.create({'name': 'Project Without Account'})
+        self.assertIs(self.Project._get_compute_context(), context)
+
+        other_account = self.AnalyticAccount.create({
+            'name': 'New Project Analytic',
+            'plan_id': self.env.ref('analytic.analytic_plan_projects').id,
+        })
+        project = self.Project.create({'name': 'New Project', 'account_id': other_account.id})
+        self.assertEqual(
+            self.env.cr.precommit.data.get('project_statistic.dirty_project_groups', {}).get(project.id),
+            set(FIELD_GROUPS),
+        )
+        self.assertEqual(self.Project._get_project_ids_by_analytic_accounts([other_account.id]), [project.id])
+
+    def test_39_group_recompute_without_buckets_computes_in_full(self):
+        """Test that a group recompute of a project with stored figures but no buckets keeps the other groups"""
+        invoice = self._create_invoice(1000.0)
+        invoice.action_post()
+        self.env.cr.precommit.run()
+        self.env.cr.execute("DELETE FROM project_statistic_monthly WHERE project_id = %s", [self.project.id])
+        self.env['project.statistic.monthly'].invalidate_model()
+
+        self.project._recompute_financial_groups({'labor'})
+
+        self.assertAlmostEqual(self.project.customer_invoiced_amount_net, 1000.0, places=2)
+        self.assertEqual(
+            self.env['project.statistic.monthly']._get_bucketed_project_ids(self.project.ids), {self.project.id}
+        )
+        self.assertEqual(self.project._verify_financial_data(), {})
+
+    def test_40_unbucketed_projects_are_queued_and_show_stored_figures(self):
+        """Test that projects without buckets are queued on upgrade and their details fall back to stored figures"""
+        invoice = self._create_invoice(1000.0)
+        invoice.action_post()
+        self.env.cr.precommit.run()
+        self.env.cr.execute("DELETE FROM project_statistic_monthly WHERE project_id = %s", [self.project.id])
+        Monthly = self.env['project.statistic.monthly']
+        Monthly.invalidate_model()
+        self.project.invalidate_recordset()
+
+        self.assertAlmostEqual(self.project.customer_outstanding_amount_net, 1000.0, places=2)
+
+        Monthly.init()
+        Queue = self.env['project.statistic.queue']
+        self.assertIn(self.project, Queue.search([]).project_id)
+
+        Queue._process_queue()
+        self.assertEqual(Monthly._get_bucketed_project_ids(self.project.ids), {self.project.id})
+        self.assertEqual(self.project._verify_financial_data(), {})
+
+    def test_41_rate_refresh_writes_changed_rows_and_schedules_unbucketed(self):
+        """Test that the rate-only refresh skips unchanged rows and sends unbucketed projects to a full recompute"""
+        employee = self.env['hr.employee'].create({'name': 'Test Employee'})
+        self.AnalyticLine.create({
+            'name': 'Work',
+            'project_id': self.project.id,
+            'employee_id': employee.id,
+            'unit_amount': 10.0,
+        })
+        self.env.cr.precommit.run()
+        labor_costs_adjusted = self.project.labor_costs_adjusted
+
+        self.assertEqual(self.Project._apply_general_hourly_rate(), 0)
+
+        self.env.cr.execute("DELETE FROM project_statistic_monthly WHERE project_id = %s", [self.project.id])
+        self.env['project.statistic.monthly'].invalidate_model()
+        self.assertEqual(self.Project._apply_general_hourly_rate(), 0)
+        self.assertAlmostEqual(self.project.labor_costs_adjusted, labor_costs_adjusted, places=2)
+        self.assertIn(self.project.id, self.env.cr.precommit.data.get('project_statistic.dirty_project_groups', {}))
+
+    @mute_logger('odoo.sql_db')
+    def test_42_failed_deltas_fall_back_to_full_recompute(self):
+        """Test that failing deltas roll back to their savepoint and the projects are recomputed in full"""
+        self.env['ir.config_parameter'].sudo().set_param('project_statistic.recompute_strategy', 'incremental')
+
+        def failing_deltas(projects, deltas, exclude_project_ids=()):
+            projects.env.cr.execute("SELECT 1 / 0")
+
+        invoice = self._create_invoice(1000.0)
+        with patch.object(type(self.Project), '_apply_financial_deltas', failing_deltas), \
+                self.assertLogs('odoo.addons.project_statistic.models.project_analytics', level='ERROR'):
+            invoice.action_post()
+            self.env.cr.precommit.run()
+
+        self.assertAlmostEqual(self.project.customer_invoiced_amount_net, 1000.0, places=2)
+        self.assertEqual(self.project._verify_financial_data(), {})
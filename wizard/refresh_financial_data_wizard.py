@@ -1,4 +1,8 @@
 from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from odoo.tools import float_compare
+import os
+import time
 
 
 class RefreshFinancialDataWizard(models.TransientModel):
@@ -16,6 +20,40 @@ class RefreshFinancialDataWizard(models.TransientModel):
         help="General hourly rate used to calculate adjusted labor costs. "
              "Formula: Total Hours Booked (Adjusted) × General Hourly Rate = Labor Costs (Adjusted)"
     )
+    refresh_mode = fields.Selection([
+        ('serial', 'Serial'),
+        ('parallel', 'Parallel'),
+    ], string='Refresh Mode',
+        default='serial',
+        required=True,
+        help="Serial: all projects are computed one batch after the other in this request. "
+             "Parallel: the projects are split into shards computed side by side, each on its own "
+             "database connection (recommended for a full portfolio refresh)."
+    )
+    full_recompute = fields.Boolean(
+        string='Full Recompute',
+        default=False,
+        help="Recompute all financial data from invoices, bills, timesheets and sales orders. "
+             "Without it, a change of the hourly rate only updates the adjusted labor costs of all "
+             "projects in one step; an unchanged rate always triggers a full recompute."
+    )
+    worker_count = fields.Integer(
+        string='Parallel Workers',
+        default=lambda self: min(os.cpu_count() or 1, 8),
+        help="Number of shards computed in parallel. Defaults to the number of CPU cores (max. 8)."
+    )
+    bulk_mode_hours = fields.Integer(
+        string='Bulk Mode Duration (h)',
+        default=4,
+        help="Bulk import / migration mode: while active, changes to invoices, bills and timesheets "
+             "only record the affected analytic accounts. The projects are rebuilt in one batched pass "
+             "when the mode is ended, at the latest after this number of hours."
+    )
+    bulk_mode_active = fields.Boolean(
+        string='Bulk Mode Active',
+        default=lambda self: self.env['project.statistic.bulk.account']._is_active(),
+        readonly=True,
+    )
 
     def action_refresh_data(self):
         """
@@ -25,6 +63,12 @@ class RefreshFinancialDataWizard(models.TransientModel):
         Cache invalidation ensures we read the latest data from the database.
         """
         self.ensure_one()
+        Project = self.env['project.project']
+
+        # Rate-only change: nothing but the adjusted labor costs depends on the rate
+        rate_only = not self.full_recompute and float_compare(
+            Project._get_general_hourly_rate(), self.general_hourly_rate, precision_digits=2
+        ) != 0
 
         # Update the system parameter
         self.env['ir.config_parameter'].sudo().set_param(
@@ -32,6 +76,14 @@ class RefreshFinancialDataWizard(models.TransientModel):
             str(self.general_hourly_rate)
         )
 
+        if rate_only:
+            started = time.monotonic()
+            count = Project._apply_general_hourly_rate()
+            message = _('Hourly rate %.2f EUR applied to %s project(s) in %.3fs (no full recompute).') % (
+                self.general_hourly_rate, count, time.monotonic() - started
+            )
+            return self._notify_refreshed(message)
+
         # Get the active project IDs from context
         active_ids = self.env.context.get('active_ids', [])
         if active_ids:
@@ -47,17 +99,53 @@ class RefreshFinancialDataWizard(models.TransientModel):
         # Trigger recomputation
         # This happens within the current transaction and will be committed
         # when the wizard completes successfully
-        projects._compute_financial_data()
+        message = _('Financial data has been recalculated for %s project(s) with hourly rate %.2f EUR.') % (
+            len(projects), self.general_hourly_rate
+        )
+        if self.refresh_mode == 'parallel':
+            # Shards aggregate the source figures, the rate is applied when merging on this cursor
+            timings = projects._refresh_financial_data_parallel(workers=self.worker_count)
+            message += ' ' + _('Total time: %.1fs (%s shard(s): %s).') % (
+                timings['total'],
+                len(timings['shards']),
+                ', '.join('%.1fs' % seconds for _count, seconds in timings['shards']),
+            )
+            changes = timings['changes']
+        else:
+            changes = projects._compute_financial_data()
+        message += ' ' + _('%s project(s) / %s field(s) changed.') % (changes['projects'], changes['fields'])
+
+        return self._notify_refreshed(message)
+
+    def action_start_bulk_mode(self):
+        """Switch the bulk import / migration mode on for the chosen number of hours."""
+        self.ensure_one()
+        self.env['project.statistic.bulk.account']._check_bulk_mode_access()
+        if self.bulk_mode_hours <= 0:
+            raise UserError(_('The bulk mode duration must be at least one hour.'))
+        until = self.env['project.statistic.bulk.account']._start(self.bulk_mode_hours)
+        return self._notify_refreshed(
+            _('Bulk mode active until %s (UTC). Financial data is rebuilt when the mode ends.') % until
+        )
+
+    def action_finish_bulk_mode(self):
+        """End the bulk import / migration mode and rebuild the affected projects."""
+        self.ensure_one()
+        self.env['project.statistic.bulk.account']._check_bulk_mode_access()
+        started = time.monotonic()
+        count = self.env['project.statistic.bulk.account']._finish()
+        return self._notify_refreshed(
+            _('Bulk mode ended: %s project(s) rebuilt in %.1fs.') % (count, time.monotonic() - started)
+        )
 
-        # Show success notification
+    def _notify_refreshed(self, message):
+        """Show the success notification and close the wizard."""
         return {
             'type': 'ir.actions.client',
             'tag': 'display_notification',
             'params': {
                 'title': _('Financial Data Refreshed'),
-                'message': _('Financial data has been recalculated for %s project(s) with hourly rate %.2f EUR.') % (
-                    len(projects), self.general_hourly_rate
-                ),
+                'message': message,
                 'type': 'success',
                 'sticky': False,
                 'next': {'type': 'ir.actions.act_window_close'},